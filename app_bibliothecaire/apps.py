@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AppBibliothecaireConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_bibliothecaire'
+
+    def ready(self):
+        # Enregistre les receveurs de signaux
+        from app_bibliothecaire import signals  # noqa: F401
@@ -0,0 +1,79 @@
+""" Versions asynchrones des vues de consultation, servies sous ASGI (réglage ASYNC_VIEWS).
+
+Les données sont lues avec l'ORM asynchrone, puis les gabarits sont rendus par
+sync_to_async() : le moteur de gabarits de Django est synchrone, et les processeurs de
+contexte (utilisateur, messages) lisent la session de façon synchrone.
+"""
+import logging
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.shortcuts import aget_object_or_404, redirect, render
+from app_bibliothecaire import views
+from app_bibliothecaire.catalogue import catalogue_queryset, group_by_subtype
+from app_bibliothecaire.conditional import async_condition, catalogue_etag, catalogue_last_modified
+from app_bibliothecaire.holds import ready_holds
+from app_bibliothecaire.models import Member, Loan
+from app_bibliothecaire.pagination import MEMBER_ORDERING, apage_from_request
+from app_bibliothecaire.search import search_from_request
+
+logger = logging.getLogger(__name__)
+
+arender = sync_to_async(render)
+
+
+@async_condition(etag_func=catalogue_etag, last_modified_func=catalogue_last_modified)
+async def listmembers(request):
+    """ Version asynchrone de views.listmembers(). """
+    logger.info("Accès à la liste des membres.")
+    try:
+        query = request.GET.get('q', '').strip()
+        page = await apage_from_request(request, views.member_list_queryset(query), MEMBER_ORDERING)
+        logger.debug("%s membres récupérés.", len(page.items))
+        return await arender(request, 'membres/listmembres.html', {
+            'members': page.items,
+            'page': page,
+            'query': query,
+        })
+    except Exception as e:
+        logger.error("Erreur lors de la récupération des membres : %s", e, exc_info=True)
+        await sync_to_async(messages.error)(request, "Erreur lors du chargement des membres.")
+        return redirect('app_bibliothecaire:home_bibliothecaire')
+
+
+@async_condition(etag_func=catalogue_etag, last_modified_func=catalogue_last_modified)
+async def listmedia(request):
+    """ Version asynchrone de views.listmedia(). """
+    logger.info("Accès à la liste des médias.")
+    try:
+        # La recherche plein texte passe par un curseur SQL brut, sans équivalent asynchrone
+        results = await sync_to_async(search_from_request)(request)
+        if results is None:
+            page = await apage_from_request(request, catalogue_queryset())
+            context = group_by_subtype(page.items)
+            context['page'] = page
+        else:
+            context = group_by_subtype(results)
+            context['results_count'] = len(results)
+        logger.debug("Médias récupérés : %s livres, %s DVD, %s CD, %s plateaux.", len(context['books']),
+                     len(context['dvds']), len(context['cds']), len(context['boards']))
+        return await arender(request, 'media/listmedia.html', context)
+    except Exception as e:
+        logger.error("Erreur lors de la récupération des médias : %s", e, exc_info=True)
+        await sync_to_async(messages.error)(request, "Erreur lors du chargement des médias.")
+        return redirect('app_bibliothecaire:home_bibliothecaire')
+
+
+async def return_loan(request):
+    """ Version asynchrone de la liste des emprunts en cours d'un membre (views.return_loan()).
+    Les autres étapes du retour (choix du membre, formulaire de retour) restent synchrones.
+    """
+    if request.method != 'GET' or 'borrower_id' not in request.GET or 'loan_id' in request.GET:
+        return await sync_to_async(views.return_loan)(request)
+    borrower = await aget_object_or_404(Member, id=request.GET['borrower_id'])
+    loans = [loan async for loan in Loan.objects.filter(borrower=borrower, effective_return_date__isnull=True)
+             .select_related('media')]
+    return await arender(request, 'emprunt/retour_emprunt.html', {
+        'borrower': borrower,
+        'loans': loans,
+        'ready_holds': await sync_to_async(ready_holds)(borrower.id),
+    })
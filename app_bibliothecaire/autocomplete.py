@@ -0,0 +1,61 @@
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
+from app_bibliothecaire.models import Member, Media
+
+# Nombre de suggestions retournées par défaut, et maximum accepté
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Borne supérieure des chaînes commençant par un préfixe donné
+_PREFIX_END = '\U0010ffff'
+
+
+def prefix_q(field, prefix):
+    """ Filtre les valeurs de 'field' qui commencent par 'prefix', sans tenir compte de la casse.
+
+    Le préfixe est exprimé en intervalle sur la colonne en minuscules
+    (LOWER(field) >= LOWER(prefix) AND LOWER(field) < LOWER(prefix + U+10FFFF)), que la base
+    résout en parcourant l'index sur Lower(field), contrairement à un LIKE insensible à la casse.
+    Les deux bornes sont converties par la base elle-même, comme la colonne indexée.
+    """
+    lowered = Lower(field)
+    return Q(GreaterThanOrEqual(lowered, Lower(Value(prefix))),
+             LessThan(lowered, Lower(Value(prefix + _PREFIX_END))))
+
+
+def parse_limit(value):
+    """ Convertit le paramètre 'limit' en entier compris entre 1 et MAX_LIMIT. """
+    try:
+        limit = int(value) if value not in (None, '') else DEFAULT_LIMIT
+    except (TypeError, ValueError):
+        return DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def search_members(query, limit=DEFAULT_LIMIT):
+    """ Retourne au plus 'limit' membres dont le nom ou le prénom commence par 'query',
+    sous la forme [{'id': ..., 'label': 'Nom Prénom'}].
+    """
+    query = query.strip()
+    if not query:
+        return []
+    members = (Member.objects
+               .filter(prefix_q('name', query) | prefix_q('first_name', query))
+               .order_by('name', 'first_name', 'id')
+               .values_list('id', 'name', 'first_name')[:limit])
+    return [{'id': member_id, 'label': f"{name} {first_name}"} for member_id, name, first_name in members]
+
+
+def search_available_media(query, limit=DEFAULT_LIMIT, category=None):
+    """ Retourne au plus 'limit' médias disponibles dont le titre commence par 'query',
+    éventuellement limités à une catégorie, sous la forme [{'id': ..., 'label': 'Titre - Auteur'}].
+    """
+    query = query.strip()
+    if not query:
+        return []
+    medias = Media.objects.filter(prefix_q('name', query), availability=True)
+    if category:
+        medias = medias.filter(category=category)
+    medias = medias.order_by('name', 'id').values_list('id', 'name', 'author')[:limit]
+    return [{'id': media_id, 'label': f"{name} - {author}"} for media_id, name, author in medias]
@@ -0,0 +1,165 @@
+from django.db import transaction
+from django.db.models import Case, CharField, F, FilteredRelation, Q, Value, When
+from django.db.models.functions import Cast, Concat, LPad
+from django.utils import timezone
+from app_bibliothecaire.models import Member, Media
+
+# Types d'éléments désignés par un code-barres
+MEDIA = 'media'
+MEMBER = 'member'
+
+# Codes attribués par assign_barcodes() : préfixe suivi de l'identifiant sur CODE_DIGITS chiffres
+PREFIXES = {MEDIA: 'M', MEMBER: 'A'}
+CODE_DIGITS = 9
+
+# Nombre de lignes modifiées par UPDATE lors de l'attribution des codes
+DEFAULT_BATCH_SIZE = 1000
+
+
+def normalize_barcode(code):
+    # Les douchettes ajoutent souvent un retour à la ligne ou des espaces au code lu
+    return (code or '').strip()
+
+
+def _active_loan():
+    # Jointure sur les seuls emprunts en cours (index partiel loan_active_*)
+    return FilteredRelation('loans', condition=Q(loans__effective_return_date__isnull=True))
+
+
+def lookup_media(code):
+    """ Retourne le média qui porte le code-barres 'code' et son emprunt en cours,
+    lus par une seule requête (index media_barcode_unique), ou None.
+    """
+    row = (Media.objects.filter(barcode=code)
+           .annotate(active_loan=_active_loan())
+           .values('id', 'barcode', 'name', 'author', 'category', 'availability',
+                   loan_id=F('active_loan__id'),
+                   loan_borrower_id=F('active_loan__borrower_id'),
+                   borrower_name=F('active_loan__borrower__name'),
+                   borrower_first_name=F('active_loan__borrower__first_name'),
+                   expected_return_date=F('active_loan__expected_return_date'))
+           .first())
+    if row is None:
+        return None
+    loan = None
+    if row['loan_id'] is not None:
+        loan = {
+            'id': row['loan_id'],
+            'borrower_id': row['loan_borrower_id'],
+            'borrower': f"{row['borrower_name']} {row['borrower_first_name']}",
+            'expected_return_date': row['expected_return_date'],
+            'late': row['expected_return_date'] < timezone.localdate(),
+        }
+    return {
+        'type': MEDIA,
+        'id': row['id'],
+        'barcode': row['barcode'],
+        'label': row['name'],
+        'author': row['author'],
+        'category': row['category'],
+        'availability': row['availability'],
+        'active_loan': loan,
+    }
+
+
+def lookup_member(code):
+    """ Retourne le membre qui porte le code-barres 'code' et ses emprunts en cours,
+    lus par une seule requête (index member_barcode_unique), ou None.
+    """
+    rows = list(Member.objects.filter(barcode=code)
+                .annotate(active_loan=_active_loan())
+                .order_by('active_loan__expected_return_date', 'active_loan__id')
+                .values('id', 'barcode', 'name', 'first_name', 'active_loan_count', 'earliest_due_date',
+                        loan_id=F('active_loan__id'),
+                        media_id=F('active_loan__media_id'),
+                        media_name=F('active_loan__media__name'),
+                        expected_return_date=F('active_loan__expected_return_date')))
+    if not rows:
+        return None
+    member = rows[0]
+    return {
+        'type': MEMBER,
+        'id': member['id'],
+        'barcode': member['barcode'],
+        'label': f"{member['name']} {member['first_name']}",
+        'active_loan_count': member['active_loan_count'],
+        'late': member['earliest_due_date'] is not None and member['earliest_due_date'] < timezone.localdate(),
+        'active_loans': [{
+            'id': row['loan_id'],
+            'media_id': row['media_id'],
+            'media_name': row['media_name'],
+            'expected_return_date': row['expected_return_date'],
+        } for row in rows if row['loan_id'] is not None],
+    }
+
+
+LOOKUPS = {MEDIA: lookup_media, MEMBER: lookup_member}
+
+
+def lookup_barcode(code, kind=None):
+    """ Identifie un code-barres lu au comptoir.
+
+    Chaque recherche est une seule requête sur un index unique : sa durée ne dépend pas
+    de la taille du catalogue. Sans type précisé, le code est cherché parmi les médias,
+    puis parmi les membres.
+
+    Paramètres :
+        - code (str) : Code lu.
+        - kind (str) : MEDIA ou MEMBER pour ne chercher qu'un type d'élément (facultatif).
+
+    Retour :
+        - dict : L'élément trouvé (voir lookup_media() et lookup_member()), ou None.
+    Lève une exception ValueError si le type est inconnu.
+    """
+    if kind is not None and kind not in LOOKUPS:
+        raise ValueError(f"Type inconnu : {kind}. Valeurs possibles : {', '.join(LOOKUPS)}.")
+    code = normalize_barcode(code)
+    if not code:
+        return None
+    for lookup in ([LOOKUPS[kind]] if kind else LOOKUPS.values()):
+        result = lookup(code)
+        if result is not None:
+            return result
+    return None
+
+
+def generated_barcode(kind, pk):
+    # Code attribué par assign_barcodes(), par exemple 'M000000042'
+    return f"{PREFIXES[kind]}{pk:0{CODE_DIGITS}d}"
+
+
+def assign_barcodes(kind, batch_size=DEFAULT_BATCH_SIZE):
+    """ Attribue un code-barres aux médias (ou aux membres) qui n'en ont pas.
+
+    Le code est dérivé de l'identifiant (voir generated_barcode()) et écrit par un UPDATE
+    par lot de 'batch_size' lignes, chacun dans sa propre transaction. Les lignes dont le code
+    est déjà porté par un autre élément (étiquette saisie à la main) sont laissées sans code.
+
+    Paramètres :
+        - kind (str) : MEDIA ou MEMBER.
+        - batch_size (int) : Nombre de lignes par UPDATE.
+
+    Retour :
+        - tuple : (nombre de codes attribués, nombre de lignes laissées sans code).
+    """
+    model = Media if kind == MEDIA else Member
+    # Même code que generated_barcode() : LPad tronquerait les identifiants de plus de CODE_DIGITS chiffres
+    digits = Cast('id', CharField())
+    code = Concat(Value(PREFIXES[kind]),
+                  Case(When(id__lt=10 ** CODE_DIGITS, then=LPad(digits, CODE_DIGITS, Value('0'))), default=digits),
+                  output_field=CharField())
+    assigned = skipped = 0
+    last_id = 0
+    while True:
+        ids = list(model.objects.filter(id__gt=last_id, barcode__isnull=True)
+                   .order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return assigned, skipped
+        last_id = ids[-1]
+        codes = {generated_barcode(kind, pk): pk for pk in ids}
+        taken = {codes[barcode] for barcode in
+                 model.objects.filter(barcode__in=codes).values_list('barcode', flat=True)}
+        with transaction.atomic():
+            assigned += (model.objects.filter(id__in=[pk for pk in ids if pk not in taken], barcode__isnull=True)
+                         .update(barcode=code, modified_at=timezone.now()))
+        skipped += len(taken)
@@ -0,0 +1,100 @@
+""" Cache des fragments du catalogue.
+
+Les clés des fragments portent la version des tables dont ils dépendent, tirée de leur état dans
+la base (voir app_bibliothecaire.conditional.tables_version()) : tous les processus la lisent
+à l'identique, et une écriture faite par l'un d'eux écarte les fragments de tous les autres,
+quel que soit le backend de cache. Les anciens fragments ne sont plus jamais lus et finissent
+évincés ou expirés. Les compteurs de succès et d'échecs restent, eux, propres au backend.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+
+# Clés des compteurs de succès / échecs
+HITS_KEY = 'catalogue:hits'
+MISSES_KEY = 'catalogue:misses'
+
+
+def get_cache():
+    """ Retourne le cache utilisé pour les fragments du catalogue (réglage CATALOGUE_CACHE_ALIAS). """
+    return caches[getattr(settings, 'CATALOGUE_CACHE_ALIAS', 'default')]
+
+
+def _incr(key):
+    cache = get_cache()
+    # add() ne fait rien si la clé existe déjà : incr() part alors de la valeur en place
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Clé évincée entre add() et incr()
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+async def _aincr(key):
+    cache = get_cache()
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        return await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=None)
+        return 1
+
+
+def get_cache_stats():
+    """ Retourne les compteurs de succès et d'échecs du cache du catalogue. """
+    values = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    return {'hits': values.get(HITS_KEY, 0), 'misses': values.get(MISSES_KEY, 0)}
+
+
+def fragment_key(name, version, section, params):
+    # Les paramètres (curseur, taille de page) sont hachés : les clés restent courtes
+    digest = hashlib.md5(repr(params).encode('utf-8')).hexdigest()
+    return f'catalogue:v{version}:{name}:{section}:{digest}'
+
+
+def get_fragments(name, version, params, sections, render):
+    """ Retourne les fragments d'une page du catalogue, depuis le cache si la version
+    des tables n'a pas changé depuis leur rendu.
+
+    Paramètres :
+        - name (str) : Nom de la page (par exemple 'member_catalogue').
+        - version (str) : Version des tables dont dépend la page (voir conditional.tables_version()).
+        - params (tuple) : Paramètres qui distinguent les variantes de la page.
+        - sections (tuple) : Noms des fragments (une section par catégorie de média, etc.).
+        - render (callable) : Fonction sans argument qui retourne le dict {section: fragment}.
+
+    Retour :
+        - (dict, bool) : Les fragments, et True s'ils proviennent tous du cache.
+    """
+    cache = get_cache()
+    keys = {section: fragment_key(name, version, section, params) for section in sections}
+    cached = cache.get_many(list(keys.values()))
+    if len(cached) == len(keys):
+        _incr(HITS_KEY)
+        return {section: cached[key] for section, key in keys.items()}, True
+
+    _incr(MISSES_KEY)
+    fragments = render()
+    cache.set_many({keys[section]: fragments[section] for section in sections},
+                   timeout=getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 24 * 3600))
+    return fragments, False
+
+
+async def aget_fragments(name, version, params, sections, render):
+    """ Version asynchrone de get_fragments(), pour les vues asynchrones.
+    render est alors une coroutine qui retourne le dict {section: fragment}.
+    """
+    cache = get_cache()
+    keys = {section: fragment_key(name, version, section, params) for section in sections}
+    cached = await cache.aget_many(list(keys.values()))
+    if len(cached) == len(keys):
+        await _aincr(HITS_KEY)
+        return {section: cached[key] for section, key in keys.items()}, True
+
+    await _aincr(MISSES_KEY)
+    fragments = await render()
+    await cache.aset_many({keys[section]: fragments[section] for section in sections},
+                          timeout=getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 24 * 3600))
+    return fragments, False
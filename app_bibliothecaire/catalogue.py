@@ -0,0 +1,88 @@
+from django.db.models import Prefetch
+from app_bibliothecaire.models import MediaFlat, Loan
+
+# Sous-types de média, dans l'ordre d'affichage des listes
+SUBTYPES = (
+    ('book', 'books'),
+    ('dvd', 'dvds'),
+    ('cd', 'cds'),
+    ('board', 'boards'),
+)
+SUBTYPE_KEYS = dict(SUBTYPES)
+
+
+def active_loans_prefetch():
+    """ Précharge l'emprunt en cours de chaque média avec son emprunteur.
+    Le résultat est stocké dans l'attribut 'active_loans' (liste) de chaque média.
+    """
+    return Prefetch(
+        'loans',
+        queryset=Loan.objects.filter(effective_return_date__isnull=True).select_related('borrower'),
+        to_attr='active_loans'
+    )
+
+
+def catalogue_queryset():
+    """ Retourne les médias du modèle de lecture MediaFlat, qui porte les champs de tous
+    les sous-types sans jointure, avec leur emprunt en cours.
+    Le nombre de requêtes est constant : une pour les médias, une pour les emprunts.
+    """
+    return MediaFlat.objects.prefetch_related(active_loans_prefetch())
+
+
+def subtype_instance(media):
+    """ Retourne le sous-type d'un média issu de catalogue_queryset(), avec l'attribut
+    'current_loans' (emprunt en cours ou None).
+    Retourne (None, None) si le média n'a pas de sous-type, sinon (clé de liste, média).
+    """
+    key = SUBTYPE_KEYS.get(media.subtype)
+    if key is None:
+        return None, None
+    active_loans = media.active_loans
+    media.current_loans = active_loans[0] if active_loans else None
+    return key, media
+
+
+def group_by_subtype(medias):
+    """ Répartit des médias issus de catalogue_queryset() par sous-type.
+
+    Paramètres :
+        - medias (iterable) : Médias chargés avec catalogue_queryset().
+
+    Retour :
+        - dict : {'books': [...], 'dvds': [...], 'cds': [...], 'boards': [...]}.
+          Chaque élément est le média (MediaFlat), avec l'attribut 'current_loans'
+          (emprunt en cours ou None). Les médias sans sous-type sont ignorés.
+    """
+    catalogue = {key: [] for _, key in SUBTYPES}
+    for media in medias:
+        key, item = subtype_instance(media)
+        if item is not None:
+            catalogue[key].append(item)
+    return catalogue
+
+
+def media_to_dict(media):
+    """ Représentation JSON d'un média issu de catalogue_queryset().
+    L'emprunteur n'est pas exposé : seule la disponibilité est indiquée, celle du champ
+    availability (un média mis de côté pour une réservation n'a pas d'emprunt en cours).
+    """
+    key, _ = subtype_instance(media)
+    data = {
+        'id': media.id,
+        'name': media.name,
+        'author': media.author,
+        'category': media.category,
+        'type': key[:-1] if key else None,
+        'available': media.availability,
+    }
+    if key == 'books':
+        data['nb_pages'] = media.nb_pages
+    elif key == 'dvds':
+        data['genre'] = media.genre
+    elif key == 'cds':
+        data['release_date'] = media.release_date.isoformat() if media.release_date else None
+    elif key == 'boards':
+        data['number_players_min'] = media.number_players_min
+        data['number_players_max'] = media.number_players_max
+    return data
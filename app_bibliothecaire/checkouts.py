@@ -0,0 +1,120 @@
+from datetime import datetime, time, timedelta
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+from app_bibliothecaire.events import publish_availability
+from app_bibliothecaire.models import Member, Media, Loan, Hold
+
+# Nombre maximal d'emprunts en cours par membre
+MAX_ACTIVE_LOANS = 3
+
+# Durée d'un emprunt
+LOAN_DURATION = timedelta(days=7)
+
+
+class CheckoutError(ValueError):
+    """ Refus d'un emprunt groupé : aucun emprunt n'a été créé.
+    Attributs :
+        errors (list) : Motifs du refus, un par problème détecté.
+    """
+
+    def __init__(self, errors):
+        super().__init__(" ".join(errors))
+        self.errors = errors
+
+
+def lend_medias(member_id, media_ids, loan_date=None):
+    """ Prête plusieurs médias à un membre en une transaction, tout ou rien.
+
+    Le panier est vérifié en une seule fois : médias existants et disponibles (ou mis de côté
+    pour ce membre), limite de MAX_ACTIVE_LOANS emprunts en cours pour l'ensemble du panier
+    et absence de retard.
+    Le nombre de requêtes ne dépend pas de la taille du panier : lecture des médias,
+    UPDATE conditionnel des médias, UPDATE conditionnel des compteurs du membre et
+    INSERT groupé des emprunts.
+
+    Paramètres :
+        - member_id (int) : Identifiant de l'emprunteur.
+        - media_ids (list) : Identifiants des médias du panier.
+        - loan_date (date ou datetime) : Date de l'emprunt (maintenant par défaut). Une date seule
+          ou une datetime naïve est prise dans le fuseau horaire courant.
+
+    Retour :
+        - list : Les emprunts créés (Loan), dans l'ordre du panier.
+    Lève une exception CheckoutError (ValueError) avec tous les motifs du refus sinon.
+    """
+    media_ids = list(media_ids)
+    if not media_ids:
+        raise CheckoutError(["Le panier est vide."])
+    if len(set(media_ids)) != len(media_ids):
+        raise CheckoutError(["Un même média figure plusieurs fois dans le panier."])
+    loan_date = loan_date or timezone.now()
+    if not isinstance(loan_date, datetime):
+        # Date seule (formulaire) : début de journée, heure locale
+        loan_date = datetime.combine(loan_date, time.min)
+    if timezone.is_naive(loan_date):
+        loan_date = timezone.make_aware(loan_date)
+    loan_day = timezone.localdate(loan_date)
+    expected_return_date = loan_day + LOAN_DURATION
+    now = timezone.now()
+
+    with transaction.atomic():
+        medias = Media.objects.select_for_update().in_bulk(media_ids)
+        unavailable = [media_id for media_id in media_ids if media_id in medias and not medias[media_id].availability]
+        # Médias indisponibles mis de côté pour ce membre (réservations prêtes)
+        held = set(Hold.objects.filter(member_id=member_id, media_id__in=unavailable, status=Hold.READY)
+                   .values_list('media_id', flat=True)) if unavailable else set()
+        errors = [f"Le média n° {media_id} n'existe pas." for media_id in media_ids if media_id not in medias]
+        errors += [f"{medias[media_id].name} n'est pas disponible à l'emprunt."
+                   for media_id in unavailable if media_id not in held]
+        if errors:
+            raise CheckoutError(errors)
+
+        # Mêmes UPDATE conditionnels que Loan.reserve_media() et Loan.claim_hold(), pour tout le panier
+        available = [media_id for media_id in media_ids if media_id not in held]
+        if available and len(available) != (Media.objects.filter(pk__in=available, availability=True)
+                                            .update(availability=False, modified_at=now)):
+            raise CheckoutError(["Un média du panier vient d'être emprunté à un autre poste."])
+        if held and len(held) != (Hold.objects.filter(member_id=member_id, media_id__in=held, status=Hold.READY)
+                                  .update(status=Hold.FULFILLED, closed_at=now)):
+            raise CheckoutError(["Un média du panier vient d'être emprunté à un autre poste."])
+
+        # Même UPDATE conditionnel que Loan.reserve_borrower(), avec le nombre de médias du panier
+        due_date = Value(expected_return_date, output_field=models.DateField())
+        reserved = (Member.objects
+                    .filter(pk=member_id, active_loan_count__lte=MAX_ACTIVE_LOANS - len(media_ids))
+                    .exclude(earliest_due_date__lt=timezone.localdate())
+                    .update(active_loan_count=F('active_loan_count') + len(media_ids),
+                            earliest_due_date=Least(Coalesce(F('earliest_due_date'), due_date), due_date),
+                            modified_at=now))
+        if not reserved:
+            raise CheckoutError(_borrower_errors(member_id, len(media_ids)))
+
+        loans = Loan.objects.bulk_create([
+            Loan(borrower_id=member_id, media_id=media_id, loan_date=loan_date,
+                 expected_return_date=expected_return_date, modified_at=now)
+            for media_id in media_ids
+        ])
+        publish_availability(available, False)
+    for loan in loans:
+        loan.media = medias[loan.media_id]
+        loan.media.availability = False
+    return loans
+
+
+def _borrower_errors(member_id, basket_size):
+    # Motifs du refus des compteurs du membre, lus après l'échec de l'UPDATE conditionnel
+    member = Member.objects.filter(pk=member_id).values('name', 'first_name', 'active_loan_count',
+                                                        'earliest_due_date').first()
+    if member is None:
+        return [f"Le membre n° {member_id} n'existe pas."]
+    borrower = f"{member['name']} {member['first_name']}"
+    errors = []
+    if member['active_loan_count'] + basket_size > MAX_ACTIVE_LOANS:
+        remaining = max(MAX_ACTIVE_LOANS - member['active_loan_count'], 0)
+        errors.append(f"{borrower} a {member['active_loan_count']} emprunt(s) en cours et ne peut emprunter "
+                      f"que {remaining} média(s) de plus.")
+    if member['earliest_due_date'] is not None and member['earliest_due_date'] < timezone.localdate():
+        errors.append(f"{borrower} a des emprunts en retard et ne peut pas emprunter de nouveaux médias.")
+    return errors or [f"{borrower} ne peut pas emprunter de nouveaux médias."]
@@ -0,0 +1,140 @@
+import hashlib
+from calendar import timegm
+from datetime import timezone as dt_timezone
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from app_bibliothecaire.models import Member, Media, Loan, TableDeletions
+
+# Tables dont dépend chaque page : le catalogue du bibliothécaire et la liste des membres
+# affichent les emprunteurs, le catalogue des membres n'affiche que les médias et leurs emprunts.
+CATALOGUE_MODELS = (Media, Loan, Member)
+MEMBER_CATALOGUE_MODELS = (Media, Loan)
+
+
+def _to_datetime(value):
+    # SQLite retourne les dates d'un SELECT brut sous forme de texte, en UTC
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value is not None and value.tzinfo is None and settings.USE_TZ:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return value
+
+
+def get_tables_state(models):
+    """ Retourne, pour chaque modèle, la date de dernière modification et le nombre de suppressions.
+
+    Une seule requête, sans parcours de table : le maximum de modified_at est lu dans son index
+    et change à chaque écriture, le compteur de suppressions (TableDeletions, tenu à jour par
+    un déclencheur) est lu dans une seule ligne et change à chaque suppression.
+
+    Retour :
+        - list : Couples (datetime ou None, int), dans l'ordre des modèles.
+    """
+    quote = connection.ops.quote_name
+    counters = quote(TableDeletions._meta.db_table)
+    columns = []
+    params = []
+    for model in models:
+        table = model._meta.db_table
+        modified_at = quote(model._meta.get_field('modified_at').column)
+        columns.append(f"(SELECT MAX({modified_at}) FROM {quote(table)})")
+        columns.append(f"(SELECT deletions FROM {counters} WHERE table_name = %s)")
+        params.append(table)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT " + ", ".join(columns), params)
+        row = cursor.fetchone()
+    return [(_to_datetime(row[i]), row[i + 1]) for i in range(0, len(row), 2)]
+
+
+def _request_state(request, models):
+    # L'ETag et Last-Modified sont calculés à partir de la même requête SQL
+    states = request.__dict__.setdefault('_tables_state', {})
+    if models not in states:
+        states[models] = get_tables_state(models)
+    return states[models]
+
+
+def _state_parts(request, models):
+    return [f"{modified_at.isoformat() if modified_at else '-'}:{deletions}"
+            for modified_at, deletions in _request_state(request, models)]
+
+
+def tables_version(request, models):
+    """ Retourne la version des tables des modèles donnés, tirée de leur état dans la base
+    (get_tables_state()) : la même dans tous les processus, elle change à chaque écriture.
+    L'état est lu une seule fois par requête HTTP, pour l'ETag, Last-Modified et cette version.
+    """
+    return hashlib.md5('|'.join(_state_parts(request, models)).encode('utf-8')).hexdigest()
+
+
+def _has_pending_messages(request):
+    # Une page qui affiche un message ne doit pas être remplacée par sa version en cache
+    return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+
+def validators(models):
+    """ Retourne les fonctions (etag_func, last_modified_func) à passer au décorateur
+    django.views.decorators.http.condition pour une page qui dépend des modèles donnés.
+
+    L'ETag tient compte de l'utilisateur et du jeton CSRF, que la page peut contenir.
+    Last-Modified ne voit pas les suppressions : If-None-Match, envoyé en priorité par
+    les navigateurs qui ont reçu l'ETag, l'emporte alors sur If-Modified-Since.
+    Aucun validateur n'est retourné si des messages sont en attente d'affichage.
+    """
+    def etag(request, *args, **kwargs):
+        if _has_pending_messages(request):
+            return None
+        parts = _state_parts(request, models)
+        user = getattr(request, 'user', None)
+        parts.append(str(user.pk) if user is not None and user.is_authenticated else '-')
+        parts.append(request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''))
+        return hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        if _has_pending_messages(request):
+            return None
+        dates = [modified_at for modified_at, _ in _request_state(request, models) if modified_at]
+        return max(dates, default=None)
+
+    return etag, last_modified
+
+
+catalogue_etag, catalogue_last_modified = validators(CATALOGUE_MODELS)
+member_catalogue_etag, member_catalogue_last_modified = validators(MEMBER_CATALOGUE_MODELS)
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """ Équivalent du décorateur condition() pour les vues asynchrones.
+    condition() appelle les validateurs de façon synchrone, ce qui est interdit dans la boucle
+    d'événements dès qu'ils lisent la base : ils sont ici exécutés par sync_to_async().
+    """
+    def validate(request, args, kwargs):
+        etag = etag_func(request, *args, **kwargs) if etag_func else None
+        last_modified = last_modified_func(request, *args, **kwargs) if last_modified_func else None
+        return etag, last_modified
+
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            res_etag, res_last_modified = await sync_to_async(validate)(request, args, kwargs)
+            res_etag = quote_etag(res_etag) if res_etag is not None else None
+            timestamp = timegm(res_last_modified.utctimetuple()) if res_last_modified else None
+            response = get_conditional_response(request, etag=res_etag, last_modified=timestamp)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            # Comme condition() : les validateurs ne sont ajoutés qu'aux réponses GET et HEAD
+            if request.method in ('GET', 'HEAD'):
+                if res_last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(timestamp)
+                if res_etag:
+                    response.headers.setdefault('ETag', res_etag)
+            return response
+        return inner
+
+    return decorator
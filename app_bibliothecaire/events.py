@@ -0,0 +1,193 @@
+""" Diffusion des changements de disponibilité des médias aux pages des membres (Server-Sent Events).
+
+Les écritures (Loan.save(), retours et emprunts groupés, réservations) publient un événement
+après la validation de leur transaction ; chaque client du flux SSE est abonné par une file
+bornée, alimentée depuis n'importe quel thread et lue dans la boucle d'événements ASGI.
+Un client trop lent pour suivre est déconnecté ; à sa reconnexion, le navigateur envoie
+l'en-tête Last-Event-ID et le flux reprend à partir de l'historique des derniers événements.
+Si l'événement demandé n'y figure plus, un événement 'reset' invite le client à recharger la page.
+La page du catalogue inscrit l'identifiant du dernier événement publié au moment de son rendu :
+les changements survenus entre le rendu et l'abonnement sont rejoués.
+
+La diffusion est propre au processus : avec plusieurs workers, un client ne reçoit que les
+changements écrits par le worker qui le sert. Les identifiants d'événements sont préfixés par
+une époque propre au processus : un identifiant d'un autre processus n'est pas rejoué.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from django.db import transaction
+
+# Nombre d'événements conservés pour la reprise après reconnexion (Last-Event-ID)
+HISTORY_SIZE = 1000
+
+# Nombre d'événements en attente par client ; au-delà, le client est déconnecté
+CLIENT_BUFFER_SIZE = 100
+
+# Intervalle (en secondes) des commentaires qui maintiennent les connexions inactives ouvertes
+HEARTBEAT_INTERVAL = 15
+
+# Délai (en millisecondes) de reconnexion indiqué aux navigateurs
+RETRY_MS = 3000
+
+AVAILABILITY = 'availability'
+RESET = 'reset'
+
+
+class Event:
+    """ Événement diffusé.
+    Attributs :
+        id (str) : Identifiant '<époque>-<numéro>'.
+        number (int) : Numéro de l'événement, croissant au sein d'une époque.
+        name (str) : Type d'événement (AVAILABILITY ou RESET).
+        data (dict) : Contenu, sérialisé en JSON.
+    """
+    __slots__ = ('id', 'number', 'name', 'data', 'encoded')
+
+    def __init__(self, epoch, number, name, data):
+        self.id = f"{epoch}-{number}"
+        self.number = number
+        self.name = name
+        self.data = data
+        # Encodé une seule fois, quel que soit le nombre de clients
+        self.encoded = f"id: {self.id}\nevent: {name}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class Subscription:
+    """ Abonnement d'un client : file bornée, lue dans la boucle d'événements du client. """
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def deliver(self, event):
+        # Exécuté dans la boucle du client. File pleine : le client ne suit pas, il est déconnecté
+        # (None) et reprendra depuis l'historique à sa reconnexion.
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventBroker:
+    """ Publication et abonnement en mémoire, partagés entre les threads du processus. """
+
+    def __init__(self, history_size=HISTORY_SIZE, buffer_size=CLIENT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.epoch = format(time.time_ns(), 'x')
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._history = deque(maxlen=history_size)
+        self._subscribers = {}  # boucle d'événements -> abonnements
+
+    @property
+    def last_event_id(self):
+        return f"{self.epoch}-{self._counter}"
+
+    @property
+    def subscribers(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def publish(self, name, data):
+        """ Diffuse un événement à tous les abonnés et le conserve dans l'historique. """
+        with self._lock:
+            self._counter += 1
+            event = Event(self.epoch, self._counter, name, data)
+            self._history.append(event)
+            targets = [(loop, list(subscriptions)) for loop, subscriptions in self._subscribers.items()]
+        # Un seul réveil par boucle d'événements, quel que soit le nombre de ses clients
+        for loop, subscriptions in targets:
+            try:
+                loop.call_soon_threadsafe(_fan_out, subscriptions, event)
+            except RuntimeError:
+                # Boucle fermée : ses abonnements seront retirés par unsubscribe()
+                pass
+        return event
+
+    def subscribe(self, last_event_id=None):
+        """ Abonne un client dans la boucle d'événements en cours.
+
+        Paramètres :
+            - last_event_id (str) : Dernier événement reçu par le client (en-tête Last-Event-ID).
+
+        Retour :
+            - tuple : (Subscription, événements manqués depuis last_event_id), la liste valant
+              None si ces événements ne sont plus dans l'historique.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(subscription.loop, set()).add(subscription)
+            return subscription, self._missed(last_event_id)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.loop, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscribers.pop(subscription.loop, None)
+
+    def _missed(self, last_event_id):
+        # Événements postérieurs à last_event_id, ou None s'ils ne peuvent plus être retrouvés
+        if not last_event_id:
+            return []
+        epoch, _, number = last_event_id.partition('-')
+        if epoch != self.epoch:
+            # Identifiant d'un autre processus (autre worker, ou avant un redémarrage) : rien à rejouer.
+            # Renvoyer 'reset' ferait recharger sans fin une page servie par un autre worker.
+            return []
+        if not (number.isascii() and number.isdigit()) or int(number) > self._counter:
+            return None
+        if self._history and int(number) < self._history[0].number - 1:
+            return None
+        return [event for event in self._history if event.number > int(number)]
+
+    async def stream(self, last_event_id=None, heartbeat=HEARTBEAT_INTERVAL):
+        """ Flux SSE d'un client (contenu d'une StreamingHttpResponse asynchrone). L'abonnement
+        est retiré à la fin du flux, y compris à la déconnexion du client.
+        """
+        subscription, missed = self.subscribe(last_event_id)
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            if missed is None:
+                yield Event(self.epoch, self._counter, RESET, {}).encoded
+            else:
+                for event in missed:
+                    yield event.encoded
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield event.encoded
+        finally:
+            self.unsubscribe(subscription)
+
+
+def _fan_out(subscriptions, event):
+    for subscription in subscriptions:
+        subscription.deliver(event)
+
+
+broker = EventBroker()
+
+
+def publish_availability(media_ids, available):
+    """ Annonce un changement de disponibilité des médias 'media_ids', une fois la transaction
+    en cours validée : rien n'est annoncé si elle est annulée.
+    """
+    media_ids = sorted(set(media_ids))
+    if media_ids:
+        transaction.on_commit(lambda: broker.publish(AVAILABILITY, {'media_ids': media_ids,
+                                                                    'available': available}))
@@ -0,0 +1,84 @@
+import csv
+import json
+from datetime import date, datetime
+from app_bibliothecaire.models import Member, MediaFlat, Loan
+
+# Nombre de lignes lues par aller-retour avec la base de données
+DEFAULT_CHUNK_SIZE = 2000
+
+# Jeux de données exportables : (modèle, colonnes exportées)
+# Les médias sont lus dans le modèle de lecture MediaFlat, sans jointure :
+# les colonnes des sous-types valent None pour les autres médias.
+DATASETS = {
+    'members': (Member, ('id', 'name', 'first_name', 'email', 'phone', 'creation_date')),
+    'media': (MediaFlat, ('id', 'name', 'author', 'category', 'availability',
+                          'nb_pages', 'genre', 'release_date',
+                          'number_players_min', 'number_players_max')),
+    'loans': (Loan, ('id', 'borrower_id', 'media_id', 'loan_date',
+                     'expected_return_date', 'effective_return_date')),
+}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def _format_value(value):
+    # Les dates sont exportées au format ISO 8601
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def get_columns(dataset):
+    """ Retourne les noms de colonnes exportés pour un jeu de données. """
+    if dataset not in DATASETS:
+        raise ValueError(f"Jeu de données inconnu : {dataset}")
+    _, columns = DATASETS[dataset]
+    return list(columns)
+
+
+def iter_rows(dataset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Parcourt les lignes d'un jeu de données sous forme de tuples, par blocs.
+
+    values_list() évite d'instancier des modèles et iterator() évite de mettre
+    le résultat en cache : la mémoire utilisée ne dépend que de chunk_size.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Jeu de données inconnu : {dataset}")
+    model, columns = DATASETS[dataset]
+    queryset = model.objects.order_by('id').values_list(*columns)
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield tuple(_format_value(value) for value in row)
+
+
+class _Echo:
+    """ Pseudo-fichier qui retourne la ligne écrite au lieu de la stocker. """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(dataset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Génère l'export CSV d'un jeu de données, ligne par ligne, en-tête compris. """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(get_columns(dataset))
+    for row in iter_rows(dataset, chunk_size):
+        yield writer.writerow(row)
+
+
+def iter_jsonl(dataset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Génère l'export JSONL d'un jeu de données : un objet JSON par ligne. """
+    columns = get_columns(dataset)
+    for row in iter_rows(dataset, chunk_size):
+        yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+
+
+def iter_export(dataset, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Retourne le générateur d'export correspondant au format ('csv' ou 'jsonl'). """
+    if export_format == 'csv':
+        return iter_csv(dataset, chunk_size)
+    if export_format == 'jsonl':
+        return iter_jsonl(dataset, chunk_size)
+    raise ValueError(f"Format d'export inconnu : {export_format}")
@@ -1,9 +1,48 @@
 from django import forms
+from django.utils import timezone
 from .models import Member, Media, Loan
+from .checkouts import MAX_ACTIVE_LOANS
+from .returns import MAX_BATCH_SIZE
 from django.core.exceptions import ValidationError
+from django.urls import reverse
+from urllib.parse import urlencode
 from datetime import datetime
 
 
+class AutocompleteWidget(forms.TextInput):
+    """ Champ de recherche qui interroge un point d'accès d'autocomplétion JSON
+    et ne soumet que la clé primaire de l'élément choisi.
+    Contrairement à un Select, aucune option n'est rendue : la taille de la page
+    ne dépend pas du nombre de lignes de la table.
+    Attributs :
+        url_name (str) : Nom de l'URL d'autocomplétion.
+        filters (dict) : Paramètres GET ajoutés à chaque recherche (par exemple la catégorie).
+    """
+    template_name = 'widgets/autocomplete.html'
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+        self.filters = {}
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        filters = {key: value for key, value in self.filters.items() if value}
+        context['widget']['url'] = reverse(self.url_name) + ('?' + urlencode(filters) if filters else '')
+        return context
+
+
+class AutocompleteModelChoiceField(forms.ModelChoiceField):
+    """ ModelChoiceField affiché avec un AutocompleteWidget : seule la clé primaire soumise
+    est validée (une requête par envoi), le queryset n'est jamais parcouru pour
+    construire des options ni évaluer __str__ sur chaque ligne.
+    """
+
+    def __init__(self, queryset, url_name, **kwargs):
+        kwargs.setdefault('widget', AutocompleteWidget(url_name))
+        super().__init__(queryset, **kwargs)
+
+
 class Membercreation(forms.Form):
     name = forms.CharField(
         max_length=150,
@@ -189,6 +228,33 @@ class BoardForm(forms.Form):
     )
 
 
+class MediaImportForm(forms.Form):
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('jsonl', 'JSONL'),
+    ]
+    TYPE_CHOICES = [
+        ('', "Indiqué dans la colonne 'type'"),
+        ('book', 'Books'),
+        ('dvd', 'Dvd'),
+        ('cd', 'Cd'),
+        ('board', 'Board'),
+    ]
+    file = forms.FileField(
+        label="Fichier",
+    )
+    import_format = forms.ChoiceField(
+        choices=FORMAT_CHOICES,
+        label="Format",
+        initial='csv',
+    )
+    media_type = forms.ChoiceField(
+        choices=TYPE_CHOICES,
+        label="Type de média",
+        required=False,
+    )
+
+
 class LoanForm(forms.Form):
     CATEGORIES_CHOICES = [
         ('', ''),
@@ -202,12 +268,14 @@ class LoanForm(forms.Form):
         label="Sélectionner une catégorie",
         required=False
     )
-    member_id = forms.ModelChoiceField(
+    member_id = AutocompleteModelChoiceField(
         queryset=Member.objects.all(),
+        url_name='app_bibliothecaire:autocomplete_members',
         label="Sélectionner un membre",
     )
-    media_id = forms.ModelChoiceField(
+    media_id = AutocompleteModelChoiceField(
         queryset=Media.objects.none(),  # Initialement vide
+        url_name='app_bibliothecaire:autocomplete_medias',
         label="Sélectionner un média",
         required=False
     )
@@ -227,6 +295,8 @@ class LoanForm(forms.Form):
             self.fields['media_id'].queryset = Media.objects.filter(category=categorie, availability=True)
         else:
             self.fields['media_id'].queryset = Media.objects.filter(availability=True)
+        # Les suggestions de médias sont limitées à la catégorie choisie
+        self.fields['media_id'].widget.filters = {'categorie': categorie}
 
     def clean_loan_date(self):
         loan_date = self.cleaned_data['loan_date']
@@ -240,10 +310,10 @@ class LoanForm(forms.Form):
 
 
 class SelectBorrowerForm(forms.Form):
-    borrower = forms.ModelChoiceField(
+    borrower = AutocompleteModelChoiceField(
         queryset=Member.objects.all(),
+        url_name='app_bibliothecaire:autocomplete_members',
         label="Sélectionner un emprunteur",
-        widget=forms.Select
     )
 
 
@@ -262,6 +332,7 @@ class ReturnLoanForm(forms.Form):
     def __init__(self, *args, **kwargs):
         loan = kwargs.pop('loan', None)
         super().__init__(*args, **kwargs)
+        self.loan = loan
         if loan:
             self.fields['loan_id'].initial = loan.id
             self.fields['media_name'].initial = loan.media.name
@@ -272,10 +343,13 @@ class ReturnLoanForm(forms.Form):
         # Validation de la date de retour effective
         effective_return_date = self.cleaned_data['effective_return_date']
         loan_id = self.cleaned_data.get('loan_id')
-        try:
-            loan = Loan.objects.get(id=loan_id)
-        except Loan.DoesNotExist:
-            raise ValidationError("L'emprunt sélectionné n'existe pas.")
+        # L'emprunt déjà lu par la vue est réutilisé, sans nouvelle requête
+        loan = self.loan
+        if loan is None or loan.id != loan_id:
+            try:
+                loan = Loan.objects.get(id=loan_id)
+            except Loan.DoesNotExist:
+                raise ValidationError("L'emprunt sélectionné n'existe pas.")
 
         # Si date_retour_effective est un datetime, la convertir en date
         if isinstance(effective_return_date, datetime):
@@ -292,15 +366,72 @@ class ReturnLoanForm(forms.Form):
         return effective_return_date
 
     def save(self):
-        # Enregistre un retour d'emprunt
-        loan_id = self.cleaned_data['loan_id']
-        effective_return_date = self.cleaned_data['effective_return_date']
-        loan = Loan.objects.get(id=loan_id)
-
-        # Mise à jour de la date de retour effective
-        loan.effective_return_date = effective_return_date
-        loan.media.availability = True  # Rend le média disponible après retour
-        loan.media.save()
+        # Enregistre un retour d'emprunt : Loan.save() rend aussi le média disponible
+        loan = self.loan if self.loan is not None else Loan.objects.get(id=self.cleaned_data['loan_id'])
+        loan.effective_return_date = self.cleaned_data['effective_return_date']
         loan.save()
 
         return loan
+
+
+def parse_ids(value, max_size, label):
+    """ Convertit une liste d'identifiants saisis ou scannés (séparés par des retours à la ligne,
+    des espaces ou des virgules) en liste d'entiers.
+    Lève une exception ValidationError si un identifiant est invalide ou si la liste dépasse
+    max_size éléments ('label' désigne la liste dans le message).
+    """
+    values = value.replace(',', ' ').split()
+    # isdigit() seul accepte des chiffres Unicode ('²', '①') que int() refuse
+    invalid = [value for value in values if not (value.isascii() and value.isdigit())]
+    if invalid:
+        raise ValidationError(f"Identifiants invalides : {', '.join(invalid[:10])}")
+    if len(values) > max_size:
+        raise ValidationError(f"{label} est limité à {max_size} éléments.")
+    return [int(value) for value in values]
+
+
+class BatchLoanForm(forms.Form):
+    """ Emprunt de plusieurs médias par un même membre, enregistré en une fois. """
+    member_id = AutocompleteModelChoiceField(
+        queryset=Member.objects.all(),
+        url_name='app_bibliothecaire:autocomplete_members',
+        label="Sélectionner un membre",
+    )
+    media_ids = forms.CharField(
+        label="Médias empruntés",
+        help_text="Identifiants des médias, un par ligne (ou séparés par des espaces ou des virgules).",
+        widget=forms.Textarea(attrs={'rows': 4}),
+    )
+    loan_date = forms.DateField(
+        label="Date de l'emprunt",
+        initial=timezone.localdate,
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        input_formats=['%Y-%m-%d'],
+    )
+
+    def clean_media_ids(self):
+        return parse_ids(self.cleaned_data['media_ids'], MAX_ACTIVE_LOANS, "Un emprunt groupé")
+
+    def clean_loan_date(self):
+        loan_date = self.cleaned_data['loan_date']
+        if loan_date > timezone.localdate():
+            raise ValidationError("La date d'emprunt ne peut pas être dans le futur.")
+        return loan_date
+
+
+class BatchReturnForm(forms.Form):
+    """ Retour de plusieurs médias scannés au bac de retours. """
+    media_ids = forms.CharField(
+        label="Médias rendus",
+        help_text="Identifiants des médias, un par ligne (ou séparés par des espaces ou des virgules).",
+        widget=forms.Textarea(attrs={'rows': 12, 'autofocus': True}),
+    )
+    effective_return_date = forms.DateField(
+        label="Date de retour effective",
+        initial=timezone.localdate,
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        input_formats=['%Y-%m-%d'],
+    )
+
+    def clean_media_ids(self):
+        return parse_ids(self.cleaned_data['media_ids'], MAX_BATCH_SIZE, "Un lot de retours")
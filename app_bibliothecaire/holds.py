@@ -0,0 +1,156 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from app_bibliothecaire.events import publish_availability
+from app_bibliothecaire.models import Hold, Loan, Media, Member, allocate_holds
+from app_bibliothecaire.reminders import iter_member_batches
+
+# Nombre de membres prévenus par lot : un lot = une connexion au serveur de mail
+DEFAULT_BATCH_SIZE = 500
+
+SUBJECT = "Médiathèque : réservation disponible"
+
+
+def place_hold(member_id, media_id):
+    """ Réserve un média indisponible pour un membre, en fin de file d'attente.
+
+    Paramètres :
+        - member_id (int) : Identifiant du membre.
+        - media_id (int) : Identifiant du média.
+
+    Retour :
+        - Hold : La réservation créée (état WAITING).
+    Lève une exception ValueError si le membre ou le média n'existe pas, si le média est
+    disponible, s'il est déjà emprunté ou réservé par ce membre.
+    """
+    with transaction.atomic():
+        # Verrou du média : un retour simultané attribue le média avant ou après cette réservation
+        media = Media.objects.select_for_update().filter(pk=media_id).values('name', 'availability').first()
+        if media is None:
+            raise ValueError(f"Le média n° {media_id} n'existe pas.")
+        if not Member.objects.filter(pk=member_id).exists():
+            raise ValueError(f"Le membre n° {member_id} n'existe pas.")
+        if media['availability']:
+            raise ValueError(f"{media['name']} est disponible : il peut être emprunté directement.")
+        if Loan.objects.filter(media_id=media_id, borrower_id=member_id, effective_return_date__isnull=True).exists():
+            raise ValueError(f"{media['name']} est déjà emprunté par ce membre.")
+        try:
+            with transaction.atomic():
+                return Hold.objects.create(member_id=member_id, media_id=media_id)
+        except IntegrityError:
+            raise ValueError(f"Ce membre a déjà réservé {media['name']}.")
+
+
+def queue_position(hold):
+    """ Retourne le rang (à partir de 1) d'une réservation en attente dans la file de son média.
+    Les réservations qui la précèdent sont comptées dans l'index hold_queue_idx : le coût
+    croît avec le rang, ce qui reste négligeable pour des files de quelques dizaines de membres.
+    """
+    return Hold.objects.filter(
+        Q(created_at__lt=hold.created_at) | Q(created_at=hold.created_at, id__lt=hold.id),
+        media_id=hold.media_id, status=Hold.WAITING,
+    ).count() + 1
+
+
+def release_media(media_ids):
+    """ Remet en circulation des médias mis de côté dont la réservation a pris fin (annulation
+    ou expiration) : chacun passe à la réservation suivante de sa file, ou redevient disponible.
+    """
+    held = allocate_holds(media_ids)
+    freed = set(media_ids) - held
+    if freed:
+        Media.objects.filter(pk__in=freed).update(availability=True, modified_at=timezone.now())
+        publish_availability(freed, True)
+
+
+def cancel_hold(hold_id):
+    """ Annule une réservation en attente ou prête. Un média mis de côté passe à la réservation
+    suivante de sa file, ou redevient disponible.
+    Lève une exception ValueError si aucune réservation ouverte ne correspond.
+    """
+    with transaction.atomic():
+        hold = (Hold.objects.select_for_update()
+                .filter(pk=hold_id, status__in=[Hold.WAITING, Hold.READY]).values('media_id', 'status').first())
+        if hold is None:
+            raise ValueError("Aucune réservation en cours ne correspond.")
+        Hold.objects.filter(pk=hold_id).update(status=Hold.CANCELLED, closed_at=timezone.now())
+        if hold['status'] == Hold.READY:
+            release_media([hold['media_id']])
+
+
+def ready_holds(member_id):
+    """ Retourne les médias mis de côté pour un membre, du plus proche au plus lointain dernier
+    jour de retrait, lus dans l'index hold_ready_member_idx.
+
+    Retour :
+        - list : Un dict par réservation prête : id, media_id, media_name, ready_at, expires_on.
+    """
+    return list(Hold.objects.filter(member_id=member_id, status=Hold.READY)
+                .order_by('expires_on', 'id')
+                .values('id', 'media_id', 'ready_at', 'expires_on', media_name=F('media__name')))
+
+
+def expire_holds(today=None):
+    """ Clôt les réservations prêtes dont le dernier jour de retrait est passé ; leurs médias
+    passent à la réservation suivante de leur file, ou redeviennent disponibles.
+
+    Paramètres :
+        - today (date) : Date de référence (aujourd'hui par défaut).
+
+    Retour :
+        - int : Nombre de réservations expirées.
+    """
+    today = today or timezone.localdate()
+    with transaction.atomic():
+        expired = dict(Hold.objects.select_for_update()
+                       .filter(status=Hold.READY, expires_on__lt=today).values_list('id', 'media_id'))
+        if expired:
+            Hold.objects.filter(pk__in=expired, status=Hold.READY).update(status=Hold.EXPIRED,
+                                                                          closed_at=timezone.now())
+            release_media(set(expired.values()))
+    return len(expired)
+
+
+def build_message(member, holds):
+    """ Construit le message qui prévient un membre que des médias réservés l'attendent.
+
+    Paramètres :
+        - member (dict) : Nom ('name'), prénom ('first_name') et adresse ('email') du membre.
+        - holds (list) : Réservations prêtes, avec le titre du média ('media_name')
+          et le dernier jour de retrait ('expires_on').
+    """
+    lines = [f"Bonjour {member['first_name']} {member['name']},", "",
+             "Les médias que vous avez réservés vous attendent à la médiathèque :", ""]
+    for hold in holds:
+        lines.append(f"  - {hold['media_name']} : à emprunter avant le {hold['expires_on']:%d/%m/%Y} inclus")
+    lines += ["", "Passé ce délai, ils seront proposés au membre suivant.", "", "La médiathèque"]
+    return EmailMessage(SUBJECT, "\n".join(lines), settings.DEFAULT_FROM_EMAIL, [member['email']])
+
+
+def notify_ready_holds(batch_size=DEFAULT_BATCH_SIZE):
+    """ Prévient chaque membre dont des réservations viennent d'être mises de côté.
+
+    Les réservations d'un même membre sont regroupées dans un seul message. Les membres sont
+    parcourus par lots de 'batch_size' (voir reminders.iter_member_batches()) : les messages
+    d'un lot sont envoyés par une seule connexion au serveur de mail, puis les réservations
+    du lot marquées comme notifiées. Les membres sans adresse email ne sont pas prévenus.
+
+    Retour :
+        - tuple : (nombre de membres prévenus, nombre de réservations notifiées).
+    """
+    rows = (Hold.objects.filter(status=Hold.READY, notified_at__isnull=True)
+            .exclude(member__email__isnull=True).exclude(member__email='')
+            .order_by('member_id', 'expires_on', 'id')
+            .values('id', 'member_id', 'expires_on', media_name=F('media__name'),
+                    name=F('member__name'), first_name=F('member__first_name'), email=F('member__email')))
+    members = notified = 0
+    for batch in iter_member_batches(rows, 'member_id', batch_size):
+        with get_connection() as connection:
+            connection.send_messages([build_message(member, holds) for member, holds in batch])
+        hold_ids = [hold['id'] for _, holds in batch for hold in holds]
+        Hold.objects.filter(pk__in=hold_ids).update(notified_at=timezone.now())
+        members += len(batch)
+        notified += len(hold_ids)
+    return members, notified
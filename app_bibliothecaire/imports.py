@@ -0,0 +1,151 @@
+import csv
+import json
+from django.db import connection, transaction
+from app_bibliothecaire.models import Media, Book, Dvd, Cd, Board
+from app_bibliothecaire.forms import BookForm, DvdForm, CdForm, BoardForm
+
+# Nombre de médias écrits par transaction
+DEFAULT_BATCH_SIZE = 500
+
+# Pour chaque type de média : (modèle, formulaire de validation, champs propres au sous-type)
+MEDIA_TYPES = {
+    'book': (Book, BookForm, ('nb_pages',)),
+    'dvd': (Dvd, DvdForm, ('genre',)),
+    'cd': (Cd, CdForm, ('release_date',)),
+    'board': (Board, BoardForm, ('number_players_min', 'number_players_max')),
+}
+
+FORMATS = ('csv', 'jsonl')
+
+
+class ImportResult:
+    """ Bilan d'un import de médias.
+    Attributs :
+        created (int) : Nombre de médias créés.
+        errors (list) : Liste de (numéro de ligne, message d'erreur) des lignes rejetées.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+
+def read_rows(file, import_format):
+    """ Lit un fichier texte CSV (avec en-tête) ou JSONL et retourne (numéro de ligne, dict).
+    Les lignes JSONL illisibles sont retournées avec None, pour être signalées en erreur.
+    """
+    if import_format == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+    elif import_format == 'jsonl':
+        for line_num, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_num, row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f"Format d'import inconnu : {import_format}")
+
+
+def validate_row(row, default_type=None):
+    """ Valide une ligne avec le formulaire du type de média correspondant.
+
+    Les colonnes absentes prennent la valeur initiale du formulaire, comme pour une
+    saisie manuelle. Le type est lu dans la colonne 'type', ou vaut default_type.
+
+    Retour :
+        - (str, dict) : Le type de média et les données nettoyées.
+    Lève une exception ValueError si la ligne est invalide.
+    """
+    if row is None:
+        raise ValueError("Ligne illisible.")
+    media_type = row.get('type') or default_type
+    if media_type not in MEDIA_TYPES:
+        raise ValueError(f"Type de média inconnu : {media_type}")
+    _, form_class, _ = MEDIA_TYPES[media_type]
+    data = {}
+    for name, field in form_class.base_fields.items():
+        value = row.get(name)
+        data[name] = field.initial if value in (None, '') else value
+    form = form_class(data)
+    if not form.is_valid():
+        raise ValueError("; ".join(f"{field} : {' '.join(errors)}" for field, errors in form.errors.items()))
+    return media_type, form.cleaned_data
+
+
+def _insert_children(model, fields, parents, rows):
+    """ Insère les lignes de la table d'un sous-type pour des médias déjà créés.
+
+    bulk_create() refuse les modèles issus d'un héritage multi-table : la table
+    enfant ne contient que le lien vers Media et les champs propres au sous-type,
+    elle est donc remplie directement en un seul executemany.
+    """
+    opts = model._meta
+    columns = [opts.pk] + [opts.get_field(name) for name in fields]
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        connection.ops.quote_name(opts.db_table),
+        ", ".join(connection.ops.quote_name(field.column) for field in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+    params = [
+        [parent.pk] + [field.get_db_prep_save(data[field.name], connection) for field in columns[1:]]
+        for parent, data in zip(parents, rows)
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def _write_batch(batch):
+    """ Écrit un lot de lignes validées en une transaction :
+    les médias parents en masse, puis les lignes de chaque sous-type.
+    """
+    with transaction.atomic():
+        parents = Media.objects.bulk_create([
+            Media(name=data['name'],
+                  author=data['author'],
+                  availability=data['availability'],
+                  category=data['categorie'] or media_type)
+            for media_type, data in batch
+        ])
+        for media_type, (model, _, fields) in MEDIA_TYPES.items():
+            selected = [(parent, data) for parent, (row_type, data) in zip(parents, batch) if row_type == media_type]
+            if selected:
+                _insert_children(model, fields, *zip(*selected))
+    return len(parents)
+
+
+def import_media(rows, default_type=None, batch_size=DEFAULT_BATCH_SIZE):
+    """ Importe des médias par lots, en validant chaque ligne avec les formulaires d'ajout.
+
+    Une ligne invalide est signalée dans le bilan sans interrompre l'import.
+
+    Paramètres :
+        - rows (iterable) : Couples (numéro de ligne, dict), par exemple issus de read_rows().
+        - default_type (str) : Type des lignes sans colonne 'type' ('book', 'dvd', 'cd' ou 'board').
+        - batch_size (int) : Nombre de médias écrits par transaction.
+
+    Retour :
+        - ImportResult : Le bilan de l'import.
+    """
+    result = ImportResult()
+    batch = []
+    for line_num, row in rows:
+        try:
+            batch.append(validate_row(row, default_type))
+        except ValueError as e:
+            result.errors.append((line_num, str(e)))
+            continue
+        if len(batch) >= batch_size:
+            result.created += _write_batch(batch)
+            batch = []
+    if batch:
+        result.created += _write_batch(batch)
+    return result
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from app_bibliothecaire.barcodes import DEFAULT_BATCH_SIZE, MEDIA, MEMBER, assign_barcodes
+
+
+class Command(BaseCommand):
+    help = ("Attribue un code-barres aux médias et aux membres qui n'en ont pas encore "
+            "(M ou A suivi de l'identifiant sur 9 chiffres), pour l'impression des étiquettes et des cartes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=[MEDIA, MEMBER],
+                            help="Ne traite que les médias ou que les membres (les deux par défaut).")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Nombre de lignes modifiées par transaction.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être un entier positif.")
+        labels = {MEDIA: "médias", MEMBER: "membres"}
+        for kind in [options['only']] if options['only'] else [MEDIA, MEMBER]:
+            assigned, skipped = assign_barcodes(kind, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"{assigned} codes-barres attribués aux {labels[kind]}."))
+            if skipped:
+                self.stdout.write(self.style.WARNING(
+                    f"{skipped} {labels[kind]} laissés sans code : leur code est déjà porté par un autre élément."))
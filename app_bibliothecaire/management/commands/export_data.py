@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from app_bibliothecaire.exports import DATASETS, FORMATS, DEFAULT_CHUNK_SIZE, iter_export
+
+
+class Command(BaseCommand):
+    help = "Exporte les membres, les médias ou les emprunts en CSV ou JSONL, en flux continu."
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS), help="Jeu de données à exporter.")
+        parser.add_argument('--format', dest='export_format', choices=sorted(FORMATS), default='csv',
+                            help="Format d'export (csv par défaut).")
+        parser.add_argument('--output', '-o', help="Fichier de sortie (sortie standard par défaut).")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Nombre de lignes lues par requête.")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size doit être un entier positif.")
+        lines = iter_export(options['dataset'], options['export_format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                for line in lines:
+                    output.write(line)
+            self.stderr.write(f"Export '{options['dataset']}' écrit dans {options['output']}.")
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
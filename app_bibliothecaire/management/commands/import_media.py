@@ -0,0 +1,31 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from app_bibliothecaire.imports import MEDIA_TYPES, FORMATS, DEFAULT_BATCH_SIZE, read_rows, import_media
+
+
+class Command(BaseCommand):
+    help = "Importe des livres, DVD, CD et jeux de plateau depuis un fichier CSV ou JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier à importer.")
+        parser.add_argument('--format', dest='import_format', choices=FORMATS,
+                            help="Format du fichier (déduit de l'extension par défaut).")
+        parser.add_argument('--type', dest='media_type', choices=sorted(MEDIA_TYPES),
+                            help="Type des lignes sans colonne 'type'.")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Nombre de médias écrits par transaction.")
+
+    def handle(self, *args, **options):
+        import_format = options['import_format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if import_format not in FORMATS:
+            raise CommandError("Format inconnu : précisez --format csv ou --format jsonl.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être un entier positif.")
+
+        with open(options['path'], encoding='utf-8-sig', newline='') as file:
+            result = import_media(read_rows(file, import_format), options['media_type'], options['batch_size'])
+
+        for line_num, error in result.errors:
+            self.stderr.write(f"Ligne {line_num} : {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.created} médias importés, {result.rejected} lignes rejetées."))
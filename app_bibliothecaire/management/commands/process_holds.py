@@ -0,0 +1,23 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from app_bibliothecaire.holds import DEFAULT_BATCH_SIZE, expire_holds, notify_ready_holds
+
+
+class Command(BaseCommand):
+    help = ("Clôt les réservations prêtes non retirées à temps (leurs médias passent au membre suivant "
+            "de la file), puis prévient par email les membres dont des réservations sont prêtes. "
+            "La commande peut être planifiée chaque jour.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', dest='today', type=date.fromisoformat,
+                            help="Date de référence des expirations, au format AAAA-MM-JJ (aujourd'hui par défaut).")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Nombre de membres prévenus par connexion au serveur de mail.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être un entier positif.")
+        expired = expire_holds(options['today'])
+        members, holds = notify_ready_holds(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{expired} réservations expirées, {members} membres prévenus pour {holds} réservations prêtes."))
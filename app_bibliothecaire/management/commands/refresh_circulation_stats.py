@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from app_bibliothecaire.stats import refresh_circulation_stats
+
+
+class Command(BaseCommand):
+    help = ("Met à jour les statistiques quotidiennes de circulation (emprunts par catégorie, "
+            "titres les plus empruntés, durées et retards) pour les jours modifiés depuis le dernier calcul.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help="Recalcule toutes les journées, par exemple après la suppression d'emprunts.")
+
+    def handle(self, *args, **options):
+        days = refresh_circulation_stats(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"Statistiques recalculées pour {days} journées."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from app_bibliothecaire.models import refresh_loan_counters
+
+
+class Command(BaseCommand):
+    help = ("Recalcule les compteurs d'emprunts des membres (active_loan_count, earliest_due_date) "
+            "à partir de la table des emprunts.")
+
+    def handle(self, *args, **options):
+        updated = refresh_loan_counters()
+        self.stdout.write(self.style.SUCCESS(f"Compteurs recalculés pour {updated} membres."))
@@ -0,0 +1,25 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from app_bibliothecaire.reminders import DEFAULT_BATCH_SIZE, send_overdue_reminders
+
+
+class Command(BaseCommand):
+    help = ("Envoie un message de relance aux membres qui ont des emprunts en retard. "
+            "Chaque emprunt n'est relancé qu'une fois : la commande peut être planifiée chaque jour.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', dest='today', type=date.fromisoformat,
+                            help="Date de référence des retards, au format AAAA-MM-JJ (aujourd'hui par défaut).")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Nombre de membres relancés par connexion au serveur de mail.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Affiche le nombre de relances sans envoyer de message.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être un entier positif.")
+        result = send_overdue_reminders(options['today'], options['batch_size'], options['dry_run'])
+        action = "à relancer" if options['dry_run'] else "relancés"
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.members} membres {action} pour {result.loans} emprunts en retard "
+            f"({result.batches} lots)."))
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0016_rename_plateau_board_rename_livre_book_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['category', 'name', 'id'], name='media_catalogue_order_idx'),
+        ),
+    ]
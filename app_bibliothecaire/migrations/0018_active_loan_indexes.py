@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0017_media_catalogue_order_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('effective_return_date__isnull', True)), fields=['borrower', 'expected_return_date'], name='loan_active_borrower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('effective_return_date__isnull', True)), fields=['media'], name='loan_active_media_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('effective_return_date__isnull', True)), fields=['expected_return_date'], name='loan_active_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['category', 'availability'], name='media_category_avail_idx'),
+        ),
+    ]
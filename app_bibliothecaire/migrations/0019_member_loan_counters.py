@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_loan_counters(apps, schema_editor):
+    # Calcule les compteurs des membres existants à partir de leurs emprunts en cours
+    Member = apps.get_model('app_bibliothecaire', 'Member')
+    Loan = apps.get_model('app_bibliothecaire', 'Loan')
+    active_loans = Loan.objects.filter(borrower=OuterRef('pk'), effective_return_date__isnull=True)
+    Member.objects.update(
+        active_loan_count=Coalesce(Subquery(
+            active_loans.order_by().values('borrower').annotate(count=Count('pk')).values('count')
+        ), Value(0)),
+        earliest_due_date=Subquery(
+            active_loans.order_by('expected_return_date').values('expected_return_date')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0018_active_loan_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='active_loan_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='earliest_due_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_loan_counters, migrations.RunPython.noop),
+    ]
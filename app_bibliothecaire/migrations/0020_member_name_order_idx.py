@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0019_member_loan_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['name', 'first_name', 'id'], name='member_name_order_idx'),
+        ),
+    ]
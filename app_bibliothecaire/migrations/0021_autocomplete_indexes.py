@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0020_member_name_order_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['name', 'id'], name='media_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['first_name'], name='member_first_name_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# Table de recherche plein texte du catalogue (SQLite FTS5), une ligne par média (rowid = id du média).
+# Les déclencheurs la tiennent à jour pour toute écriture, y compris bulk_create() et update().
+FTS_TABLE = 'app_bibliothecaire_media_fts'
+
+CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, author, genre, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )""",
+    f"""INSERT INTO {FTS_TABLE} (rowid, name, author, genre)
+        SELECT media.id, media.name, media.author, COALESCE(dvd.genre, '')
+        FROM app_bibliothecaire_media AS media
+        LEFT JOIN app_bibliothecaire_dvd AS dvd ON dvd.media_ptr_id = media.id""",
+    f"""CREATE TRIGGER media_fts_insert AFTER INSERT ON app_bibliothecaire_media BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, name, author, genre) VALUES (new.id, new.name, new.author, '');
+    END""",
+    f"""CREATE TRIGGER media_fts_update AFTER UPDATE OF name, author ON app_bibliothecaire_media BEGIN
+        UPDATE {FTS_TABLE} SET name = new.name, author = new.author WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER media_fts_delete AFTER DELETE ON app_bibliothecaire_media BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER dvd_fts_insert AFTER INSERT ON app_bibliothecaire_dvd BEGIN
+        UPDATE {FTS_TABLE} SET genre = COALESCE(new.genre, '') WHERE rowid = new.media_ptr_id;
+    END""",
+    f"""CREATE TRIGGER dvd_fts_update AFTER UPDATE OF genre ON app_bibliothecaire_dvd BEGIN
+        UPDATE {FTS_TABLE} SET genre = COALESCE(new.genre, '') WHERE rowid = new.media_ptr_id;
+    END""",
+    f"""CREATE TRIGGER dvd_fts_delete AFTER DELETE ON app_bibliothecaire_dvd BEGIN
+        UPDATE {FTS_TABLE} SET genre = '' WHERE rowid = old.media_ptr_id;
+    END""",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS dvd_fts_delete",
+    "DROP TRIGGER IF EXISTS dvd_fts_update",
+    "DROP TRIGGER IF EXISTS dvd_fts_insert",
+    "DROP TRIGGER IF EXISTS media_fts_delete",
+    "DROP TRIGGER IF EXISTS media_fts_update",
+    "DROP TRIGGER IF EXISTS media_fts_insert",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def run_sqlite(statements):
+    # FTS5 n'existe que sous SQLite : les autres bases utilisent la recherche de repli
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0021_autocomplete_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
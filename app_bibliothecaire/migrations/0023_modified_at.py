@@ -0,0 +1,57 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:14
+
+from django.db import migrations, models
+
+FTS_TABLE = 'app_bibliothecaire_media_fts'
+
+# Sous SQLite, l'ajout d'une colonne NOT NULL reconstruit la table des médias,
+# ce qui supprime ses déclencheurs : ceux de 0022_media_fts sont recréés à l'identique.
+MEDIA_TRIGGERS_SQL = [
+    "DROP TRIGGER IF EXISTS media_fts_insert",
+    "DROP TRIGGER IF EXISTS media_fts_update",
+    "DROP TRIGGER IF EXISTS media_fts_delete",
+    f"""CREATE TRIGGER media_fts_insert AFTER INSERT ON app_bibliothecaire_media BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, name, author, genre) VALUES (new.id, new.name, new.author, '');
+    END""",
+    f"""CREATE TRIGGER media_fts_update AFTER UPDATE OF name, author ON app_bibliothecaire_media BEGIN
+        UPDATE {FTS_TABLE} SET name = new.name, author = new.author WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER media_fts_delete AFTER DELETE ON app_bibliothecaire_media BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+]
+
+
+def restore_media_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in MEDIA_TRIGGERS_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0022_media_fts'),
+    ]
+
+    operations = [
+        # En arrière, la suppression des colonnes reconstruit aussi la table : restauration en dernier
+        migrations.RunPython(migrations.RunPython.noop, restore_media_triggers),
+        migrations.AddField(
+            model_name='loan',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(restore_media_triggers, migrations.RunPython.noop),
+    ]
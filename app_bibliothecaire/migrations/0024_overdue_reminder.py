@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0023_modified_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OverdueReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sent_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('loan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reminder', to='app_bibliothecaire.loan')),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0024_overdue_reminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('category', models.CharField(choices=[('book', 'Book'), ('dvd', 'Dvd'), ('cd', 'Cd'), ('board', 'Board')], max_length=10)),
+                ('loans', models.PositiveIntegerField(default=0)),
+                ('returns', models.PositiveIntegerField(default=0)),
+                ('late_returns', models.PositiveIntegerField(default=0)),
+                ('loan_days', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyMediaStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('loans', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatsWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('modified_at', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['loan_date'], name='loan_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['effective_return_date'], name='loan_return_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycategorystats',
+            constraint=models.UniqueConstraint(fields=('day', 'category'), name='daily_category_stats_unique'),
+        ),
+        migrations.AddField(
+            model_name='dailymediastats',
+            name='media',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='app_bibliothecaire.media'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailymediastats',
+            constraint=models.UniqueConstraint(fields=('day', 'media'), name='daily_media_stats_unique'),
+        ),
+    ]
@@ -0,0 +1,137 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Modèle de lecture du catalogue : une ligne par média avec les colonnes de tous les sous-types.
+# Sous SQLite, c'est une table tenue à jour par des déclencheurs, pour toute écriture
+# (y compris bulk_create(), update() et l'import en masse). Ailleurs, c'est une vue SQL.
+# Attention : sous SQLite, une migration qui reconstruit la table d'un média ou d'un sous-type
+# supprime ses déclencheurs, qui doivent alors être recréés (voir 0023_modified_at).
+FLAT_TABLE = 'app_bibliothecaire_media_flat'
+
+# (sous-type, table, colonnes propres au sous-type)
+SUBTYPES = [
+    ('book', 'app_bibliothecaire_book', ['nb_pages']),
+    ('dvd', 'app_bibliothecaire_dvd', ['genre']),
+    ('cd', 'app_bibliothecaire_cd', ['release_date']),
+    ('board', 'app_bibliothecaire_board', ['number_players_min', 'number_players_max']),
+]
+
+SELECT_SQL = f"""
+    SELECT media.id, media.name, media.author, media.category, media.availability,
+           CASE WHEN book.media_ptr_id IS NOT NULL THEN 'book'
+                WHEN dvd.media_ptr_id IS NOT NULL THEN 'dvd'
+                WHEN cd.media_ptr_id IS NOT NULL THEN 'cd'
+                WHEN board.media_ptr_id IS NOT NULL THEN 'board' END AS subtype,
+           book.nb_pages, dvd.genre, cd.release_date, board.number_players_min, board.number_players_max
+    FROM app_bibliothecaire_media AS media
+    LEFT JOIN app_bibliothecaire_book AS book ON book.media_ptr_id = media.id
+    LEFT JOIN app_bibliothecaire_dvd AS dvd ON dvd.media_ptr_id = media.id
+    LEFT JOIN app_bibliothecaire_cd AS cd ON cd.media_ptr_id = media.id
+    LEFT JOIN app_bibliothecaire_board AS board ON board.media_ptr_id = media.id
+"""
+
+
+def sqlite_statements():
+    statements = [
+        f"""CREATE TABLE {FLAT_TABLE} (
+            id integer NOT NULL PRIMARY KEY,
+            name varchar(150) NOT NULL,
+            author varchar(250) NOT NULL,
+            category varchar(10) NOT NULL,
+            availability bool NOT NULL,
+            subtype varchar(10) NULL,
+            nb_pages integer NULL,
+            genre varchar(250) NULL,
+            release_date date NULL,
+            number_players_min integer NULL,
+            number_players_max integer NULL
+        )""",
+        # Ordre de la pagination par curseur du catalogue
+        f"CREATE INDEX media_flat_catalogue_order_idx ON {FLAT_TABLE} (category, name, id)",
+        f"INSERT INTO {FLAT_TABLE} {SELECT_SQL}",
+        f"""CREATE TRIGGER media_flat_insert AFTER INSERT ON app_bibliothecaire_media BEGIN
+            INSERT INTO {FLAT_TABLE} (id, name, author, category, availability)
+            VALUES (new.id, new.name, new.author, new.category, new.availability);
+        END""",
+        f"""CREATE TRIGGER media_flat_update AFTER UPDATE OF name, author, category, availability
+            ON app_bibliothecaire_media BEGIN
+            UPDATE {FLAT_TABLE} SET name = new.name, author = new.author, category = new.category,
+                availability = new.availability WHERE id = new.id;
+        END""",
+        f"""CREATE TRIGGER media_flat_delete AFTER DELETE ON app_bibliothecaire_media BEGIN
+            DELETE FROM {FLAT_TABLE} WHERE id = old.id;
+        END""",
+    ]
+    for subtype, table, columns in SUBTYPES:
+        assignments = ", ".join(f"{column} = new.{column}" for column in columns)
+        resets = ", ".join(f"{column} = NULL" for column in columns)
+        statements += [
+            f"""CREATE TRIGGER {subtype}_flat_insert AFTER INSERT ON {table} BEGIN
+                UPDATE {FLAT_TABLE} SET subtype = '{subtype}', {assignments} WHERE id = new.media_ptr_id;
+            END""",
+            f"""CREATE TRIGGER {subtype}_flat_update AFTER UPDATE OF {", ".join(columns)} ON {table} BEGIN
+                UPDATE {FLAT_TABLE} SET {assignments} WHERE id = new.media_ptr_id;
+            END""",
+            f"""CREATE TRIGGER {subtype}_flat_delete AFTER DELETE ON {table} BEGIN
+                UPDATE {FLAT_TABLE} SET subtype = NULL, {resets} WHERE id = old.media_ptr_id;
+            END""",
+        ]
+    return statements
+
+
+def create_read_model(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        statements = sqlite_statements()
+    else:
+        statements = [f"CREATE VIEW {FLAT_TABLE} AS {SELECT_SQL}"]
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_read_model(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for trigger in ['media'] + [subtype for subtype, _, _ in SUBTYPES]:
+            for event in ('insert', 'update', 'delete'):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}_flat_{event}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FLAT_TABLE}")
+    else:
+        schema_editor.execute(f"DROP VIEW IF EXISTS {FLAT_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0025_circulation_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaFlat',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=150)),
+                ('author', models.CharField(max_length=250)),
+                ('category', models.CharField(choices=[('book', 'Book'), ('dvd', 'Dvd'), ('cd', 'Cd'), ('board', 'Board')], max_length=10)),
+                ('availability', models.BooleanField()),
+                ('subtype', models.CharField(max_length=10, null=True)),
+                ('nb_pages', models.IntegerField(null=True)),
+                ('genre', models.CharField(max_length=250, null=True)),
+                ('release_date', models.DateField(null=True)),
+                ('number_players_min', models.IntegerField(null=True)),
+                ('number_players_max', models.IntegerField(null=True)),
+            ],
+            options={
+                'db_table': 'app_bibliothecaire_media_flat',
+                'managed': False,
+            },
+        ),
+        # Relation sans colonne (réutilise loan.media_id) : rien à modifier dans la base
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AddField(
+                model_name='loan',
+                name='media_flat',
+                field=models.ForeignObject(from_fields=['media'], on_delete=django.db.models.deletion.DO_NOTHING, related_name='loans', to='app_bibliothecaire.mediaflat', to_fields=['id']),
+            ),
+        ]),
+        migrations.RunPython(create_read_model, drop_read_model),
+    ]
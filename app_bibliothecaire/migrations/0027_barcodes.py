@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0026_media_flat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='media',
+            name='barcode',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='barcode',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='media',
+            constraint=models.UniqueConstraint(condition=models.Q(('barcode__isnull', False)), fields=('barcode',), name='media_barcode_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='member',
+            constraint=models.UniqueConstraint(condition=models.Q(('barcode__isnull', False)), fields=('barcode',), name='member_barcode_unique'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0027_barcodes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('waiting', 'En attente'), ('ready', 'Prête'), ('fulfilled', 'Satisfaite'), ('cancelled', 'Annulée'), ('expired', 'Expirée')], default='waiting', max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ready_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_on', models.DateField(blank=True, null=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('media', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='app_bibliothecaire.media')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='app_bibliothecaire.member')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'waiting')), fields=['media', 'created_at', 'id'], name='hold_queue_idx'), models.Index(condition=models.Q(('status', 'ready')), fields=['member', 'expires_on'], name='hold_ready_member_idx'), models.Index(condition=models.Q(('status', 'ready')), fields=['expires_on'], name='hold_ready_expiry_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['waiting', 'ready'])), fields=('media', 'member'), name='hold_open_unique')],
+            },
+        ),
+    ]
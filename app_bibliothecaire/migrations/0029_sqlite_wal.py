@@ -0,0 +1,31 @@
+from django.db import migrations
+
+# Le mode WAL est enregistré dans le fichier de la base : il est activé une fois pour toutes ici,
+# et non à chaque connexion, pour qu'une simple commande (check, makemigrations --check) ne
+# réécrive pas l'en-tête d'une base qui n'a pas été migrée. Les lectures ne bloquent plus
+# l'écriture, ni l'inverse. Le changement de mode est impossible dans une transaction.
+
+
+def enable_wal(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode = WAL")
+
+
+def disable_wal(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode = DELETE")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('app_bibliothecaire', '0028_holds'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_wal, disable_wal),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0029_sqlite_wal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsDirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+            ],
+        ),
+    ]
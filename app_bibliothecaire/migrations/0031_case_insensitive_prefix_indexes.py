@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:23
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0030_stats_dirty_day'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='member',
+            name='member_first_name_idx',
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='media_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='member_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(django.db.models.functions.text.Lower('first_name'), name='member_first_name_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+# Compteurs de suppressions des tables dont dépendent les validateurs des pages (ETag et version
+# des fragments en cache, voir app_bibliothecaire.conditional) : ils remplacent un COUNT(*) qui
+# parcourait chaque table, dont celle des emprunts, à chaque affichage.
+# Attention : sous SQLite, une migration qui reconstruit l'une de ces tables supprime son
+# déclencheur, qui doit alors être recréé (voir aussi 0026_media_flat).
+COUNTER_TABLE = 'app_bibliothecaire_tabledeletions'
+TRACKED_TABLES = ['app_bibliothecaire_media', 'app_bibliothecaire_loan', 'app_bibliothecaire_member']
+FUNCTION = 'app_bibliothecaire_count_deletions'
+
+
+def trigger_name(table):
+    return f"{table.removeprefix('app_bibliothecaire_')}_count_deletions"
+
+
+def create_counters(apps, schema_editor):
+    TableDeletions = apps.get_model('app_bibliothecaire', 'TableDeletions')
+    TableDeletions.objects.bulk_create(TableDeletions(table_name=table) for table in TRACKED_TABLES)
+    if schema_editor.connection.vendor == 'sqlite':
+        # Déclencheur par ligne, seule forme connue de SQLite
+        for table in TRACKED_TABLES:
+            schema_editor.execute(f"""CREATE TRIGGER {trigger_name(table)} AFTER DELETE ON {table} BEGIN
+                UPDATE {COUNTER_TABLE} SET deletions = deletions + 1 WHERE table_name = '{table}';
+            END""")
+    else:
+        # Un incrément par instruction DELETE, quel que soit le nombre de lignes supprimées
+        schema_editor.execute(f"""CREATE FUNCTION {FUNCTION}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                UPDATE {COUNTER_TABLE} SET deletions = deletions + 1 WHERE table_name = TG_TABLE_NAME;
+                RETURN NULL;
+            END $$""")
+        for table in TRACKED_TABLES:
+            schema_editor.execute(f"CREATE TRIGGER {trigger_name(table)} AFTER DELETE ON {table} "
+                                  f"FOR EACH STATEMENT EXECUTE FUNCTION {FUNCTION}()")
+
+
+def drop_counters(apps, schema_editor):
+    for table in TRACKED_TABLES:
+        if schema_editor.connection.vendor == 'sqlite':
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger_name(table)}")
+        else:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger_name(table)} ON {table}")
+    if schema_editor.connection.vendor != 'sqlite':
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {FUNCTION}()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bibliothecaire', '0031_case_insensitive_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableDeletions',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(max_length=100, unique=True)),
+                ('deletions', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_counters, drop_counters),
+    ]
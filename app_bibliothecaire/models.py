@@ -1,6 +1,9 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Least, Lower
 from django.utils import timezone
 from datetime import timedelta
+from app_bibliothecaire.events import publish_availability
 
 
 class Member(models.Model):
@@ -11,12 +14,35 @@ class Member(models.Model):
         email (str) : Adresse email du membre (facultatif).
         phone (str) : Numéro de téléphone du membre (facultatif).
         creation_date (datetime) : Date de création du compte du membre.
+        active_loan_count (int) : Nombre d'emprunts en cours (dénormalisé, tenu à jour par Loan).
+        earliest_due_date (date) : Plus proche date de retour prévue des emprunts en cours.
+        barcode (str) : Code-barres ou identifiant RFID de la carte du membre (unique, facultatif).
+        modified_at (datetime) : Date de la dernière modification (validateur des pages en cache).
     """
     name = models.fields.CharField(max_length=150)
     first_name = models.fields.CharField(max_length=150)
     email = models.EmailField(null=True, blank=True)
     phone = models.CharField(max_length=15, null=True, blank=True)
     creation_date = models.DateTimeField(default=timezone.now)
+    active_loan_count = models.PositiveIntegerField(default=0, editable=False)
+    earliest_due_date = models.DateField(null=True, blank=True, editable=False)
+    barcode = models.CharField(max_length=32, null=True, blank=True)
+    modified_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(fields=['name', 'first_name', 'id'], name='member_name_order_idx'),
+            # Recherche par début de nom ou de prénom, sans tenir compte de la casse (autocomplete.prefix_q)
+            models.Index(Lower('name'), name='member_name_lower_idx'),
+            models.Index(Lower('first_name'), name='member_first_name_lower_idx'),
+        ]
+        constraints = [
+            # Index unique partiel du code-barres (lecture de la carte au comptoir) : seuls les
+            # membres qui ont une carte y figurent
+            models.UniqueConstraint(fields=['barcode'], condition=Q(barcode__isnull=False),
+                                    name='member_barcode_unique'),
+        ]
 
     def __str__(self):
         """ Retourne une représentation textuelle de l'objet.
@@ -34,6 +60,8 @@ class Media(models.Model):
         availability (bool) : Indique si le média est disponible pour l'emprunt.
         borrower (Member) : Référence vers le membre ayant emprunté ce média.
         loan_date (datetime) : Date de l'emprunt.
+        barcode (str) : Code-barres ou identifiant RFID de l'exemplaire (unique, facultatif).
+        modified_at (datetime) : Date de la dernière modification (validateur des pages en cache).
     """
 
     CATEGORY_CHOICES = [
@@ -48,6 +76,55 @@ class Media(models.Model):
     availability = models.BooleanField(default=True)
     borrower = models.ForeignKey(Member, null=True, blank=True, on_delete=models.SET_NULL)
     loan_date = models.DateTimeField(null=True, blank=True)
+    barcode = models.CharField(max_length=32, null=True, blank=True)
+    modified_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Ordre de la pagination par curseur du catalogue
+            models.Index(fields=['category', 'name', 'id'], name='media_catalogue_order_idx'),
+            # Médias disponibles d'une catégorie (formulaire d'emprunt)
+            models.Index(fields=['category', 'availability'], name='media_category_avail_idx'),
+            # Ordre par titre (autocomplétion)
+            models.Index(fields=['name', 'id'], name='media_name_idx'),
+            # Recherche par début de titre, sans tenir compte de la casse (autocomplete.prefix_q)
+            models.Index(Lower('name'), name='media_name_lower_idx'),
+        ]
+        constraints = [
+            # Index unique partiel du code-barres (lecture de l'étiquette au comptoir). Sous SQLite,
+            # un index partiel est créé sans reconstruire la table ni supprimer ses déclencheurs.
+            models.UniqueConstraint(fields=['barcode'], condition=Q(barcode__isnull=False),
+                                    name='media_barcode_unique'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class MediaFlat(models.Model):
+    """ Modèle de lecture du catalogue : une ligne par média, avec les champs de tous les sous-types.
+    Sous SQLite, la table est tenue à jour par des déclencheurs sur Media et ses sous-types
+    (migration 0026_media_flat) ; sur les autres bases, c'est une vue SQL.
+    Les listes, la recherche et l'export la lisent sans jointure ; les écritures passent par Media.
+    Attributs :
+        subtype (str) : Sous-type du média ('book', 'dvd', 'cd', 'board'), ou None.
+        Les autres attributs reprennent ceux de Media, Book, Dvd, Cd et Board.
+    """
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=150)
+    author = models.CharField(max_length=250)
+    category = models.CharField(max_length=10, choices=Media.CATEGORY_CHOICES)
+    availability = models.BooleanField()
+    subtype = models.CharField(max_length=10, null=True)
+    nb_pages = models.IntegerField(null=True)
+    genre = models.CharField(max_length=250, null=True)
+    release_date = models.DateField(null=True)
+    number_players_min = models.IntegerField(null=True)
+    number_players_max = models.IntegerField(null=True)
+
+    class Meta:
+        managed = False
+        db_table = 'app_bibliothecaire_media_flat'
 
     def __str__(self):
         return self.name
@@ -79,6 +156,34 @@ def get_default_loan_date():
     return timezone.now().date() + timedelta(days=7)
 
 
+def active_loan_count_subquery():
+    # Nombre d'emprunts en cours du membre de la requête externe
+    return Coalesce(Subquery(
+        Loan.objects.filter(borrower=OuterRef('pk'), effective_return_date__isnull=True)
+        .order_by().values('borrower').annotate(count=Count('pk')).values('count')
+    ), Value(0))
+
+
+def earliest_due_date_subquery():
+    # Plus proche date de retour prévue des emprunts en cours du membre de la requête externe
+    return Subquery(
+        Loan.objects.filter(borrower=OuterRef('pk'), effective_return_date__isnull=True)
+        .order_by('expected_return_date').values('expected_return_date')[:1]
+    )
+
+
+def refresh_loan_counters(members=None):
+    """ Recalcule active_loan_count et earliest_due_date à partir de la table des emprunts,
+    en une seule requête UPDATE pour l'ensemble des membres (ou pour le queryset donné).
+    Retourne le nombre de membres mis à jour.
+    """
+    if members is None:
+        members = Member.objects.all()
+    return members.update(active_loan_count=active_loan_count_subquery(),
+                          earliest_due_date=earliest_due_date_subquery(),
+                          modified_at=timezone.now())
+
+
 class Loan(models.Model):
     """ Modèle de base de l'emprunt d'un média par un membre.
     Attributs :
@@ -87,6 +192,7 @@ class Loan(models.Model):
         loan_date (datetime) : Date de l'emprunt.
         expected_return_date (date) : Date prévue pour le retour.
         effective_return_date (date) : Date réelle du retour.
+        modified_at (datetime) : Date de la dernière modification (validateur des pages en cache).
     """
     borrower = models.ForeignKey(
         Member,
@@ -98,36 +204,97 @@ class Loan(models.Model):
         on_delete=models.CASCADE,
         related_name="loans"
     )
+    # Même colonne que media, vue depuis le modèle de lecture (préchargement des emprunts en cours)
+    media_flat = models.ForeignObject(
+        MediaFlat,
+        on_delete=models.DO_NOTHING,
+        from_fields=['media'],
+        to_fields=['id'],
+        related_name="loans"
+    )
     loan_date = models.DateTimeField(null=True, blank=True)
     expected_return_date = models.DateField(default=get_default_loan_date)
     effective_return_date = models.DateField(null=True, blank=True)
+    modified_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        # Index partiels : seuls les emprunts en cours (non rendus) y figurent,
+        # ils restent donc petits quelle que soit la taille de l'historique.
+        indexes = [
+            # Emprunts en cours d'un membre, et ses retards
+            models.Index(fields=['borrower', 'expected_return_date'],
+                         condition=Q(effective_return_date__isnull=True),
+                         name='loan_active_borrower_idx'),
+            # Emprunt en cours d'un média
+            models.Index(fields=['media'],
+                         condition=Q(effective_return_date__isnull=True),
+                         name='loan_active_media_idx'),
+            # Emprunts en retard, tous membres confondus
+            models.Index(fields=['expected_return_date'],
+                         condition=Q(effective_return_date__isnull=True),
+                         name='loan_active_due_idx'),
+            # Emprunts et retours d'une journée (recalcul des statistiques quotidiennes)
+            models.Index(fields=['loan_date'], name='loan_date_idx'),
+            models.Index(fields=['effective_return_date'], name='loan_return_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.media.name} emprunté par {self.borrower}"
 
-    def check_borrowing_limit(self):
+    def borrower_loan_status(self):
+        """ Retourne le nombre d'emprunts actifs du membre et un booléen indiquant si l'un
+        d'eux a dépassé sa date de retour prévue, lus dans les compteurs de la ligne du membre.
+        """
+        active_loan_count, earliest_due_date = Member.objects.values_list(
+            'active_loan_count', 'earliest_due_date').get(pk=self.borrower_id)
+        return active_loan_count, earliest_due_date is not None and earliest_due_date < timezone.now().date()
+
+    def reserve_borrower(self):
+        """ Compte l'emprunt dans les compteurs du membre par un UPDATE conditionnel,
+        qui n'aboutit que si le membre a moins de 3 emprunts actifs et aucun retard.
+        La ligne du membre reste verrouillée jusqu'à la fin de la transaction :
+        deux emprunts simultanés pour un même membre sont traités l'un après l'autre.
+        Lève une exception ValueError avec le motif du refus sinon.
+        """
+        due_date = Value(self.expected_return_date, output_field=models.DateField())
+        reserved = (Member.objects
+                    .filter(pk=self.borrower_id, active_loan_count__lt=3)
+                    .exclude(earliest_due_date__lt=timezone.now().date())
+                    .update(active_loan_count=F('active_loan_count') + 1,
+                            earliest_due_date=Least(Coalesce(F('earliest_due_date'), due_date), due_date),
+                            modified_at=timezone.now()))
+        if not reserved:
+            active_loans, has_late_loans = self.borrower_loan_status()
+            self.check_borrowing_limit(active_loans)
+            self.check_late_loans(has_late_loans)
+            raise ValueError(f"{self.borrower} ne peut pas emprunter de nouveaux médias.")
+
+    def release_borrower(self):
+        # Retire l'emprunt rendu des compteurs du membre
+        Member.objects.filter(pk=self.borrower_id).update(
+            active_loan_count=F('active_loan_count') - 1,
+            earliest_due_date=earliest_due_date_subquery(),
+            modified_at=timezone.now(),
+        )
+
+    def check_borrowing_limit(self, active_loans=None):
         """ Vérifie si le membre a atteint la limite de 3 emprunts actifs
         et
         lève une exception ValueError si la limite est atteinte.
         """
-        active_loans = Loan.objects.filter(
-            borrower=self.borrower,
-            effective_return_date__isnull=True
-        ).count()
+        if active_loans is None:
+            active_loans, _ = self.borrower_loan_status()
         if active_loans >= 3:
             raise ValueError(f"{self.borrower} a déjà 3 emprunts actifs")
 
-    def check_late_loans(self):
+    def check_late_loans(self, has_late_loans=None):
         """ Vérifie si le membre a des emprunts en retard
         et
         lève une exception ValueError si un retard est détecté.
         """
-        late_loans = Loan.objects.filter(
-            borrower=self.borrower,
-            effective_return_date__isnull=True,
-            expected_return_date__lt=timezone.now().date()
-        )
-        if late_loans.exists():
+        if has_late_loans is None:
+            _, has_late_loans = self.borrower_loan_status()
+        if has_late_loans:
             raise ValueError(
                 f"{self.borrower} a des emprunts en retard et ne peut paas emprunter de nouveaux médias.")
 
@@ -135,29 +302,273 @@ class Loan(models.Model):
         if not self.media.availability:
             raise ValueError(f"{self.media.name} n'est pas disponible à l'emprunt.")
 
+    def reserve_media(self):
+        """ Marque le média comme non disponible s'il l'est encore, par un UPDATE conditionnel
+        (UPDATE ... WHERE availability = TRUE), et lève une exception ValueError sinon.
+        Entre deux emprunts simultanés du même média, seul le premier UPDATE modifie la ligne.
+        """
+        reserved = (Media.objects.filter(pk=self.media_id, availability=True)
+                    .update(availability=False, modified_at=timezone.now()))
+        # Un média mis de côté pour l'emprunteur (réservation prête) reste indisponible pour les autres
+        if not reserved and not self.claim_hold():
+            raise ValueError(f"{self.media.name} n'est pas disponible à l'emprunt.")
+        if reserved:
+            publish_availability([self.media_id], False)
+        self.media.availability = False
+
+    def claim_hold(self):
+        """ Satisfait la réservation prête de l'emprunteur pour ce média, par un UPDATE conditionnel.
+        Retourne True si le média était mis de côté pour l'emprunteur.
+        """
+        return bool(Hold.objects.filter(media_id=self.media_id, member_id=self.borrower_id, status=Hold.READY)
+                    .update(status=Hold.FULFILLED, closed_at=timezone.now()))
+
     def mark_media_as_available(self):
+        # Un seul UPDATE de la ligne parente, quel que soit le sous-type du média.
+        # update() ne renseigne pas les champs auto_now : modified_at est donc passé explicitement.
+        Media.objects.filter(pk=self.media_id).update(availability=True, modified_at=timezone.now())
+        publish_availability([self.media_id], True)
         self.media.availability = True
-        self.media.save()
 
     def mark_media_as_unavailable(self):
+        Media.objects.filter(pk=self.media_id).update(availability=False, modified_at=timezone.now())
+        publish_availability([self.media_id], False)
         self.media.availability = False
-        self.media.save()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Dates lues en base, comparées à l'enregistrement pour repérer une correction
+        # (voir signals.mark_corrected_loan_days) sans relire l'emprunt
+        instance = super().from_db(db, field_names, values)
+        if 'loan_date' in field_names and 'effective_return_date' in field_names:
+            instance.loaded_dates = (instance.loan_date, instance.effective_return_date)
+        return instance
 
     def save(self, *args, **kwargs):
         """ Save applique les règles de validation avant l'enregistrement :
                 - Vérifie les emprunts en cours.
                 - Vérifie la disponibilité du média.
                 - Marque le média comme non disponible si l'emprunt est actif.
+                - Au retour, attribue le média à la première réservation en attente (voir Hold).
+            La création d'un emprunt est atomique : le média puis le membre sont réservés par
+            des UPDATE conditionnels, et tout est annulé si l'une des vérifications échoue.
+            Les compteurs d'emprunts du membre sont mis à jour à la création et au retour.
         """
         if self.effective_return_date:
-            self.mark_media_as_available()
+            with transaction.atomic():
+                # Seul le premier enregistrement du retour décrémente les compteurs du membre
+                returned = not self._state.adding and Loan.objects.filter(
+                    pk=self.pk, effective_return_date__isnull=True
+                ).update(effective_return_date=self.effective_return_date)
+                # Le média rendu est mis de côté pour la première réservation de sa file, s'il y en a une.
+                # Un emprunt déjà rendu, enregistré à nouveau (correction d'une date), ne touche pas au
+                # média : il a pu être emprunté de nouveau ou attribué à une réservation depuis.
+                if returned:
+                    if allocate_holds([self.media_id]):
+                        self.media.availability = False
+                    else:
+                        self.mark_media_as_available()
+                super().save(*args, **kwargs)
+                if returned:
+                    self.release_borrower()
+        elif not self._state.adding:
+            super().save(*args, **kwargs)
         else:
-            self.check_availability_media()
-            self.check_borrowing_limit()
-            self.check_late_loans()
             if not self.loan_date:
                 self.loan_date = timezone.now().date()
             if not self.expected_return_date:
                 self.expected_return_date = self.loan_date + timedelta(days=7)
-            self.mark_media_as_unavailable()
-        super().save(*args, **kwargs)
+            with transaction.atomic():
+                # Le média est réservé en premier : sous SQLite, cet UPDATE prend le verrou
+                # d'écriture de la base et sérialise les créations d'emprunts concurrentes.
+                self.reserve_media()
+                self.reserve_borrower()
+                super().save(*args, **kwargs)
+
+
+class Hold(models.Model):
+    """ Réservation d'un média indisponible par un membre.
+    Les réservations d'un média forment une file d'attente (premier arrivé, premier servi) :
+    au retour du média, la plus ancienne réservation en attente passe à l'état « prête »
+    et le média reste indisponible pour les autres membres jusqu'à son emprunt
+    par le réservataire ou l'expiration de la réservation.
+    Attributs :
+        media (Media) : Média réservé.
+        member (Member) : Membre qui réserve.
+        status (str) : WAITING (en file), READY (média mis de côté), FULFILLED (média emprunté),
+                       CANCELLED (annulée) ou EXPIRED (média non retiré à temps).
+        created_at (datetime) : Date de la réservation (ordre de la file).
+        ready_at (datetime) : Date à laquelle le média a été mis de côté.
+        expires_on (date) : Dernier jour pour emprunter le média mis de côté.
+        notified_at (datetime) : Date du message qui prévient le membre.
+        closed_at (datetime) : Date de fin de la réservation (emprunt, annulation ou expiration).
+    """
+    WAITING = 'waiting'
+    READY = 'ready'
+    FULFILLED = 'fulfilled'
+    CANCELLED = 'cancelled'
+    EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (WAITING, 'En attente'),
+        (READY, 'Prête'),
+        (FULFILLED, 'Satisfaite'),
+        (CANCELLED, 'Annulée'),
+        (EXPIRED, 'Expirée'),
+    ]
+    # Nombre de jours pendant lesquels un média rendu reste mis de côté
+    PICKUP_DAYS = 7
+
+    media = models.ForeignKey(Media, on_delete=models.CASCADE, related_name='holds')
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='holds')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=WAITING)
+    created_at = models.DateTimeField(default=timezone.now)
+    ready_at = models.DateTimeField(null=True, blank=True)
+    expires_on = models.DateField(null=True, blank=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Index partiels : seules les réservations ouvertes y figurent
+        indexes = [
+            # File d'attente d'un média : tête de file et rang d'une réservation
+            models.Index(fields=['media', 'created_at', 'id'], condition=Q(status='waiting'),
+                         name='hold_queue_idx'),
+            # Réservations prêtes d'un membre, et celles qui expirent
+            models.Index(fields=['member', 'expires_on'], condition=Q(status='ready'),
+                         name='hold_ready_member_idx'),
+            models.Index(fields=['expires_on'], condition=Q(status='ready'), name='hold_ready_expiry_idx'),
+        ]
+        constraints = [
+            # Une seule réservation ouverte par membre et par média
+            models.UniqueConstraint(fields=['media', 'member'], condition=Q(status__in=['waiting', 'ready']),
+                                    name='hold_open_unique'),
+        ]
+
+    def __str__(self):
+        return f"Réservation de {self.media_id} par {self.member_id} ({self.status})"
+
+
+def allocate_holds(media_ids):
+    """ Met de côté chaque média rendu pour la plus ancienne réservation en attente de sa file.
+
+    La tête de chaque file est lue dans l'index hold_queue_idx (une recherche par média),
+    puis les réservations trouvées passent à l'état READY par un seul UPDATE.
+    Les médias attribués doivent rester indisponibles : l'appelant ne rend disponibles que les autres.
+
+    Paramètres :
+        - media_ids (list) : Identifiants des médias rendus.
+
+    Retour :
+        - set : Identifiants des médias mis de côté.
+    """
+    first_waiting = (Hold.objects.filter(media=OuterRef('pk'), status=Hold.WAITING)
+                     .order_by('created_at', 'id').values('id')[:1])
+    heads = dict(Media.objects.filter(pk__in=media_ids)
+                 .annotate(hold_id=Subquery(first_waiting))
+                 .filter(hold_id__isnull=False)
+                 .values_list('hold_id', 'id'))
+    if heads:
+        Hold.objects.filter(pk__in=heads, status=Hold.WAITING).update(
+            status=Hold.READY, ready_at=timezone.now(),
+            expires_on=timezone.localdate() + timedelta(days=Hold.PICKUP_DAYS))
+    return set(heads.values())
+
+
+class OverdueReminder(models.Model):
+    """ Relance envoyée pour un emprunt en retard.
+    Une relance est enregistrée par emprunt : une nouvelle exécution de la commande
+    send_overdue_reminders ne relance pas deux fois le même emprunt.
+    Attributs :
+        loan (Loan) : Emprunt en retard qui a fait l'objet de la relance.
+        sent_at (datetime) : Date d'envoi du message.
+    """
+    loan = models.OneToOneField(Loan, on_delete=models.CASCADE, related_name='reminder')
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Relance du {self.sent_at:%d/%m/%Y} pour {self.loan_id}"
+
+
+class DailyCategoryStats(models.Model):
+    """ Statistiques de circulation d'une catégorie de médias pour une journée.
+    Table d'agrégats recalculée par la commande refresh_circulation_stats.
+    Attributs :
+        day (date) : Journée concernée.
+        category (str) : Catégorie des médias.
+        loans (int) : Nombre d'emprunts commencés ce jour-là.
+        returns (int) : Nombre de retours ce jour-là.
+        late_returns (int) : Nombre de retours effectués après la date prévue.
+        loan_days (int) : Durée cumulée, en jours, des emprunts rendus ce jour-là.
+    """
+    day = models.DateField()
+    category = models.CharField(max_length=10, choices=Media.CATEGORY_CHOICES)
+    loans = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+    late_returns = models.PositiveIntegerField(default=0)
+    loan_days = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category'], name='daily_category_stats_unique'),
+        ]
+
+
+class DailyMediaStats(models.Model):
+    """ Nombre d'emprunts d'un média pour une journée (classement des titres les plus empruntés).
+    Attributs :
+        day (date) : Journée concernée.
+        media (Media) : Média emprunté.
+        loans (int) : Nombre d'emprunts du média commencés ce jour-là.
+    """
+    day = models.DateField()
+    media = models.ForeignKey(Media, on_delete=models.CASCADE, related_name='daily_stats')
+    loans = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'media'], name='daily_media_stats_unique'),
+        ]
+
+
+class StatsWatermark(models.Model):
+    """ Point de reprise du recalcul incrémental d'une table d'agrégats.
+    Attributs :
+        name (str) : Nom des statistiques (par exemple 'circulation').
+        modified_at (datetime) : Plus grande date de modification des emprunts déjà pris en compte.
+        refreshed_at (datetime) : Date du dernier recalcul.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    modified_at = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} : {self.modified_at}"
+
+
+class StatsDirtyDay(models.Model):
+    """ Journée dont les statistiques de circulation sont à recalculer alors qu'aucun emprunt
+    modifié ne la porte plus : ancien jour d'emprunt ou de retour d'un emprunt corrigé.
+    Les lignes sont supprimées par le recalcul qui les prend en compte.
+    Attributs :
+        day (date) : Journée concernée.
+    """
+    day = models.DateField()
+
+    def __str__(self):
+        return str(self.day)
+
+
+class TableDeletions(models.Model):
+    """ Compteur des suppressions d'une table, incrémenté par un déclencheur AFTER DELETE
+    (migration 0032_table_deletions) : il change à chaque suppression, quelle qu'en soit la forme
+    (delete() d'un objet ou d'un queryset, cascade, SQL brut), et se lit sans parcourir la table.
+    Attention : sous SQLite, une migration qui reconstruit une table suivie supprime son déclencheur.
+    Attributs :
+        table_name (str) : Nom de la table suivie.
+        deletions (int) : Nombre de suppressions (lignes sous SQLite, instructions DELETE ailleurs).
+    """
+    table_name = models.CharField(max_length=100, unique=True)
+    deletions = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.table_name} : {self.deletions}"
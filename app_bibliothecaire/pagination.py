@@ -0,0 +1,129 @@
+import base64
+import binascii
+import json
+from django.db.models import Q
+
+# Nombre d'éléments par page par défaut, et maximum accepté
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Ordres de tri paginables : des colonnes texte, puis l'identifiant pour départager
+CATALOGUE_ORDERING = ('category', 'name', 'id')
+MEMBER_ORDERING = ('name', 'first_name', 'id')
+
+
+def encode_cursor(obj, ordering=CATALOGUE_ORDERING):
+    """ Encode la position d'un objet dans l'ordre de tri en jeton opaque pour l'URL.
+    Pour le catalogue, la position est (category, name, id).
+    """
+    payload = json.dumps([getattr(obj, field) for field in ordering], ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token, ordering=CATALOGUE_ORDERING):
+    """ Décode un jeton produit par encode_cursor() et retourne la position, par exemple
+    (category, name, id) pour le catalogue.
+    Lève une exception ValueError si le jeton est invalide.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise ValueError("Curseur de pagination invalide.")
+    if (not isinstance(values, list) or len(values) != len(ordering)
+            or not all(isinstance(value, str) for value in values[:-1])
+            or not isinstance(values[-1], int) or isinstance(values[-1], bool)):
+        raise ValueError("Curseur de pagination invalide.")
+    return tuple(values)
+
+
+def parse_page_size(value):
+    """ Convertit le paramètre 'page_size' en entier compris entre 1 et MAX_PAGE_SIZE. """
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Taille de page invalide.")
+    if page_size < 1:
+        raise ValueError("Taille de page invalide.")
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+class KeysetPage:
+    """ Page obtenue par pagination par clé (keyset).
+    Attributs :
+        items (list) : Éléments de la page, dans l'ordre de tri.
+        next_cursor (str) : Jeton de la page suivante, ou None s'il s'agit de la dernière page.
+        page_size (int) : Taille de page demandée.
+    """
+
+    def __init__(self, items, next_cursor, page_size):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.page_size = page_size
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def _after_cursor(queryset, cursor, ordering):
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, ordering)
+        # (a, b, c) > (x, y, z) : a > x, ou a = x et b > y, ou a = x, b = y et c > z
+        after = Q()
+        for i, field in enumerate(ordering):
+            equal = dict(zip(ordering[:i], values[:i]))
+            after |= Q(**equal, **{f'{field}__gt': values[i]})
+        queryset = queryset.filter(after)
+    return queryset
+
+
+def _make_page(items, page_size, ordering):
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1], ordering)
+    return KeysetPage(items, next_cursor, page_size)
+
+
+def keyset_page(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE, ordering=CATALOGUE_ORDERING):
+    """ Retourne la page qui suit le curseur, sans OFFSET.
+
+    La requête reprend directement après le dernier élément de la page précédente
+    (WHERE (category, name, id) > curseur pour le catalogue), ce qui s'appuie sur
+    l'index correspondant à l'ordre de tri : le coût d'une page ne dépend pas de sa profondeur.
+
+    Paramètres :
+        - queryset (QuerySet) : Éléments à paginer.
+        - cursor (str) : Jeton de la page précédente (None pour la première page).
+        - page_size (int) : Nombre d'éléments par page.
+        - ordering (tuple) : Ordre de tri, dont le dernier champ est l'identifiant.
+
+    Retour :
+        - KeysetPage : La page demandée.
+    """
+    # Un élément de plus permet de savoir s'il existe une page suivante
+    items = list(_after_cursor(queryset, cursor, ordering)[:page_size + 1])
+    return _make_page(items, page_size, ordering)
+
+
+async def akeyset_page(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE, ordering=CATALOGUE_ORDERING):
+    """ Version asynchrone de keyset_page(), pour les vues asynchrones. """
+    items = [item async for item in _after_cursor(queryset, cursor, ordering)[:page_size + 1]]
+    return _make_page(items, page_size, ordering)
+
+
+def page_from_request(request, queryset, ordering=CATALOGUE_ORDERING):
+    """ Pagine le queryset à partir des paramètres GET 'cursor' et 'page_size'.
+    Lève une exception ValueError si l'un des paramètres est invalide.
+    """
+    page_size = parse_page_size(request.GET.get('page_size'))
+    return keyset_page(queryset, request.GET.get('cursor'), page_size, ordering)
+
+
+async def apage_from_request(request, queryset, ordering=CATALOGUE_ORDERING):
+    """ Version asynchrone de page_from_request(). """
+    page_size = parse_page_size(request.GET.get('page_size'))
+    return await akeyset_page(queryset, request.GET.get('cursor'), page_size, ordering)
@@ -0,0 +1,128 @@
+from itertools import groupby
+from operator import itemgetter
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+from app_bibliothecaire.models import Loan, OverdueReminder
+
+# Nombre de membres relancés par lot : un lot = une connexion au serveur de mail
+DEFAULT_BATCH_SIZE = 500
+
+SUBJECT = "Médiathèque : emprunt(s) en retard"
+
+
+class ReminderResult:
+    """ Bilan d'un envoi de relances.
+    Attributs :
+        members (int) : Nombre de membres relancés.
+        loans (int) : Nombre d'emprunts en retard relancés.
+        batches (int) : Nombre de lots (connexions au serveur de mail).
+    """
+
+    def __init__(self):
+        self.members = 0
+        self.loans = 0
+        self.batches = 0
+
+
+def overdue_loans(today=None):
+    """ Retourne les emprunts en cours en retard qui n'ont pas encore été relancés.
+    Le filtre correspond à l'index partiel des emprunts en cours (borrower, expected_return_date).
+    """
+    today = today or timezone.now().date()
+    return (Loan.objects
+            .filter(effective_return_date__isnull=True, expected_return_date__lt=today)
+            .exclude(Exists(OverdueReminder.objects.filter(loan=OuterRef('pk')))))
+
+
+def build_message(member, loans, today):
+    """ Construit le message de relance d'un membre pour ses emprunts en retard.
+
+    Paramètres :
+        - member (dict) : Nom ('name'), prénom ('first_name') et adresse ('email') du membre.
+        - loans (list) : Emprunts en retard, avec le titre du média ('media_name')
+          et la date de retour prévue ('expected_return_date').
+        - today (date) : Date de référence des retards.
+    """
+    lines = [f"Bonjour {member['first_name']} {member['name']},", "",
+             "Les médias suivants auraient dû être rendus à la médiathèque :", ""]
+    for loan in loans:
+        days = (today - loan['expected_return_date']).days
+        lines.append(f"  - {loan['media_name']} : retour prévu le {loan['expected_return_date']:%d/%m/%Y} "
+                     f"({days} jour(s) de retard)")
+    lines += ["", "Merci de les rapporter au plus vite.", "", "La médiathèque"]
+    return EmailMessage(SUBJECT, "\n".join(lines), settings.DEFAULT_FROM_EMAIL, [member['email']])
+
+
+def iter_member_batches(rows, member_field, batch_size):
+    """ Parcourt des lignes par lots de 'batch_size' membres, par pagination par clé sur
+    l'identifiant du membre : chaque lot ne charge que les lignes de ses membres, la mémoire
+    ne dépend donc pas du nombre total de lignes.
+
+    Paramètres :
+        - rows (QuerySet) : Lignes values(), triées d'abord par 'member_field'. Chacune porte
+          aussi le nom ('name'), le prénom ('first_name') et l'adresse ('email') du membre.
+        - member_field (str) : Champ de l'identifiant du membre ('borrower_id', 'member_id').
+        - batch_size (int) : Nombre de membres par lot.
+
+    Retour :
+        - generator : Un lot par itération, liste de couples (membre, lignes du membre),
+          la première ligne du membre tenant lieu de membre.
+    """
+    last_member = 0
+    while True:
+        member_ids = list(rows.filter(**{f'{member_field}__gt': last_member})
+                          .order_by(member_field).values_list(member_field, flat=True)
+                          .distinct()[:batch_size])
+        if not member_ids:
+            return
+        last_member = member_ids[-1]
+        batch = rows.filter(**{f'{member_field}__in': member_ids})
+        groups = (list(group) for _, group in groupby(batch, key=itemgetter(member_field)))
+        yield [(member_rows[0], member_rows) for member_rows in groups]
+
+
+def _iter_batches(today, batch_size):
+    loans = overdue_loans(today).exclude(borrower__email__isnull=True).exclude(borrower__email='')
+    # values() plutôt que des instances : seules les colonnes du message sont lues
+    rows = (loans.order_by('borrower_id', 'expected_return_date', 'id')
+            .values('id', 'expected_return_date', 'borrower_id', media_name=F('media__name'),
+                    name=F('borrower__name'), first_name=F('borrower__first_name'),
+                    email=F('borrower__email')))
+    return iter_member_batches(rows, 'borrower_id', batch_size)
+
+
+def send_overdue_reminders(today=None, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """ Envoie un message de relance à chaque membre qui a des emprunts en retard non relancés.
+
+    Les emprunts d'un même membre sont regroupés dans un seul message. Les messages d'un lot
+    sont envoyés par une seule connexion au serveur de mail, puis les relances du lot sont
+    enregistrées : une exécution interrompue reprend là où elle s'est arrêtée.
+    Les membres sans adresse email ne sont pas relancés.
+
+    Paramètres :
+        - today (date) : Date de référence des retards (aujourd'hui par défaut).
+        - batch_size (int) : Nombre de membres relancés par lot.
+        - dry_run (bool) : Compte les relances sans envoyer ni enregistrer de message.
+
+    Retour :
+        - ReminderResult : Le bilan de l'envoi.
+    """
+    today = today or timezone.now().date()
+    result = ReminderResult()
+    for batch in _iter_batches(today, batch_size):
+        result.batches += 1
+        result.members += len(batch)
+        result.loans += sum(len(loans) for _, loans in batch)
+        if dry_run:
+            continue
+        messages = [build_message(member, loans, today) for member, loans in batch]
+        with get_connection() as connection:
+            connection.send_messages(messages)
+        sent_at = timezone.now()
+        OverdueReminder.objects.bulk_create(
+            [OverdueReminder(loan_id=loan['id'], sent_at=sent_at) for _, loans in batch for loan in loans],
+            ignore_conflicts=True,
+        )
+    return result
@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from app_bibliothecaire.events import publish_availability
+from app_bibliothecaire.models import Member, Media, Loan, allocate_holds, refresh_loan_counters
+
+# Nombre maximal d'éléments rendus en une fois (bac de retours vidé le matin : quelques centaines)
+MAX_BATCH_SIZE = 1000
+
+# Résultat du retour de chaque élément
+RETURNED = 'returned'
+NOT_FOUND = 'not_found'
+ALREADY_RETURNED = 'already_returned'
+INVALID_DATE = 'invalid_date'
+DUPLICATE = 'duplicate'
+
+MESSAGES = {
+    RETURNED: "Retour enregistré.",
+    NOT_FOUND: "Aucun emprunt en cours ne correspond.",
+    ALREADY_RETURNED: "Cet emprunt a déjà été retourné.",
+    INVALID_DATE: "La date de retour effective ne peut pas être antérieure à la date d'emprunt.",
+    DUPLICATE: "Emprunt déjà présent dans le lot.",
+}
+
+
+class ReturnResult:
+    """ Bilan d'un retour par lot.
+    Attributs :
+        items (list) : Un dict par élément demandé, dans l'ordre de la demande :
+            - kind (str) : 'loan' (identifiant d'emprunt) ou 'media' (identifiant de média).
+            - id (int) : Identifiant demandé.
+            - status (str) : RETURNED, NOT_FOUND, ALREADY_RETURNED, INVALID_DATE ou DUPLICATE.
+            - message (str) : Motif en clair.
+            - loan_id, media_id, media_name : L'emprunt trouvé (None si NOT_FOUND).
+    """
+
+    def __init__(self):
+        self.items = []
+
+    @property
+    def returned(self):
+        return sum(1 for item in self.items if item['status'] == RETURNED)
+
+    @property
+    def rejected(self):
+        return len(self.items) - self.returned
+
+    def add(self, kind, requested_id, status, loan=None):
+        self.items.append({
+            'kind': kind,
+            'id': requested_id,
+            'status': status,
+            'message': MESSAGES[status],
+            'loan_id': loan['id'] if loan else None,
+            'media_id': loan['media_id'] if loan else None,
+            'media_name': loan['media_name'] if loan else None,
+        })
+
+
+def return_loans(loan_ids=(), media_ids=(), return_date=None):
+    """ Enregistre le retour de plusieurs emprunts en une transaction.
+
+    Les emprunts sont désignés par leur identifiant ou par celui du média emprunté (emprunt
+    en cours du média). Ils sont tous lus et vérifiés par une seule requête, puis les retours
+    valides sont appliqués par un UPDATE des emprunts, un UPDATE des médias et un UPDATE des
+    compteurs des membres concernés. Les médias réservés sont mis de côté pour la première
+    réservation de leur file (voir allocate_holds()). Les éléments invalides sont signalés sans
+    bloquer les autres.
+
+    Paramètres :
+        - loan_ids (list) : Identifiants d'emprunts.
+        - media_ids (list) : Identifiants de médias rendus.
+        - return_date (date) : Date de retour effective (aujourd'hui par défaut).
+
+    Retour :
+        - ReturnResult : Le résultat de chaque élément.
+    Lève une exception ValueError si le lot dépasse MAX_BATCH_SIZE éléments.
+    """
+    loan_ids, media_ids = list(loan_ids), list(media_ids)
+    if len(loan_ids) + len(media_ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"Un lot de retours est limité à {MAX_BATCH_SIZE} éléments.")
+    return_date = return_date or timezone.localdate()
+    result = ReturnResult()
+
+    with transaction.atomic():
+        # Sous PostgreSQL, les emprunts lus restent verrouillés jusqu'à la fin de la transaction ;
+        # sous SQLite, la transaction IMMEDIATE tient déjà le verrou d'écriture.
+        rows = (Loan.objects.select_for_update(of=('self',))
+                .filter(Q(id__in=loan_ids) | Q(media_id__in=media_ids, effective_return_date__isnull=True))
+                .values('id', 'media_id', 'borrower_id', 'loan_date', 'effective_return_date',
+                        media_name=F('media__name')))
+        by_id, by_media = {}, {}
+        for row in rows:
+            by_id[row['id']] = row
+            if row['effective_return_date'] is None:
+                by_media[row['media_id']] = row
+
+        returned = {}
+        requested = ([('loan', i, by_id.get(i)) for i in loan_ids]
+                     + [('media', i, by_media.get(i)) for i in media_ids])
+        for kind, requested_id, loan in requested:
+            if loan is None:
+                status = NOT_FOUND
+            elif loan['id'] in returned:
+                status = DUPLICATE
+            elif loan['effective_return_date'] is not None:
+                status = ALREADY_RETURNED
+            elif loan['loan_date'] and return_date < timezone.localdate(loan['loan_date']):
+                status = INVALID_DATE
+            else:
+                status = RETURNED
+                returned[loan['id']] = loan
+            result.add(kind, requested_id, status, loan)
+
+        if returned:
+            now = timezone.now()
+            Loan.objects.filter(id__in=returned, effective_return_date__isnull=True).update(
+                effective_return_date=return_date, modified_at=now)
+            media_ids = {loan['media_id'] for loan in returned.values()}
+            # Les médias réservés sont mis de côté (et restent indisponibles), les autres sont rendus disponibles
+            held = allocate_holds(media_ids)
+            Media.objects.filter(id__in=media_ids - held).update(availability=True, modified_at=now)
+            publish_availability(media_ids - held, True)
+            borrower_ids = {loan['borrower_id'] for loan in returned.values()}
+            refresh_loan_counters(Member.objects.filter(id__in=borrower_ids))
+    return result
@@ -0,0 +1,100 @@
+import re
+from django.db import connection
+from django.db.models import Q
+from app_bibliothecaire.catalogue import catalogue_queryset
+from app_bibliothecaire.models import MediaFlat
+
+# Table FTS5 créée par la migration 0022_media_fts
+FTS_TABLE = 'app_bibliothecaire_media_fts'
+
+# Poids BM25 des colonnes (name, author, genre) : un titre qui correspond passe en premier
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+DEFAULT_LIMIT = 50
+
+
+def fts_available():
+    """ Indique si la recherche plein texte FTS5 est disponible sur la base courante
+    (la migration ne crée la table FTS5 que sous SQLite).
+    """
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(query):
+    """ Convertit une saisie libre en requête FTS5 : chaque mot devient un préfixe ("mot"*),
+    et tous les mots doivent être présents. Retourne None si la saisie ne contient aucun mot.
+    La syntaxe FTS5 saisie par l'utilisateur (guillemets, opérateurs) n'est pas interprétée.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def _fts_search_ids(match, category, available, limit):
+    # Identifiants des médias correspondants, du plus pertinent au moins pertinent
+    sql = [
+        f"SELECT fts.rowid FROM {FTS_TABLE} AS fts",
+        f"JOIN {MediaFlat._meta.db_table} AS media ON media.id = fts.rowid",
+        f"WHERE {FTS_TABLE} MATCH %s",
+    ]
+    params = [match]
+    if category:
+        sql.append("AND media.category = %s")
+        params.append(category)
+    if available is not None:
+        sql.append("AND media.availability = %s")
+        params.append(available)
+    sql.append(f"ORDER BY bm25({FTS_TABLE}, {', '.join(str(weight) for weight in FTS_WEIGHTS)}), fts.rowid")
+    sql.append("LIMIT %s")
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(' '.join(sql), params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _scan_search_ids(query, category, available, limit):
+    # Recherche de repli, sans index plein texte : chaque mot doit figurer dans un des champs
+    medias = MediaFlat.objects.order_by('name', 'id')
+    for word in re.findall(r'\w+', query):
+        medias = medias.filter(Q(name__icontains=word) | Q(author__icontains=word) | Q(genre__icontains=word))
+    if category:
+        medias = medias.filter(category=category)
+    if available is not None:
+        medias = medias.filter(availability=available)
+    return list(medias.values_list('id', flat=True)[:limit])
+
+
+def search_media(query, category=None, available=None, limit=DEFAULT_LIMIT):
+    """ Recherche des médias par titre, auteur et genre (DVD), par préfixes de mots.
+
+    Paramètres :
+        - query (str) : Saisie libre, par exemple "dune herb".
+        - category (str) : Catégorie des médias (facultatif).
+        - available (bool) : Ne retourne que les médias disponibles (True) ou empruntés (False).
+        - limit (int) : Nombre maximal de résultats.
+
+    Retour :
+        - list : Médias chargés avec catalogue_queryset(), classés par pertinence (BM25).
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+    if fts_available():
+        ids = _fts_search_ids(match, category, available, limit)
+    else:
+        ids = _scan_search_ids(query, category, available, limit)
+    medias = catalogue_queryset().in_bulk(ids)
+    return [medias[media_id] for media_id in ids if media_id in medias]
+
+
+def search_from_request(request, limit=DEFAULT_LIMIT):
+    """ Lance la recherche décrite par les paramètres GET 'q', 'categorie' et 'disponible'
+    ('1' pour les médias disponibles, '0' pour les médias empruntés).
+    Retourne None si aucune recherche n'est demandée.
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return None
+    available = {'1': True, '0': False}.get(request.GET.get('disponible'))
+    return search_media(query, request.GET.get('categorie') or None, available, limit)
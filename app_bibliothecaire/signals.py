@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from app_bibliothecaire.models import Loan, StatsDirtyDay
+
+
+@receiver(post_delete, sender=Loan)
+def release_deleted_loan(sender, instance, **kwargs):
+    # Un emprunt en cours supprimé (directement ou en cascade avec son média) libère le membre
+    if instance.effective_return_date is None:
+        instance.release_borrower()
+
+
+@receiver(pre_save, sender=Loan)
+def mark_corrected_loan_days(sender, instance, raw=False, **kwargs):
+    # Date d'emprunt ou de retour corrigée : l'ancien jour n'est plus porté par aucun emprunt
+    # modifié, ses statistiques sont donc signalées au prochain recalcul (voir stats.py).
+    # Les dates de référence sont celles lues en base (Loan.from_db) : aucune requête
+    # supplémentaire, en particulier pour un simple retour.
+    loaded = getattr(instance, 'loaded_dates', None)
+    if raw or loaded is None:
+        return
+    loan_date, return_day = loaded
+    days = set()
+    if loan_date is not None and loan_date != instance.loan_date:
+        days.add(timezone.localdate(loan_date))
+    if return_day is not None and return_day != instance.effective_return_date:
+        days.add(return_day)
+    StatsDirtyDay.objects.bulk_create(StatsDirtyDay(day=day) for day in days)
+    # Un nouvel enregistrement de la même instance part des dates enregistrées ici
+    instance.loaded_dates = (instance.loan_date, instance.effective_return_date)
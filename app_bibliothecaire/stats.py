@@ -0,0 +1,155 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from app_bibliothecaire.models import (Media, Loan, DailyCategoryStats, DailyMediaStats, StatsDirtyDay,
+                                       StatsWatermark)
+
+# Nom du point de reprise des statistiques de circulation
+WATERMARK_NAME = 'circulation'
+
+# Marge de recouvrement : un emprunt enregistré par une transaction encore en cours
+# lors du calcul précédent peut porter une date de modification antérieure au point de reprise.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Écart maximal entre le premier et le dernier jour d'un lot recalculé
+DAYS_PER_BATCH = 31
+
+
+def _day_bounds(first, last):
+    # Bornes [début du premier jour, début du lendemain du dernier jour[ dans le fuseau courant
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(first, time.min), tz)
+    end = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def changed_days(since=None):
+    """ Retourne les jours dont les statistiques dépendent d'emprunts modifiés après 'since'
+    (jour d'emprunt et jour de retour), ou de tous les emprunts si since vaut None.
+    """
+    loans = Loan.objects.all() if since is None else Loan.objects.filter(modified_at__gt=since)
+    days = set()
+    rows = (loans.annotate(loan_day=TruncDate('loan_date')).order_by()
+            .values_list('loan_day', 'effective_return_date').distinct())
+    for loan_day, return_day in rows.iterator():
+        days.update(day for day in (loan_day, return_day) if day is not None)
+    return days
+
+
+def _day_batches(days):
+    # Regroupe les jours triés en lots couvrant au plus DAYS_PER_BATCH jours consécutifs
+    batch = []
+    for day in sorted(days):
+        if batch and (day - batch[0]).days >= DAYS_PER_BATCH:
+            yield batch
+            batch = []
+        batch.append(day)
+    if batch:
+        yield batch
+
+
+def _refresh_days(days):
+    """ Recalcule les agrégats des jours donnés à partir des emprunts de ces jours seulement. """
+    days = set(days)
+    first, last = min(days), max(days)
+    start, end = _day_bounds(first, last)
+    started = (Loan.objects.filter(loan_date__gte=start, loan_date__lt=end)
+               .annotate(day=TruncDate('loan_date')).order_by())
+    duration = ExpressionWrapper(F('effective_return_date') - TruncDate('loan_date'), output_field=DurationField())
+    returned = (Loan.objects.filter(effective_return_date__gte=first, effective_return_date__lte=last)
+                .annotate(day=F('effective_return_date')).order_by())
+
+    categories = defaultdict(dict)
+    for row in started.values('day', category=F('media__category')).annotate(loans=Count('id')):
+        categories[row['day'], row['category']]['loans'] = row['loans']
+    for row in returned.values('day', category=F('media__category')).annotate(
+            returns=Count('id'),
+            late_returns=Count('id', filter=Q(effective_return_date__gt=F('expected_return_date'))),
+            loan_days=Sum(duration)):
+        categories[row['day'], row['category']].update(
+            returns=row['returns'], late_returns=row['late_returns'],
+            loan_days=row['loan_days'].days if row['loan_days'] else 0)
+    media_rows = started.values('day', 'media_id').annotate(loans=Count('id'))
+
+    with transaction.atomic():
+        DailyCategoryStats.objects.filter(day__in=days).delete()
+        DailyMediaStats.objects.filter(day__in=days).delete()
+        DailyCategoryStats.objects.bulk_create(
+            DailyCategoryStats(day=day, category=category, **values)
+            for (day, category), values in categories.items() if day in days)
+        DailyMediaStats.objects.bulk_create(
+            (DailyMediaStats(day=row['day'], media_id=row['media_id'], loans=row['loans'])
+             for row in media_rows.iterator() if row['day'] in days), batch_size=1000)
+
+
+def refresh_circulation_stats(full=False):
+    """ Met à jour les statistiques quotidiennes de circulation.
+
+    Seuls les jours touchés par les emprunts modifiés depuis le dernier calcul (point de
+    reprise sur Loan.modified_at) sont recalculés, chacun à partir des emprunts de ce jour-là,
+    ainsi que les anciens jours des emprunts corrigés depuis (StatsDirtyDay).
+    La suppression d'un emprunt ne laisse pas de trace : elle n'est prise en compte que
+    par un recalcul complet.
+
+    Paramètres :
+        - full (bool) : Recalcule toutes les journées depuis le premier emprunt.
+
+    Retour :
+        - int : Nombre de journées recalculées.
+    """
+    watermark, _ = StatsWatermark.objects.get_or_create(name=WATERMARK_NAME)
+    # Lu avant les emprunts modifiés : une modification concurrente sera reprise au calcul suivant
+    latest = Loan.objects.aggregate(latest=Max('modified_at'))['latest']
+    # Seules les lignes lues ici sont supprimées : une correction concurrente ajoute la sienne
+    dirty = dict(StatsDirtyDay.objects.values_list('id', 'day'))
+    if full or watermark.modified_at is None:
+        DailyCategoryStats.objects.all().delete()
+        DailyMediaStats.objects.all().delete()
+        days = changed_days()
+    else:
+        days = changed_days(watermark.modified_at - WATERMARK_OVERLAP) | set(dirty.values())
+    for batch in _day_batches(days):
+        _refresh_days(batch)
+    StatsDirtyDay.objects.filter(id__in=dirty).delete()
+    if latest is not None:
+        watermark.modified_at = latest
+    watermark.save()
+    return len(days)
+
+
+def get_dashboard(first, last, top=10):
+    """ Lit les statistiques de circulation entre deux dates, dans les seules tables d'agrégats.
+
+    Retour :
+        - dict : Contexte du tableau de bord :
+            - categories (list) : Catégories de médias, dans l'ordre des colonnes.
+            - days (list) : Couples (jour, [emprunts par catégorie]), du plus récent au plus ancien.
+            - totals (dict) : Emprunts, retours, retours en retard et durée cumulée sur la période.
+            - average_duration (float) : Durée moyenne d'un emprunt rendu, en jours (ou None).
+            - late_rate (float) : Part des retours effectués en retard, en % (ou None).
+            - top_titles (list) : Titres les plus empruntés, avec leur nombre d'emprunts.
+    """
+    categories = [key for key, _ in Media.CATEGORY_CHOICES]
+    stats = DailyCategoryStats.objects.filter(day__range=(first, last))
+    per_day = defaultdict(lambda: [0] * len(categories))
+    for row in stats.order_by().values('day', 'category', 'loans'):
+        if row['category'] in categories:
+            per_day[row['day']][categories.index(row['category'])] = row['loans']
+    totals = {key: value or 0 for key, value in stats.aggregate(
+        loans=Sum('loans'), returns=Sum('returns'), late_returns=Sum('late_returns'), loan_days=Sum('loan_days')
+    ).items()}
+    top_titles = (DailyMediaStats.objects.filter(day__range=(first, last))
+                  .values('media_id', name=F('media__name'))
+                  .annotate(loans=Sum('loans'))
+                  .order_by('-loans', 'name')[:top])
+    return {
+        'categories': categories,
+        'days': sorted(per_day.items(), reverse=True),
+        'totals': totals,
+        'average_duration': totals['loan_days'] / totals['returns'] if totals['returns'] else None,
+        'late_rate': 100 * totals['late_returns'] / totals['returns'] if totals['returns'] else None,
+        'top_titles': list(top_titles),
+    }
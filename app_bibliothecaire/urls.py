@@ -1,21 +1,39 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Vues de consultation asynchrones sous ASGI (voir le réglage ASYNC_VIEWS)
+reading = async_views if settings.ASYNC_VIEWS else views
 
 app_name = 'app_bibliothecaire'
 
 urlpatterns = [
     path('', views.home_librarian, name='home_bibliothecaire'),
-    path('listmembres/', views.listmembers, name='listmembres'),
+    path('listmembres/', reading.listmembers, name='listmembres'),
+    path('api/membres/autocomplete/', views.autocomplete_members, name='autocomplete_members'),
     path('ajoutmembre/', views.addmember, name='ajoutmembre'),
     path('updatemembre/<int:id>/', views.memberupdate, name='updatemembre'),
     path('deletemembre/<int:id>/', views.memberdelete, name='deletemembre'),
-    path('listmedia/', views.listmedia, name='listmedia'),
+    path('listmedia/', reading.listmedia, name='listmedia'),
+    path('api/medias/', views.api_medias, name='api_medias'),
+    path('api/medias/autocomplete/', views.autocomplete_medias, name='autocomplete_medias'),
+    path('api/codes/<str:code>/', views.api_barcode, name='api_code'),
     path('ajoutmedia/', views.addmedia, name='ajoutmedia'),
     path('ajout_livre/', views.add_book, name='ajout_livre'),
     path('ajout_dvd/', views.add_dvd, name='ajout_dvd'),
     path('ajout_cd/', views.add_cd, name='ajout_cd'),
     path('ajout_plateau/', views.add_board, name='ajout_plateau'),
+    path('import_media/', views.import_media_file, name='import_media'),
     path('creer_emprunt/', views.create_loan, name='creer_emprunt'),
-    path('retour_emprunt/', views.return_loan, name='retour_emprunt'),
+    path('emprunt_lot/', views.batch_checkout, name='emprunt_lot'),
+    path('api/emprunts/', views.api_batch_checkout, name='api_emprunts'),
+    path('api/reservations/', views.api_place_hold, name='api_reservations'),
+    path('api/reservations/<int:hold_id>/annuler/', views.api_cancel_hold, name='api_annuler_reservation'),
+    path('api/membres/<int:member_id>/reservations/', views.api_ready_holds, name='api_reservations_pretes'),
+    path('retour_emprunt/', reading.return_loan, name='retour_emprunt'),
+    path('retour_lot/', views.batch_return, name='retour_lot'),
+    path('api/retours/', views.api_batch_return, name='api_retours'),
     path('deletemedia/<int:id>/', views.mediadelete, name='deletemedia'),
+    path('export/<str:dataset>/', views.export_data, name='export'),
+    path('statistiques/', views.stats_dashboard, name='statistiques'),
 ]
@@ -1,12 +1,31 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
-from app_bibliothecaire.models import Member, Book, Dvd, Cd, Board, Loan, Media
+from app_bibliothecaire.models import Member, Book, Dvd, Cd, Board, Loan, Media, Hold, StatsWatermark
+from app_bibliothecaire.catalogue import catalogue_queryset, group_by_subtype, media_to_dict
+from app_bibliothecaire.pagination import MEMBER_ORDERING, page_from_request
+from app_bibliothecaire.exports import DATASETS, FORMATS, iter_export
+from app_bibliothecaire.imports import read_rows, import_media
+from app_bibliothecaire.search import search_from_request
+from app_bibliothecaire.stats import WATERMARK_NAME, get_dashboard
+from app_bibliothecaire.returns import return_loans
+from app_bibliothecaire.checkouts import CheckoutError, lend_medias
+from app_bibliothecaire.holds import cancel_hold, place_hold, queue_position, ready_holds
+from app_bibliothecaire.autocomplete import parse_limit, prefix_q, search_members, search_available_media
+from app_bibliothecaire.barcodes import lookup_barcode
+from app_bibliothecaire.conditional import catalogue_etag, catalogue_last_modified
 from app_bibliothecaire.forms import (Membercreation, Memberupdate, BookForm, DvdForm,
-                                      CdForm, BoardForm, LoanForm, SelectBorrowerForm, ReturnLoanForm)
+                                      CdForm, BoardForm, MediaImportForm, LoanForm, SelectBorrowerForm, ReturnLoanForm,
+                                      BatchLoanForm, BatchReturnForm)
 from django.contrib import messages
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse, StreamingHttpResponse, Http404
 from django.urls import reverse
-from datetime import timedelta
+from django.views.decorators.http import condition, require_POST
+from django.db.models import Prefetch
+from django.utils import timezone
+from datetime import date, timedelta
+import csv
+import io
+import json
 import logging
 
 # Création du logger
@@ -21,32 +40,72 @@ def home_librarian(request):
 
 
 # Fonctionnalités : Membre
+def member_list_queryset(query=''):
+    """ Retourne les membres dont le nom ou le prénom commence par query (voir
+    autocomplete.prefix_q()), avec leurs emprunts en cours (attribut current_loans),
+    chargés en une seule requête pour toute la page.
+    """
+    members = Member.objects.prefetch_related(Prefetch(
+        'loans',
+        queryset=Loan.objects.filter(effective_return_date__isnull=True).select_related('media'),
+        to_attr='current_loans'
+    ))
+    if query:
+        # Intervalles servis par les index du nom et du prénom, comme l'autocomplétion
+        members = members.filter(prefix_q('name', query) | prefix_q('first_name', query))
+    return members
+
+
+@condition(etag_func=catalogue_etag, last_modified_func=catalogue_last_modified)
 def listmembers(request):
-    """ Affiche la liste des membres.
-        Pour chaque membre, récupère les emprunts en cours et les inclut dans l'objet membre.
+    """ Affiche une page de la liste des membres, éventuellement filtrée par nom.
+        Les emprunts en cours de tous les membres de la page sont chargés en une seule requête,
+        et leur nombre est lu dans le compteur dénormalisé du membre.
         En cas d'erreur, une redirection vers la page d'accueil est effectuée avec un message.
 
         Paramètres :
-            - request (HttpRequest) : L'objet requête HTTP.
+            - request (HttpRequest) : L'objet requête HTTP. Paramètres GET facultatifs :
+                - q (str) : Début du nom ou du prénom recherché.
+                - cursor (str), page_size (int) : Pagination par curseur.
 
         Retour :
             - HttpResponse : Rendu de la page 'membres/listmembres.html' avec le contexte :
-                - membres (QuerySet) : Liste des membres et leurs emprunts.
+                - members (list) : Membres de la page, avec leurs emprunts en cours (current_loans).
+                - page (KeysetPage) : La page affichée.
+                - query (str) : La recherche en cours.
             - HttpResponseRedirect : Redirection vers la page d'accueil en cas d'erreur.
         """
     logger.info("Accès à la liste des membres.")
     try:
-        members = Member.objects.all()
-        for member in members:
-            member.current_loans = Loan.objects.filter(borrower=member, effective_return_date__isnull=True)
-            logger.debug(f"{len(members)} membres récupérés.")
-            return render(request, 'membres/listmembres.html', {'members': members})
+        query = request.GET.get('q', '').strip()
+        page = page_from_request(request, member_list_queryset(query), MEMBER_ORDERING)
+        logger.debug("%s membres récupérés.", len(page.items))
+        return render(request, 'membres/listmembres.html', {
+            'members': page.items,
+            'page': page,
+            'query': query,
+        })
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération des membres : {e}", exc_info=True)
+        logger.error("Erreur lors de la récupération des membres : %s", e, exc_info=True)
         messages.error(request, "Erreur lors du chargement des membres.")
         return redirect('app_bibliothecaire:home_bibliothecaire')
 
 
+@login_required
+def autocomplete_members(request):
+    """ Retourne au format JSON les membres dont le nom ou le prénom commence par le paramètre GET 'q'.
+
+    Paramètres GET :
+        - q (str) : Début du nom ou du prénom.
+        - limit (int) : Nombre maximal de résultats (facultatif).
+
+    Retour :
+        - JsonResponse : {'results': [{'id': ..., 'label': ...}, ...]}.
+    """
+    results = search_members(request.GET.get('q', ''), parse_limit(request.GET.get('limit')))
+    return JsonResponse({'results': results})
+
+
 def addmember(request):
     """ Gère l'ajout d'un nouveau membre.
 
@@ -73,11 +132,11 @@ def addmember(request):
                 member.email = membercreation.cleaned_data['email']
                 member.phone = membercreation.cleaned_data['phone']
                 member.save()
-                logger.info(f"Membre ajouté avec succès : {member.name} {member.first_name}")
+                logger.info("Membre ajouté avec succès : %s %s", member.name, member.first_name)
                 messages.success(request, "Le membre a été mis ajouté avec succès !")
                 return redirect('app_bibliothecaire:listmembres')
             except Exception as e:
-                logger.error(f"Erreur lors de l'ajout du membre : {e}", exc_info=True)
+                logger.error("Erreur lors de l'ajout du membre : %s", e, exc_info=True)
                 messages.error(request, "Erreur lors de l'ajout du membre.")
         else:
             logger.warning("Formulaire d'ajout de membre invalide.")
@@ -129,48 +188,103 @@ def memberdelete(request, id):
     Retour :
         - HttpResponseRedirect : Redirection vers la liste des membres après suppression.
     """
-    logger.info(f"Tentative de suppression du membre avec ID : {id}")
+    logger.info("Tentative de suppression du membre avec ID : %s", id)
     try:
         member = get_object_or_404(Member, pk=id)
         member.delete()
-        logger.info(f"Membre supprimé avec succès : {member.name} {member.first_name}")
+        logger.info("Membre supprimé avec succès : %s %s", member.name, member.first_name)
         messages.success(request, "Le membre a été supprimé avec succès !")
     except Exception as e:
-        logger.error(f"Erreur lors de la suppression du membre : {e}", exc_info=True)
+        logger.error("Erreur lors de la suppression du membre : %s", e, exc_info=True)
         messages.error(request, "Erreur lors de la suppression du membre.")
     return redirect('app_bibliothecaire:listmembres')
 
 
 # Fonctionnalités : Média
+@condition(etag_func=catalogue_etag, last_modified_func=catalogue_last_modified)
 def listmedia(request):
     logger.info("Accès à la liste des médias.")
     try:
-        books = Book.objects.all()
-        dvds = Dvd.objects.all()
-        cds = Cd.objects.all()
-        boards = Board.objects.all()
-
-        for book in books:
-            book.current_loans = book.loans.filter(effective_return_date__isnull=True).first()
-        for dvd in dvds:
-            dvd.current_loans = dvd.loans.filter(effective_return_date__isnull=True).first()
-        for cd in cds:
-            cd.current_loans = cd.loans.filter(effective_return_date__isnull=True).first()
-
-        context = {
-            'books': books,
-            'dvds': dvds,
-            'cds': cds,
-            'boards': boards,
-        }
-        logger.debug(f"Médias récupérés : {len(books)} livres, {len(dvds)} DVD, {len(cds)} CD, {len(boards)} plateaux.")
+        results = search_from_request(request)
+        if results is None:
+            page = page_from_request(request, catalogue_queryset())
+            context = group_by_subtype(page.items)
+            context['page'] = page
+        else:
+            context = group_by_subtype(results)
+            context['results_count'] = len(results)
+        logger.debug("Médias récupérés : %s livres, %s DVD, %s CD, %s plateaux.", len(context['books']),
+                     len(context['dvds']), len(context['cds']), len(context['boards']))
         return render(request, 'media/listmedia.html', context)
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération des médias : {e}", exc_info=True)
+        logger.error("Erreur lors de la récupération des médias : %s", e, exc_info=True)
         messages.error(request, "Erreur lors du chargement des médias.")
         return redirect('app_bibliothecaire:home_bibliothecaire')
 
 
+@login_required
+def api_medias(request):
+    """ Retourne une page du catalogue au format JSON.
+
+    Paramètres GET :
+        - cursor (str) : Jeton 'next_cursor' de la page précédente (facultatif).
+        - page_size (int) : Nombre de médias par page (facultatif).
+
+    Retour :
+        - JsonResponse : {'results': [...], 'next_cursor': str ou None}.
+        - JsonResponse (400) : Si le curseur ou la taille de page est invalide.
+    """
+    try:
+        page = page_from_request(request, catalogue_queryset())
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({
+        'results': [media_to_dict(media) for media in page.items],
+        'next_cursor': page.next_cursor,
+    })
+
+
+@login_required
+def autocomplete_medias(request):
+    """ Retourne au format JSON les médias disponibles dont le titre commence par le paramètre GET 'q'.
+
+    Paramètres GET :
+        - q (str) : Début du titre.
+        - categorie (str) : Catégorie des médias (facultatif).
+        - limit (int) : Nombre maximal de résultats (facultatif).
+
+    Retour :
+        - JsonResponse : {'results': [{'id': ..., 'label': ...}, ...]}.
+    """
+    results = search_available_media(request.GET.get('q', ''), parse_limit(request.GET.get('limit')),
+                                     request.GET.get('categorie'))
+    return JsonResponse({'results': results})
+
+
+@login_required
+def api_barcode(request, code):
+    """ Identifie un code-barres lu au comptoir : média et son emprunt en cours,
+    ou membre et ses emprunts en cours.
+
+    Paramètres :
+        - request (HttpRequest) : L'objet requête HTTP. Le paramètre GET 'type' vaut
+          'media' ou 'member' pour ne chercher qu'un type d'élément (facultatif).
+        - code (str) : Code lu.
+
+    Retour :
+        - JsonResponse : L'élément trouvé (voir app_bibliothecaire.barcodes.lookup_barcode).
+        - JsonResponse (400) : Si le type est inconnu.
+        - JsonResponse (404) : Si aucun élément ne porte ce code.
+    """
+    try:
+        result = lookup_barcode(code, request.GET.get('type') or None)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if result is None:
+        return JsonResponse({'error': f"Aucun élément ne porte le code {code}."}, status=404)
+    return JsonResponse(result)
+
+
 def addmedia(request):
     return render(request, 'media/ajoutmedia.html')
 
@@ -256,6 +370,38 @@ def add_board(request):
         return render(request, 'media/ajout_plateau.html', {'boardForm': boardform})
 
 
+@login_required
+def import_media_file(request):
+    """ Importe un fichier CSV ou JSONL de médias et affiche le bilan de l'import.
+
+    Chaque ligne est validée avec le formulaire d'ajout du type de média ;
+    les lignes invalides sont listées sans interrompre l'import.
+
+    Paramètres :
+        - request (HttpRequest) : L'objet requête HTTP.
+
+    Retour :
+        - HttpResponse : Rendu de la page 'media/import_media.html' avec le formulaire
+          et, après un envoi, le bilan de l'import.
+    """
+    result = None
+    if request.method == 'POST':
+        form = MediaImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            file = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            try:
+                result = import_media(read_rows(file, form.cleaned_data['import_format']),
+                                      form.cleaned_data['media_type'] or None)
+                logger.info("Import de médias : %s créés, %s lignes rejetées.", result.created, result.rejected)
+                messages.success(request, f"{result.created} médias importés.")
+            except (UnicodeDecodeError, csv.Error) as e:
+                logger.warning("Fichier d'import illisible : %s", e)
+                messages.error(request, "Le fichier n'a pas pu être lu.")
+    else:
+        form = MediaImportForm()
+    return render(request, 'media/import_media.html', {'form': form, 'result': result})
+
+
 def create_loan(request):
     categorie = request.GET.get('categorie')
     form = LoanForm(request.GET or None, categorie=categorie)
@@ -285,6 +431,74 @@ def create_loan(request):
     return render(request, 'emprunt/creer_emprunt.html', {'form': form})
 
 
+@login_required
+def batch_checkout(request):
+    """ Enregistre en une fois l'emprunt de plusieurs médias par un même membre :
+    tous les emprunts sont créés, ou aucun.
+
+    Paramètres :
+        - request (HttpRequest) : L'objet requête HTTP.
+
+    Retour :
+        - HttpResponseRedirect : Vers la même page une fois les emprunts créés.
+        - HttpResponse : Rendu de la page 'emprunt/emprunt_lot.html' avec le formulaire
+          et, en cas de refus, tous ses motifs.
+    """
+    if request.method == 'POST':
+        form = BatchLoanForm(request.POST)
+        if form.is_valid():
+            borrower = form.cleaned_data['member_id']
+            try:
+                loans = lend_medias(borrower.id, form.cleaned_data['media_ids'], form.cleaned_data['loan_date'])
+            except CheckoutError as e:
+                for error in e.errors:
+                    messages.error(request, error)
+            else:
+                logger.info("Emprunt groupé : %s médias prêtés au membre %s.", len(loans), borrower.id)
+                messages.success(request, f"{len(loans)} emprunts créés pour {borrower}.")
+                return HttpResponseRedirect(reverse('app_bibliothecaire:emprunt_lot'))
+    else:
+        form = BatchLoanForm()
+    return render(request, 'emprunt/emprunt_lot.html', {'form': form})
+
+
+@login_required
+@require_POST
+def api_batch_checkout(request):
+    """ Prête plusieurs médias à un membre en une transaction, tout ou rien (API JSON).
+
+    Corps de la requête (JSON) :
+        - member_id (int) : Identifiant de l'emprunteur.
+        - media_ids (list) : Identifiants des médias empruntés.
+        - loan_date (str) : Date de l'emprunt au format AAAA-MM-JJ (aujourd'hui par défaut).
+
+    Retour :
+        - JsonResponse (201) : {'loans': [...]}, un emprunt créé par média.
+        - JsonResponse (400) : {'error': str, 'errors': list} si la demande est invalide ou
+          refusée ; aucun emprunt n'est alors créé.
+    """
+    try:
+        data = json.loads(request.body)
+        member_id, media_ids = data.get('member_id'), data.get('media_ids')
+        if type(member_id) is not int:
+            raise ValueError("member_id doit être un entier.")
+        if not isinstance(media_ids, list) or not all(type(i) is int for i in media_ids):
+            raise ValueError("media_ids doit être une liste d'entiers.")
+        loan_date = date.fromisoformat(data['loan_date']) if data.get('loan_date') else None
+        loans = lend_medias(member_id, media_ids, loan_date)
+    except CheckoutError as e:
+        return JsonResponse({'error': str(e), 'errors': e.errors}, status=400)
+    except (ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'error': str(e), 'errors': [str(e)]}, status=400)
+    logger.info("Emprunt groupé : %s médias prêtés au membre %s.", len(loans), member_id)
+    return JsonResponse({'loans': [{
+        'id': loan.id,
+        'media_id': loan.media_id,
+        'media_name': loan.media.name,
+        'expected_return_date': loan.expected_return_date.isoformat(),
+    } for loan in loans]}, status=201)
+
+
 def return_loan(request):
     # Étape 1 : Sélection de l'emprunteur
     if 'borrower_id' not in request.GET:
@@ -300,24 +514,18 @@ def return_loan(request):
     # Étape 2 : Affichage des emprunts pour le membre sélectionné
     borrower_id = request.GET.get('borrower_id')
     borrower = get_object_or_404(Member, id=borrower_id)
-    loans = Loan.objects.filter(borrower=borrower, effective_return_date__isnull=True)
+    loans = Loan.objects.filter(borrower=borrower, effective_return_date__isnull=True).select_related('media')
 
     # Étape 3 : Gestion du retour d'un emprunt spécifique
     if 'loan_id' in request.GET:
         loan_id = request.GET.get('loan_id')
-        loan = get_object_or_404(Loan, id=loan_id)
+        loan = get_object_or_404(Loan.objects.select_related('media'), id=loan_id)
 
         if request.method == 'POST':
-            form = ReturnLoanForm(request.POST)
+            form = ReturnLoanForm(request.POST, loan=loan)
             if form.is_valid():
-                # Mise à jour des données de l'emprunt
-                loan.effective_return_date = form.cleaned_data['effective_return_date']
-                # Sauvegarde les données de retour
-                loan.save()
-
-                # Mise à jour de la disponibilité du média
-                loan.media.availability = True
-                loan.media.save()
+                # Enregistre la date de retour et rend le média disponible (Loan.save())
+                form.save()
 
                 # Message de succès et redirection vers la liste des emprunts
                 messages.success(request, f"Le retour de '{loan.media.name}' a été effectuée avec succès !")
@@ -336,15 +544,180 @@ def return_loan(request):
             'form': form
         })
 
-    # Affichage de la liste des emprunts pour le membre sélectionné
+    # Affichage de la liste des emprunts pour le membre sélectionné, et des médias mis de côté pour lui
     return render(request, 'emprunt/retour_emprunt.html', {
         'borrower': borrower,
-        'loans': loans
+        'loans': loans,
+        'ready_holds': ready_holds(borrower.id),
     })
 
 
+# Fonctionnalité : Réservations
+@login_required
+@require_POST
+def api_place_hold(request):
+    """ Réserve un média indisponible pour un membre, en fin de file d'attente (API JSON).
+
+    Corps de la requête (JSON) :
+        - member_id (int) : Identifiant du membre.
+        - media_id (int) : Identifiant du média.
+
+    Retour :
+        - JsonResponse (201) : {'id': int, 'media_id': int, 'member_id': int, 'position': int}.
+        - JsonResponse (400) : {'error': str} si la demande est invalide ou refusée.
+    """
+    try:
+        data = json.loads(request.body)
+        member_id, media_id = data.get('member_id'), data.get('media_id')
+        if type(member_id) is not int or type(media_id) is not int:
+            raise ValueError("member_id et media_id doivent être des entiers.")
+        hold = place_hold(member_id, media_id)
+    except (ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    logger.info("Réservation du média %s par le membre %s.", media_id, member_id)
+    return JsonResponse({'id': hold.id, 'media_id': hold.media_id, 'member_id': hold.member_id,
+                         'position': queue_position(hold)}, status=201)
+
+
+@login_required
+@require_POST
+def api_cancel_hold(request, hold_id):
+    """ Annule une réservation en attente ou prête (API JSON).
+
+    Retour :
+        - JsonResponse : {'id': int, 'status': 'cancelled'}.
+        - JsonResponse (404) : Si aucune réservation en cours ne correspond.
+    """
+    try:
+        cancel_hold(hold_id)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=404)
+    logger.info("Annulation de la réservation %s.", hold_id)
+    return JsonResponse({'id': hold_id, 'status': Hold.CANCELLED})
+
+
+@login_required
+def api_ready_holds(request, member_id):
+    """ Retourne les médias mis de côté pour un membre (API JSON).
+
+    Retour :
+        - JsonResponse : {'results': [...]}, une réservation prête par média
+          (voir app_bibliothecaire.holds.ready_holds).
+    """
+    return JsonResponse({'results': ready_holds(member_id)})
+
+
+# Fonctionnalité : Retour par lot (bac de retours)
+@login_required
+def batch_return(request):
+    """ Enregistre en une fois le retour de tous les médias scannés au bac de retours,
+    puis affiche le résultat de chaque média.
+
+    Paramètres :
+        - request (HttpRequest) : L'objet requête HTTP.
+
+    Retour :
+        - HttpResponse : Rendu de la page 'emprunt/retour_lot.html' avec le formulaire
+          et, après un envoi, le résultat de chaque média.
+    """
+    result = None
+    if request.method == 'POST':
+        form = BatchReturnForm(request.POST)
+        if form.is_valid():
+            result = return_loans(media_ids=form.cleaned_data['media_ids'],
+                                  return_date=form.cleaned_data['effective_return_date'])
+            logger.info("Retour par lot : %s retours enregistrés, %s rejetés.", result.returned, result.rejected)
+            messages.success(request, f"{result.returned} retours enregistrés.")
+            form = BatchReturnForm(initial={'effective_return_date': form.cleaned_data['effective_return_date']})
+    else:
+        form = BatchReturnForm()
+    return render(request, 'emprunt/retour_lot.html', {'form': form, 'result': result})
+
+
+@login_required
+@require_POST
+def api_batch_return(request):
+    """ Enregistre le retour de plusieurs emprunts en une transaction (API JSON).
+
+    Corps de la requête (JSON) :
+        - loan_ids (list) : Identifiants d'emprunts (facultatif).
+        - media_ids (list) : Identifiants de médias rendus (facultatif).
+        - return_date (str) : Date de retour au format AAAA-MM-JJ (aujourd'hui par défaut).
+
+    Retour :
+        - JsonResponse : {'returned': int, 'rejected': int, 'results': [...]}, un résultat
+          par élément demandé (voir app_bibliothecaire.returns.ReturnResult).
+        - JsonResponse (400) : Si le corps de la requête est invalide.
+    """
+    try:
+        data = json.loads(request.body)
+        loan_ids, media_ids = data.get('loan_ids', []), data.get('media_ids', [])
+        if not all(isinstance(ids, list) and all(type(i) is int for i in ids) for ids in (loan_ids, media_ids)):
+            raise ValueError("loan_ids et media_ids doivent être des listes d'entiers.")
+        return_date = date.fromisoformat(data['return_date']) if data.get('return_date') else None
+        result = return_loans(loan_ids, media_ids, return_date)
+    except (ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    logger.info("Retour par lot : %s retours enregistrés, %s rejetés.", result.returned, result.rejected)
+    return JsonResponse({'returned': result.returned, 'rejected': result.rejected, 'results': result.items})
+
+
 def mediadelete(request, id):
     media = get_object_or_404(Media, pk=id)
     media.delete()
     messages.success(request, "Le media a été supprimé avec succès !")
     return redirect('app_bibliothecaire:listmedia')
+
+
+# Fonctionnalité : Export des données
+@login_required
+def export_data(request, dataset):
+    """ Exporte un jeu de données (membres, médias ou emprunts) en flux continu.
+
+    Paramètres :
+        - request (HttpRequest) : L'objet requête HTTP. Le paramètre GET 'format'
+          vaut 'csv' (par défaut) ou 'jsonl'.
+        - dataset (str) : Jeu de données à exporter ('members', 'media' ou 'loans').
+
+    Retour :
+        - StreamingHttpResponse : Le fichier d'export, produit au fil de la lecture en base.
+    """
+    export_format = request.GET.get('format', 'csv')
+    if dataset not in DATASETS or export_format not in FORMATS:
+        raise Http404("Export inconnu.")
+    logger.info("Export des données '%s' au format %s.", dataset, export_format)
+    response = StreamingHttpResponse(iter_export(dataset, export_format), content_type=FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{export_format}"'
+    return response
+
+
+# Fonctionnalité : Statistiques de circulation
+@login_required
+def stats_dashboard(request):
+    """ Affiche les statistiques de circulation des derniers jours.
+    Seules les tables d'agrégats quotidiens sont lues : la durée d'affichage ne dépend pas
+    de la taille de l'historique des emprunts. Elles sont mises à jour par la commande
+    refresh_circulation_stats.
+
+    Paramètres :
+        - request (HttpRequest) : L'objet requête HTTP. Le paramètre GET 'jours' donne la période
+          affichée (30 jours par défaut, 366 au plus).
+
+    Retour :
+        - HttpResponse : Rendu de la page 'stats/dashboard.html'.
+    """
+    try:
+        period = min(max(int(request.GET.get('jours', 30)), 1), 366)
+    except ValueError:
+        period = 30
+    last = timezone.localdate()
+    first = last - timedelta(days=period - 1)
+    context = get_dashboard(first, last)
+    context.update({
+        'period': period,
+        'first': first,
+        'last': last,
+        'watermark': StatsWatermark.objects.filter(name=WATERMARK_NAME).first(),
+    })
+    logger.info("Accès aux statistiques de circulation sur %s jours.", period)
+    return render(request, 'stats/dashboard.html', context)
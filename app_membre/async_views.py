@@ -0,0 +1,80 @@
+""" Version asynchrone du catalogue des membres, servie sous ASGI (réglage ASYNC_VIEWS). """
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils.safestring import mark_safe
+from app_bibliothecaire.cache import aget_fragments
+from app_bibliothecaire.conditional import (MEMBER_CATALOGUE_MODELS, async_condition, member_catalogue_etag,
+                                            member_catalogue_last_modified, tables_version)
+from app_bibliothecaire.events import broker
+from app_bibliothecaire.catalogue import catalogue_queryset, group_by_subtype
+from app_bibliothecaire.pagination import KeysetPage, akeyset_page, parse_page_size
+from app_bibliothecaire.search import search_from_request
+from app_membre.views import SECTIONS, render_sections
+
+arender = sync_to_async(render)
+
+
+@async_condition(etag_func=member_catalogue_etag, last_modified_func=member_catalogue_last_modified)
+async def list_medias_member(request):
+    """ Version asynchrone de views.list_medias_member(). La page s'abonne au flux des
+    changements de disponibilité (availability_events) à partir du dernier événement publié.
+    """
+    live = {'live_updates': True, 'last_event_id': broker.last_event_id}
+    results = await sync_to_async(search_from_request)(request)
+    if results is not None:
+        sections = await sync_to_async(render_sections)(group_by_subtype(results))
+        return await arender(request, 'app_memb/liste_medias_membre.html', {
+            'sections': sections,
+            'results_count': len(results),
+            **live,
+        })
+
+    cursor = request.GET.get('cursor')
+    try:
+        page_size = parse_page_size(request.GET.get('page_size'))
+    except ValueError:
+        cursor, page_size = None, parse_page_size(None)
+
+    async def render_page():
+        try:
+            page = await akeyset_page(catalogue_queryset(), cursor, page_size)
+        except ValueError:
+            # Curseur invalide : retour à la première page
+            page = await akeyset_page(catalogue_queryset(), None, page_size)
+        fragments = await sync_to_async(render_sections)(group_by_subtype(page.items))
+        fragments['next_cursor'] = page.next_cursor
+        return fragments
+
+    # État des tables déjà lu pour l'ETag : pas de requête supplémentaire
+    version = await sync_to_async(tables_version)(request, MEMBER_CATALOGUE_MODELS)
+    fragments, hit = await aget_fragments('member_catalogue', version, (cursor, page_size),
+                                          SECTIONS + ('next_cursor',), render_page)
+    response = await arender(request, 'app_memb/liste_medias_membre.html', {
+        'sections': {section: mark_safe(fragments[section]) for section in SECTIONS},
+        'page': KeysetPage([], fragments['next_cursor'], page_size),
+        **live,
+    })
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+async def availability_events(request):
+    """ Flux Server-Sent Events des changements de disponibilité des médias
+    (voir app_bibliothecaire.events). Chaque événement 'availability' porte les identifiants
+    des médias concernés ('media_ids') et leur nouvelle disponibilité ('available').
+
+    Le flux reprend après le dernier événement reçu par le client : en-tête Last-Event-ID
+    (reconnexion automatique du navigateur), ou paramètre GET 'last_event_id' (identifiant
+    inscrit dans la page du catalogue). Il n'est servi que sous ASGI (réglage ASYNC_VIEWS) :
+    sous WSGI, chaque client occuperait un thread pour toute la durée de sa connexion.
+    """
+    if not settings.ASYNC_VIEWS:
+        raise Http404("Flux d'événements disponible sous ASGI uniquement.")
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    response = StreamingHttpResponse(broker.stream(last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Pas de mise en mémoire tampon par un proxy (nginx)
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,9 +1,14 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Vues de consultation asynchrones sous ASGI (voir le réglage ASYNC_VIEWS)
+reading = async_views if settings.ASYNC_VIEWS else views
 
 app_name = 'app_membre'
 
 urlpatterns = [
     path('', views.member_home, name='home_membre'),
-    path('liste_medias_membre/', views.list_medias_member, name='liste_medias_membre'),
+    path('liste_medias_membre/', reading.list_medias_member, name='liste_medias_membre'),
+    path('evenements/disponibilite/', async_views.availability_events, name='evenements_disponibilite'),
 ]
\ No newline at end of file
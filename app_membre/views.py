@@ -1,30 +1,71 @@
 from django.shortcuts import render
-from app_bibliothecaire.models import Book, Dvd, Cd, Board
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
+from app_bibliothecaire.cache import get_fragments
+from app_bibliothecaire.conditional import (MEMBER_CATALOGUE_MODELS, member_catalogue_etag,
+                                            member_catalogue_last_modified, tables_version)
+from app_bibliothecaire.catalogue import catalogue_queryset, group_by_subtype
+from app_bibliothecaire.pagination import KeysetPage, keyset_page, parse_page_size
+from app_bibliothecaire.search import search_from_request
+
+# Sections de la liste des médias, une par catégorie
+SECTIONS = ('books', 'dvds', 'cds', 'boards')
 
 
 def member_home(request):
     return render(request, 'app_memb/home_membre.html')
 
 
-def list_medias_member(request):
-    # Recharge les médias depuis la BDD pour afficher l'état actuel
-    books = Book.objects.all()
-    dvds = Dvd.objects.all()
-    cds = Cd.objects.all()
-    boards = Board.objects.all()
-
-    # Permet la prise en compte d'un emprunt en cours
-    for book in books:
-        book.current_loans = book.loans.filter(effective_return_date__isnull=True).first()
-    for dvd in dvds:
-        dvd.current_loans = dvd.loans.filter(effective_return_date__isnull=True).first()
-    for cd in cds:
-        cd.current_loans = cd.loans.filter(effective_return_date__isnull=True).first()
-
-    context = {
-        'books': books,
-        'dvds': dvds,
-        'cds': cds,
-        'boards': boards,
+def render_sections(catalogue):
+    # Rend chaque section de la liste à partir du catalogue regroupé par sous-type
+    return {
+        section: mark_safe(render_to_string(f'app_memb/sections/{section}.html', {section: catalogue[section]}))
+        for section in SECTIONS
     }
-    return render(request, 'app_memb/liste_medias_membre.html', context)
+
+
+@condition(etag_func=member_catalogue_etag, last_modified_func=member_catalogue_last_modified)
+def list_medias_member(request):
+    """ Affiche une page du catalogue pour les membres.
+    Une page inchangée depuis la dernière visite est validée par une réponse 304.
+
+    Les sections de chaque catégorie sont servies depuis le cache tant qu'aucun média,
+    emprunt ou retour n'a modifié les tables du catalogue, quel que soit le processus
+    qui les a écrites (voir app_bibliothecaire.cache).
+    Les recherches ne sont pas mises en cache.
+    """
+    results = search_from_request(request)
+    if results is not None:
+        return render(request, 'app_memb/liste_medias_membre.html', {
+            'sections': render_sections(group_by_subtype(results)),
+            'results_count': len(results),
+        })
+
+    cursor = request.GET.get('cursor')
+    try:
+        page_size = parse_page_size(request.GET.get('page_size'))
+    except ValueError:
+        cursor, page_size = None, parse_page_size(None)
+
+    def render_page():
+        # Charge une page du catalogue et les emprunts en cours en un nombre constant de requêtes
+        try:
+            page = keyset_page(catalogue_queryset(), cursor, page_size)
+        except ValueError:
+            # Curseur invalide : retour à la première page
+            page = keyset_page(catalogue_queryset(), None, page_size)
+        fragments = render_sections(group_by_subtype(page.items))
+        fragments['next_cursor'] = page.next_cursor
+        return fragments
+
+    # État des tables déjà lu pour l'ETag : pas de requête supplémentaire
+    version = tables_version(request, MEMBER_CATALOGUE_MODELS)
+    fragments, hit = get_fragments('member_catalogue', version, (cursor, page_size),
+                                   SECTIONS + ('next_cursor',), render_page)
+    response = render(request, 'app_memb/liste_medias_membre.html', {
+        'sections': {section: mark_safe(fragments[section]) for section in SECTIONS},
+        'page': KeysetPage([], fragments['next_cursor'], page_size),
+    })
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
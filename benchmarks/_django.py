@@ -0,0 +1,22 @@
+import os
+import django
+
+
+def setup_test_database():
+    """ Initialise Django et crée la base de test (pour SQLite, le fichier test_db.sqlite3 en mode
+    WAL, comme les tests : voir my_mediatheque_project.database et la migration 0029_sqlite_wal).
+    Retourne la fonction qui détruit la base en fin de benchmark.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_mediatheque_project.settings')
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return teardown
@@ -0,0 +1,143 @@
+""" Compare le débit (requêtes/s) et la latence p99 des vues de consultation servies
+en WSGI (vues synchrones, un thread par requête) et en ASGI (vues asynchrones), avec SQLite.
+
+Par défaut, les requêtes passent par les gestionnaires WSGI et ASGI de Django dans le
+processus du benchmark (Client dans des threads, AsyncClient dans une boucle d'événements),
+sans serveur ni réseau. Avec --url, le benchmark interroge un serveur déjà lancé, par exemple :
+    gunicorn -w 4 my_mediatheque_project.wsgi
+    DJANGO_ASYNC_VIEWS=1 uvicorn --workers 4 my_mediatheque_project.asgi:application
+
+Usage : python -m benchmarks.bench_asgi [--medias 5000] [--members 500] [--requests 400]
+        [--concurrency 20] [--url http://127.0.0.1:8000]
+"""
+import argparse
+import asyncio
+import importlib
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks._django import setup_test_database
+
+PATHS = ('/bibliothecaire/listmedia/', '/bibliothecaire/listmembres/', '/membre/liste_medias_membre/',
+         '/bibliothecaire/retour_emprunt/?borrower_id=1')
+
+
+def populate(medias, members):
+    from django.utils import timezone
+    from app_bibliothecaire.imports import import_media
+    from app_bibliothecaire.models import Member, Media, Loan
+
+    types = ('book', 'dvd', 'cd', 'board')
+    import_media(((i, {'type': types[i % 4], 'name': f'Média {i}', 'author': f'Auteur {i % 500}',
+                       'nb_pages': '100', 'genre': 'Drame', 'number_players_min': '2',
+                       'number_players_max': '4'}) for i in range(medias)), batch_size=2000)
+    Member.objects.bulk_create(Member(name=f'Nom {i}', first_name=f'Prénom {i}') for i in range(members))
+    borrowers = list(Member.objects.order_by('id')[:members // 2])
+    media_ids = (Media.objects.filter(availability=True).order_by('id')
+                 .values_list('id', flat=True)[:len(borrowers) * 3])
+    for i, media_id in enumerate(media_ids):
+        Loan.objects.create(borrower=borrowers[i % len(borrowers)], media_id=media_id, loan_date=timezone.now())
+
+
+def use_async_views(enabled):
+    # Les URL choisissent la version des vues à l'import (réglage ASYNC_VIEWS)
+    from django.conf import settings
+    from django.urls import clear_url_caches
+    settings.ASYNC_VIEWS = enabled
+    for name in ('app_bibliothecaire.urls', 'app_membre.urls', 'my_mediatheque_project.urls'):
+        importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+def summary(label, durations, elapsed):
+    p99 = statistics.quantiles(durations, n=100)[98] * 1000
+    print(f"{label:28} {len(durations) / elapsed:8.1f} req/s   "
+          f"médiane {statistics.median(durations) * 1000:7.1f} ms   p99 {p99:7.1f} ms")
+
+
+def run_threads(fetch, paths, concurrency):
+    def timed(path):
+        start = time.perf_counter()
+        fetch(path)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        durations = list(executor.map(timed, paths))
+    return durations, time.perf_counter() - start
+
+
+def bench_wsgi(paths, concurrency):
+    from django.db import connection
+    from django.test import Client
+    use_async_views(False)
+
+    def fetch(path):
+        response = Client().get(path)
+        assert response.status_code == 200, (path, response.status_code)
+        # Comme un serveur WSGI : la connexion du thread est rendue en fin de requête
+        connection.close_if_unusable_or_obsolete()
+
+    return run_threads(fetch, paths, concurrency)
+
+
+def bench_asgi(paths, concurrency):
+    from django.test import AsyncClient
+    use_async_views(True)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(path):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await AsyncClient().get(path)
+                assert response.status_code == 200, (path, response.status_code)
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        durations = await asyncio.gather(*(timed(path) for path in paths))
+        return durations, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def bench_url(base_url, paths, concurrency):
+    def fetch(path):
+        with urllib.request.urlopen(base_url.rstrip('/') + path) as response:
+            response.read()
+
+    return run_threads(fetch, paths, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--medias', type=int, default=5000)
+    parser.add_argument('--members', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--url', help="Serveur à interroger plutôt que les gestionnaires en processus")
+    args = parser.parse_args()
+    paths = [PATHS[i % len(PATHS)] for i in range(args.requests)]
+
+    if args.url:
+        durations, elapsed = bench_url(args.url, paths, args.concurrency)
+        summary(args.url, durations, elapsed)
+        return
+
+    teardown = setup_test_database()
+    try:
+        populate(args.medias, args.members)
+        # Première passe sans mesure : gabarits compilés, cache des fragments rempli
+        bench_wsgi(PATHS, 1)
+        for label, bench in (('WSGI, vues synchrones', bench_wsgi), ('ASGI, vues asynchrones', bench_asgi)):
+            durations, elapsed = bench(paths, args.concurrency)
+            summary(label, durations, elapsed)
+    finally:
+        use_async_views(False)
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+""" Mesure la durée d'identification d'un code-barres (app_bibliothecaire.barcodes.lookup_barcode)
+selon la taille du catalogue : elle ne doit pas en dépendre.
+
+Usage : python -m benchmarks.bench_barcodes [--sizes 1000 10000 100000] [--lookups 2000]
+"""
+import argparse
+import random
+import statistics
+import time
+from benchmarks._django import setup_test_database
+
+
+def populate(size, start):
+    from app_bibliothecaire.barcodes import MEDIA, MEMBER, assign_barcodes
+    from app_bibliothecaire.models import Member, Media, Loan
+
+    Media.objects.bulk_create((Media(name=f'Media {i}', author='Auteur', availability=bool(i % 5))
+                               for i in range(start, size)), batch_size=1000)
+    members = Member.objects.bulk_create((Member(name=f'Nom {i}', first_name='Test')
+                                          for i in range(start // 10, size // 10)), batch_size=1000)
+    borrowed = Media.objects.filter(availability=False, loans__isnull=True).values_list('id', flat=True)
+    Loan.objects.bulk_create((Loan(borrower=members[i % len(members)], media_id=media_id)
+                              for i, media_id in enumerate(borrowed)), batch_size=1000)
+    assign_barcodes(MEDIA)
+    assign_barcodes(MEMBER)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--lookups', type=int, default=2000)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    from django.db import connection
+    from app_bibliothecaire.barcodes import MEDIA, MEMBER, lookup_barcode
+    from app_bibliothecaire.models import Member, Media
+    try:
+        start = 0
+        for size in sorted(args.sizes):
+            populate(size, start)
+            start = size
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            media_codes = list(Media.objects.values_list('barcode', flat=True))
+            member_codes = list(Member.objects.values_list('barcode', flat=True))
+            for label, kind, codes in (('média', MEDIA, media_codes), ('membre', MEMBER, member_codes)):
+                sample = random.choices(codes, k=args.lookups)
+                durations = []
+                for code in sample:
+                    begin = time.perf_counter()
+                    lookup_barcode(code, kind)
+                    durations.append((time.perf_counter() - begin) * 1000)
+                print(f"{size:7} médias  {label:7} médiane {statistics.median(durations):6.3f} ms   "
+                      f"p95 {statistics.quantiles(durations, n=20)[-1]:6.3f} ms")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+""" Compare l'emprunt d'un panier de 3 médias média par média (Loan.save(), comme la vue
+create_loan) et en une transaction (app_bibliothecaire.checkouts.lend_medias).
+
+Usage : python -m benchmarks.bench_checkout [--baskets 200] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+from benchmarks._django import setup_test_database
+
+BASKET_SIZE = 3
+
+
+def populate(baskets):
+    from app_bibliothecaire.models import Member, Book
+
+    members = Member.objects.bulk_create(Member(name=f'Nom {i}', first_name='Test') for i in range(baskets))
+    books = [Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100)
+             for i in range(baskets * BASKET_SIZE)]
+    return [(member.id, [book.id for book in books[i * BASKET_SIZE:(i + 1) * BASKET_SIZE]])
+            for i, member in enumerate(members)]
+
+
+def one_by_one(baskets):
+    from django.utils import timezone
+    from app_bibliothecaire.models import Loan, Media
+    for member_id, media_ids in baskets:
+        for media in Media.objects.filter(pk__in=media_ids):
+            Loan(borrower_id=member_id, media=media, loan_date=timezone.now()).save()
+
+
+def batch(baskets):
+    from app_bibliothecaire.checkouts import lend_medias
+    for member_id, media_ids in baskets:
+        lend_medias(member_id, media_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--baskets', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    from django.db import connection
+    from app_bibliothecaire.models import Member, Media, Loan
+    try:
+        for label, func in (('média par média (Loan.save())', one_by_one), ('par panier (lend_medias)', batch)):
+            durations, queries = [], []
+
+            def count(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            for _ in range(args.repeat):
+                Loan.objects.all().delete()
+                Media.objects.all().delete()
+                Member.objects.all().delete()
+                baskets = populate(args.baskets)
+                queries.clear()
+                with connection.execute_wrapper(count):
+                    start = time.perf_counter()
+                    func(baskets)
+                    durations.append((time.perf_counter() - start) * 1000)
+            print(f"{label:32} {statistics.median(durations) / args.baskets:6.2f} ms/panier   "
+                  f"{len(queries) / args.baskets:5.1f} requêtes/panier")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
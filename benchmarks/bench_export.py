@@ -0,0 +1,68 @@
+""" Mesure la mémoire et le débit de l'export en flux des emprunts.
+
+Usage : python -m benchmarks.bench_export [--loans 1000000]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import timedelta
+from benchmarks._django import setup_test_database
+
+
+def populate(loans):
+    from django.utils import timezone
+    from app_bibliothecaire.models import Member, Media, Loan
+
+    member = Member.objects.create(name='Bench', first_name='Export')
+    media = Media.objects.bulk_create(Media(name=f'Média {i}', author='Auteur') for i in range(1000))
+    now = timezone.now()
+    batch = []
+    for i in range(loans):
+        loan_date = now - timedelta(days=i % 365)
+        batch.append(Loan(borrower=member, media=media[i % len(media)], loan_date=loan_date,
+                          expected_return_date=loan_date.date() + timedelta(days=7),
+                          effective_return_date=loan_date.date() + timedelta(days=5)))
+        if len(batch) == 10000:
+            Loan.objects.bulk_create(batch)
+            batch = []
+    Loan.objects.bulk_create(batch)
+
+
+def measure(export_format, limit=None):
+    from app_bibliothecaire.exports import iter_export
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    lines = 0
+    size = 0
+    for line in iter_export('loans', export_format):
+        lines += 1
+        size += len(line)
+        if limit and lines > limit:
+            break
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return lines, size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loans', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    try:
+        populate(args.loans)
+        for export_format in ('csv', 'jsonl'):
+            # La mémoire de pointe doit être la même pour 10 000 lignes et pour tout l'export
+            for limit in (10_000, None):
+                lines, size, elapsed, peak = measure(export_format, limit)
+                print(f"{export_format:5} {lines:>9} lignes  {size / 2**20:8.1f} Mio  "
+                      f"{elapsed:6.2f} s  {lines / elapsed:>9.0f} lignes/s  pic mémoire {peak / 2**10:8.1f} Kio")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
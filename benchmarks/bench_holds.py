@@ -0,0 +1,71 @@
+""" Mesure la durée d'attribution des médias rendus à leur file de réservations
+(app_bibliothecaire.models.allocate_holds) et de la lecture des réservations prêtes d'un membre
+selon le nombre de réservations en base : elle ne doit pas en dépendre.
+
+Usage : python -m benchmarks.bench_holds [--sizes 1000 10000 100000] [--runs 500]
+"""
+import argparse
+import random
+import statistics
+import time
+from benchmarks._django import setup_test_database
+
+MEDIAS = 2000
+MEMBERS = 5000
+
+
+def populate(size, start, medias, members):
+    from app_bibliothecaire.models import Hold
+
+    # 90 % de réservations closes, 10 % en attente ; au plus une réservation ouverte par membre et par média
+    Hold.objects.bulk_create((Hold(media_id=medias[i % MEDIAS], member_id=members[(i // MEDIAS) % MEMBERS],
+                                   status=Hold.WAITING if i % 10 == 0 else Hold.FULFILLED)
+                              for i in range(start, size)), batch_size=1000)
+
+
+def median_ms(func, runs):
+    durations = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--runs', type=int, default=500)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    from django.db import connection, transaction
+    from app_bibliothecaire.holds import ready_holds
+    from app_bibliothecaire.models import Member, Media, allocate_holds
+    try:
+        medias = [media.id for media in Media.objects.bulk_create(
+            Media(name=f'Media {i}', author='Auteur', availability=False) for i in range(MEDIAS))]
+        members = [member.id for member in Member.objects.bulk_create(
+            Member(name=f'Nom {i}', first_name='Test') for i in range(MEMBERS))]
+        start = 0
+        for size in sorted(args.sizes):
+            populate(size, start, medias, members)
+            start = size
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            def allocate():
+                # Attribution annulée en fin de mesure : la file reste identique d'une mesure à l'autre
+                with transaction.atomic():
+                    allocate_holds(random.sample(medias, 10))
+                    transaction.set_rollback(True)
+
+            print(f"{size:7} réservations   attribution de 10 retours {median_ms(allocate, args.runs):6.3f} ms   "
+                  f"réservations prêtes d'un membre "
+                  f"{median_ms(lambda: ready_holds(random.choice(members)), args.runs):6.3f} ms")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+""" Mesure le débit de l'import de médias par lots, en lignes par seconde.
+
+Usage : python -m benchmarks.bench_import [--rows 20000] [--batch-size 500]
+"""
+import argparse
+import io
+import time
+from benchmarks._django import setup_test_database
+
+TYPES = ('book', 'dvd', 'cd', 'board')
+
+
+def generate_csv(rows):
+    lines = ["type,name,author,nb_pages,genre,release_date,number_players_min,number_players_max"]
+    for i in range(rows):
+        media_type = TYPES[i % len(TYPES)]
+        lines.append(f"{media_type},Média {i},Auteur {i % 500},{i % 900},Genre,2001-01-01,2,6")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    try:
+        from app_bibliothecaire.imports import read_rows, import_media
+        from app_bibliothecaire.models import Media
+
+        data = generate_csv(args.rows)
+        start = time.perf_counter()
+        result = import_media(read_rows(io.StringIO(data), 'csv'), batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        assert result.created == Media.objects.count() == args.rows
+        print(f"import : {result.created} lignes en {elapsed:.2f} s, {result.created / elapsed:.0f} lignes/s "
+              f"(lots de {args.batch_size})")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
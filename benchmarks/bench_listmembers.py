@@ -0,0 +1,48 @@
+""" Mesure le temps de rendu de la liste des membres pour un grand nombre de membres.
+
+Usage : python -m benchmarks.bench_listmembers [--members 15000] [--repeat 20]
+"""
+import argparse
+import statistics
+import time
+from benchmarks._django import setup_test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--members', type=int, default=15_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    try:
+        from django.test import Client
+        from django.urls import reverse
+        from django.utils import timezone
+        from app_bibliothecaire.models import Member, Media, Loan, refresh_loan_counters
+
+        members = Member.objects.bulk_create(
+            Member(name=f'Nom {i:05d}', first_name='Prénom') for i in range(args.members))
+        medias = Media.objects.bulk_create(
+            Media(name=f'Média {i}', author='Auteur', availability=False) for i in range(args.members // 5))
+        Loan.objects.bulk_create(
+            Loan(borrower=members[i * 5], media=media, loan_date=timezone.now()) for i, media in enumerate(medias))
+        refresh_loan_counters()
+
+        client = Client()
+        url = reverse('app_bibliothecaire:listmembres')
+        for label, params in (('première page', {}), ('recherche', {'q': 'Nom 1234'})):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                response = client.get(url, params)
+                timings.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200
+            print(f"{label:14} médiane {statistics.median(timings):6.1f} ms  max {max(timings):6.1f} ms "
+                  f"({args.members} membres)")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
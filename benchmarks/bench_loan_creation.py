@@ -0,0 +1,94 @@
+""" Compare le nombre de créations d'emprunts par seconde avant et après l'agrégation
+des vérifications de Loan.save, pour un membre ayant un long historique d'emprunts.
+
+Usage : python -m benchmarks.bench_loan_creation [--history 20000] [--loans 2000]
+"""
+import argparse
+import time
+from datetime import timedelta
+from benchmarks._django import setup_test_database
+
+
+def legacy_create(member, media, loan_date):
+    """ Reproduit l'ancien Loan.save : deux requêtes de vérification puis un save() complet du média. """
+    from django.db import models
+    from django.utils import timezone
+    from app_bibliothecaire.models import Loan
+
+    loan = Loan(borrower=member, media=media, loan_date=loan_date)
+    loan.check_availability_media()
+    if Loan.objects.filter(borrower=member, effective_return_date__isnull=True).count() >= 3:
+        raise ValueError
+    if Loan.objects.filter(borrower=member, effective_return_date__isnull=True,
+                           expected_return_date__lt=timezone.now().date()).exists():
+        raise ValueError
+    media.availability = False
+    media.save()
+    models.Model.save(loan)
+    return loan
+
+
+def current_create(member, media, loan_date):
+    from app_bibliothecaire.models import Loan
+
+    return Loan.objects.create(borrower=member, media=media, loan_date=loan_date)
+
+
+def legacy_return(loan, return_date):
+    from app_bibliothecaire.models import Loan, Media
+
+    Loan.objects.filter(pk=loan.pk).update(effective_return_date=return_date)
+    Media.objects.filter(pk=loan.media_id).update(availability=True)
+
+
+def current_return(loan, return_date):
+    loan.effective_return_date = return_date
+    loan.save()
+
+
+def run(create, give_back, member, books, loans):
+    from django.utils import timezone
+
+    now = timezone.now()
+    elapsed = 0.0
+    for i in range(loans):
+        book = books[i % len(books)]
+        start = time.perf_counter()
+        loan = create(member, book, now)
+        elapsed += time.perf_counter() - start
+        # Le retour n'est pas mesuré : il remet le membre et le média dans leur état initial
+        give_back(loan, now.date())
+        book.availability = True
+    return loans / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--history', type=int, default=20_000, help="Emprunts déjà rendus par le membre.")
+    parser.add_argument('--loans', type=int, default=2_000, help="Emprunts créés par mesure.")
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    try:
+        from django.utils import timezone
+        from app_bibliothecaire.models import Member, Book, Loan
+
+        member = Member.objects.create(name='Bench', first_name='Historique')
+        books = [Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100) for i in range(50)]
+        now = timezone.now()
+        Loan.objects.bulk_create(
+            Loan(borrower=member, media=books[i % len(books)], loan_date=now - timedelta(days=i % 3000),
+                 effective_return_date=(now - timedelta(days=i % 3000)).date())
+            for i in range(args.history)
+        )
+
+        for label, create, give_back in (('avant', legacy_create, legacy_return),
+                                         ('après', current_create, current_return)):
+            print(f"{label:6} {run(create, give_back, member, books, args.loans):8.0f} emprunts/s "
+                  f"({args.history} emprunts dans l'historique du membre)")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
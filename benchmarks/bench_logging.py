@@ -0,0 +1,88 @@
+""" Mesure le coût de la journalisation par requête, dans le thread de la requête :
+gestionnaire de fichier synchrone (configuration d'origine) contre file + thread d'écoute.
+
+Chaque « requête » émet les lignes d'une vue de liste : un INFO, un DEBUG avec arguments
+et la ligne d'accès du middleware. Mesure aussi un DEBUG désactivé, en f-string et en %.
+
+Usage : python -m benchmarks.bench_logging [--requests 20000]
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+class FsyncFileHandler(logging.FileHandler):
+    """ Fichier forcé sur disque à chaque ligne : simule un disque lent ou un volume réseau. """
+
+    def emit(self, record):
+        super().emit(record)
+        os.fsync(self.stream.fileno())
+
+
+def configure(logger, handler, level=logging.DEBUG):
+    for old in logger.handlers[:]:
+        logger.removeHandler(old)
+        old.close()
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def one_request(logger, items):
+    logger.info("Accès à la liste des membres.")
+    logger.debug("%s membres récupérés.", len(items))
+    logger.info("%s %s %s (%s ms)", 'GET', '/bibliothecaire/listmembres/', 200, 12.5)
+
+
+def per_request_us(logger, requests, items):
+    start = time.perf_counter()
+    for _ in range(requests):
+        one_request(logger, items)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20_000)
+    args = parser.parse_args()
+
+    from my_mediatheque_project.log import JsonFormatter, QueueListenerHandler, RequestContextFilter
+    logger = logging.getLogger('bench_logging')
+    items = list(range(50))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, handler_class, requests in (('fichier', logging.FileHandler, args.requests),
+                                               ('fichier + fsync', FsyncFileHandler, args.requests // 20)):
+            synchronous = handler_class(Path(tmp) / 'sync.log', encoding='utf-8')
+            synchronous.setFormatter(logging.Formatter('{levelname} {asctime} {module} {message}', style='{'))
+            configure(logger, synchronous)
+            print(f"{'Synchrone, ' + label:38} {per_request_us(logger, requests, items):8.1f} µs/requête")
+
+            target = handler_class(Path(tmp) / 'queued.jsonl', encoding='utf-8')
+            target.setFormatter(JsonFormatter())
+            queued = QueueListenerHandler([target])
+            queued.addFilter(RequestContextFilter())
+            configure(logger, queued)
+            print(f"{'File + thread, JSON, ' + label:38} {per_request_us(logger, requests, items):8.1f} µs/requête")
+            start = time.perf_counter()
+            queued.flush()
+            print(f"{'  (écriture restante en fond)':38} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        # Niveau DEBUG désactivé : la f-string est construite quand même, pas le message en %
+        logger.setLevel(logging.INFO)
+        for label, emit in (('DEBUG désactivé, f-string', lambda: logger.debug(f"{len(items)} membres : {items}")),
+                            ('DEBUG désactivé, arguments %', lambda: logger.debug("%s membres : %s", len(items),
+                                                                                 items))):
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                emit()
+            print(f"{label:38} {(time.perf_counter() - start) / args.requests * 1e9:8.0f} ns/appel")
+        configure(logger, logging.NullHandler())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+""" Compare la lecture du catalogue par l'héritage multi-table (une requête par sous-type,
+ou une requête avec quatre jointures) et par le modèle de lecture MediaFlat.
+
+Usage : python -m benchmarks.bench_read_model [--medias 50000] [--repeat 10]
+"""
+import argparse
+import statistics
+import time
+from benchmarks._django import setup_test_database
+
+
+def populate(medias):
+    from app_bibliothecaire.imports import import_media
+
+    types = ('book', 'dvd', 'cd', 'board')
+    rows = ((i, {'type': types[i % 4], 'name': f'Média {i}', 'author': f'Auteur {i % 500}',
+                 'nb_pages': '100', 'genre': 'Drame', 'number_players_min': '2', 'number_players_max': '4'})
+            for i in range(medias))
+    import_media(rows, batch_size=2000)
+
+
+def mti_four_queries():
+    # Lecture d'origine : une requête par sous-type (chacune jointe à Media), avec ses emprunts en cours
+    from app_bibliothecaire.catalogue import active_loans_prefetch
+    from app_bibliothecaire.models import Book, Dvd, Cd, Board
+    return sum(len(list(model.objects.prefetch_related(active_loans_prefetch())))
+               for model in (Book, Dvd, Cd, Board))
+
+
+def mti_joins():
+    # Une requête sur Media avec LEFT JOIN sur les quatre sous-types, puis les emprunts
+    from app_bibliothecaire.catalogue import SUBTYPES, active_loans_prefetch
+    from app_bibliothecaire.models import Media
+    return len(list(Media.objects.select_related(*(subtype for subtype, _ in SUBTYPES))
+                    .prefetch_related(active_loans_prefetch())))
+
+
+def flat():
+    from app_bibliothecaire.catalogue import catalogue_queryset
+    return len(list(catalogue_queryset()))
+
+
+def mti_page():
+    from app_bibliothecaire.catalogue import SUBTYPES, active_loans_prefetch
+    from app_bibliothecaire.models import Media
+    from app_bibliothecaire.pagination import keyset_page
+    queryset = Media.objects.select_related(*(subtype for subtype, _ in SUBTYPES)).prefetch_related(
+        active_loans_prefetch())
+    return len(keyset_page(queryset).items)
+
+
+def flat_page():
+    from app_bibliothecaire.catalogue import catalogue_queryset
+    from app_bibliothecaire.pagination import keyset_page
+    return len(keyset_page(catalogue_queryset()).items)
+
+
+def mti_export():
+    # Mêmes lignes que iter_rows('media'), lues par jointures sur les sous-types
+    from app_bibliothecaire.exports import _format_value
+    from app_bibliothecaire.models import Media
+    columns = ('id', 'name', 'author', 'category', 'availability', 'book__nb_pages', 'dvd__genre',
+               'cd__release_date', 'board__number_players_min', 'board__number_players_max')
+    rows = Media.objects.order_by('id').values_list(*columns).iterator(chunk_size=2000)
+    return sum(1 for row in rows if tuple(_format_value(value) for value in row))
+
+
+def flat_export():
+    from app_bibliothecaire.exports import iter_rows
+    return sum(1 for _ in iter_rows('media'))
+
+
+def timed(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--medias', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    try:
+        populate(args.medias)
+        for label, func in (('catalogue complet, 4 requêtes MTI', mti_four_queries),
+                            ('catalogue complet, MTI + 4 jointures', mti_joins),
+                            ('catalogue complet, MediaFlat', flat),
+                            ('page de 50, MTI + 4 jointures', mti_page),
+                            ('page de 50, MediaFlat', flat_page),
+                            ('export, MTI + 4 jointures', mti_export),
+                            ('export, MediaFlat', flat_export)):
+            print(f"{label:38} {timed(func, args.repeat):9.1f} ms")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
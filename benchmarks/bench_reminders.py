@@ -0,0 +1,68 @@
+""" Mesure la durée et la mémoire de pointe de l'envoi des relances d'emprunts en retard.
+
+Usage : python -m benchmarks.bench_reminders [--loans 50000] [--loans-per-member 3]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import timedelta
+from benchmarks._django import setup_test_database
+
+
+def populate(loans, loans_per_member):
+    from django.utils import timezone
+    from app_bibliothecaire.models import Member, Media, Loan
+
+    today = timezone.now().date()
+    members = Member.objects.bulk_create(
+        Member(name=f'Membre {i}', first_name='Bench', email=f'membre{i}@example.com')
+        for i in range(loans // loans_per_member + 1))
+    media = Media.objects.bulk_create(
+        (Media(name=f'Média {i}', author='Auteur', availability=False) for i in range(loans)), batch_size=5000)
+    Loan.objects.bulk_create(
+        (Loan(borrower=members[i // loans_per_member], media=media[i], loan_date=timezone.now(),
+              expected_return_date=today - timedelta(days=1 + i % 30)) for i in range(loans)),
+        batch_size=5000)
+
+
+def measure():
+    from app_bibliothecaire.models import OverdueReminder
+    from app_bibliothecaire.reminders import send_overdue_reminders
+
+    start = time.perf_counter()
+    result = send_overdue_reminders()
+    elapsed = time.perf_counter() - start
+    # Seconde exécution sous tracemalloc, qui ralentit le code mesuré : pic mémoire seulement
+    OverdueReminder.objects.all().delete()
+    tracemalloc.start()
+    send_overdue_reminders()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loans', type=int, default=50_000)
+    parser.add_argument('--loans-per-member', type=int, default=3)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    try:
+        from django.test import override_settings
+        # Le backend factice n'envoie rien et ne conserve pas les messages
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend'):
+            # La mémoire de pointe doit être la même pour un dixième des retards et pour le reste :
+            # les emprunts déjà relancés par le premier passage ne le sont plus au second.
+            for loans in (args.loans // 10, args.loans - args.loans // 10):
+                populate(loans, args.loans_per_member)
+                result, elapsed, peak = measure()
+                print(f"{result.loans:>7} retards  {result.members:>6} membres  {result.batches:>4} lots  "
+                      f"{elapsed:6.2f} s  {result.loans / elapsed:>7.0f} emprunts/s  "
+                      f"pic mémoire {peak / 2**20:6.1f} Mio")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+""" Compare le retour de N emprunts un par un (Loan.save(), comme la vue return_loan)
+et en un lot (app_bibliothecaire.returns.return_loans).
+
+Usage : python -m benchmarks.bench_returns [--loans 300] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+from benchmarks._django import setup_test_database
+
+
+def populate(loans):
+    from django.utils import timezone
+    from app_bibliothecaire.models import Member, Book, Loan
+
+    members = Member.objects.bulk_create(Member(name=f'Nom {i}', first_name='Test') for i in range(loans))
+    books = [Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100) for i in range(loans)]
+    return [Loan.objects.create(borrower=member, media=book, loan_date=timezone.now()).media_id
+            for member, book in zip(members, books)]
+
+
+def one_by_one(media_ids):
+    from django.utils import timezone
+    from app_bibliothecaire.models import Loan
+    for media_id in media_ids:
+        loan = Loan.objects.select_related('media').get(media_id=media_id, effective_return_date__isnull=True)
+        loan.effective_return_date = timezone.localdate()
+        loan.save()
+
+
+def batch(media_ids):
+    from app_bibliothecaire.returns import return_loans
+    return_loans(media_ids=media_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loans', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    from django.db import connection
+    from app_bibliothecaire.models import Member, Media, Loan
+    try:
+        for label, func in (('un par un (Loan.save())', one_by_one), ('par lot (return_loans)', batch)):
+            durations, queries = [], []
+
+            def count(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            for _ in range(args.repeat):
+                Loan.objects.all().delete()
+                Media.objects.all().delete()
+                Member.objects.all().delete()
+                media_ids = populate(args.loans)
+                queries.clear()
+                with connection.execute_wrapper(count):
+                    start = time.perf_counter()
+                    func(media_ids)
+                    durations.append((time.perf_counter() - start) * 1000)
+            print(f"{label:26} {statistics.median(durations):8.1f} ms   {len(queries):5} requêtes")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
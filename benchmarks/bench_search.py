@@ -0,0 +1,62 @@
+""" Compare la recherche plein texte FTS5 à un parcours icontains, sur un grand catalogue.
+
+Usage : python -m benchmarks.bench_search [--items 100000] [--repeat 30]
+"""
+import argparse
+import random
+import statistics
+import time
+from benchmarks._django import setup_test_database
+
+SYLLABLES = ("ba", "cho", "dé", "fi", "gu", "la", "mo", "né", "pi", "ro", "sa", "tè", "vu", "zi", "ran", "lon")
+
+
+def vocabulary(rng, size):
+    # Mots inventés : chacun n'apparaît que dans une petite partie du catalogue, comme de vrais titres
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    try:
+        from app_bibliothecaire.models import Media
+        from app_bibliothecaire.search import search_media, _scan_search_ids
+
+        rng = random.Random(0)
+        words = vocabulary(rng, 20_000)
+        for start in range(0, args.items, 10_000):
+            Media.objects.bulk_create(
+                Media(name=' '.join(rng.sample(words, 3)).capitalize(), author=' '.join(rng.sample(words, 2)),
+                      category=('book', 'dvd', 'cd', 'board')[i % 4])
+                for i in range(start, min(start + 10_000, args.items))
+            )
+
+        # Mots entiers, préfixes et combinaisons ; le dernier préfixe, très court, est le pire cas
+        queries = [words[100], words[5000][:4], f"{words[7000]} {words[12000][:3]}", words[15000], "ba"]
+        for query in queries:
+            fts = median_ms(lambda: search_media(query, limit=20), args.repeat)
+            scan = median_ms(lambda: _scan_search_ids(query, None, None, 20), args.repeat)
+            print(f"{query!r:18} FTS5 {fts:7.2f} ms   icontains {scan:8.2f} ms   ({args.items} médias)")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
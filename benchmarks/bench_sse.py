@@ -0,0 +1,151 @@
+""" Charge du flux Server-Sent Events des changements de disponibilité : N connexions inactives
+tenues par un seul worker (une boucle d'événements), puis des changements publiés depuis un
+autre thread, comme le ferait une vue synchrone.
+
+Mesure le temps d'ouverture des connexions et le délai de diffusion d'un événement à toutes
+les connexions (médiane et p99 sur --rounds publications) ; avec --memory, la mémoire occupée
+par connexion (tracemalloc, qui ralentit l'ouverture des connexions).
+
+Par défaut, les connexions passent par le gestionnaire ASGI de Django dans le processus du
+benchmark, sans serveur ni réseau. Avec --url, elles sont ouvertes sur un serveur déjà lancé,
+et seuls l'ouverture et le maintien des connexions sont mesurés, par exemple :
+    DJANGO_ASYNC_VIEWS=1 uvicorn --workers 1 my_mediatheque_project.asgi:application
+
+Usage : python -m benchmarks.bench_sse [--connections 1000] [--rounds 20] [--memory]
+        [--hold 5] [--url http://127.0.0.1:8000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+from benchmarks._django import setup_test_database
+
+PATH = '/membre/evenements/disponibilite/'
+
+
+class Connection:
+    """ Client ASGI inactif : reçoit le flux, et se déconnecte sur demande. """
+
+    def __init__(self, loop):
+        self.disconnect = asyncio.Event()
+        self.requested = False
+        self.opened = loop.create_future()
+        self.chunks = 0
+        self.received = {}  # identifiant d'événement -> instant de réception
+
+    def scope(self):
+        return {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': PATH, 'raw_path': PATH.encode(), 'query_string': b'',
+                'root_path': '', 'headers': [(b'host', b'testserver')], 'client': ('127.0.0.1', 0),
+                'server': ('testserver', 80)}
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            assert message['status'] == 200, message['status']
+        elif message['type'] == 'http.response.body':
+            self.chunks += 1
+            body = message.get('body', b'')
+            if body.startswith(b'retry:') and not self.opened.done():
+                self.opened.set_result(None)
+            elif body.startswith(b'id: '):
+                self.received[body[4:body.index(b'\n')].decode()] = time.perf_counter()
+
+
+def summary(label, values, unit='ms'):
+    p99 = statistics.quantiles(values, n=100)[98] if len(values) > 1 else values[0]
+    print(f"{label:38} médiane {statistics.median(values):8.2f} {unit}   p99 {p99:8.2f} {unit}")
+
+
+async def bench_asgi(connections, rounds, memory):
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from app_bibliothecaire.events import AVAILABILITY, broker
+    settings.ASYNC_VIEWS = True
+    application = get_asgi_application()
+    loop = asyncio.get_running_loop()
+
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    clients = [Connection(loop) for _ in range(connections)]
+    tasks = [asyncio.create_task(application(client.scope(), client.receive, client.send)) for client in clients]
+    await asyncio.gather(*(client.opened for client in clients))
+    print(f"{broker.subscribers} connexions ouvertes en {(time.perf_counter() - start) * 1000:.0f} ms")
+    if memory:
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"Mémoire : {used / connections / 1024:.1f} Kio par connexion")
+
+    # Publications depuis un autre thread, comme après la validation d'un emprunt
+    delays = []
+    for i in range(rounds):
+        published = time.perf_counter()
+        event = await asyncio.to_thread(broker.publish, AVAILABILITY, {'media_ids': [i], 'available': True})
+        while sum(event.id in client.received for client in clients) < connections:
+            await asyncio.sleep(0.001)
+        delays.append((max(client.received[event.id] for client in clients) - published) * 1000)
+    summary(f"Diffusion à {connections} connexions", delays)
+
+    for client in clients:
+        client.disconnect.set()
+    await asyncio.gather(*tasks)
+    print(f"Abonnés restants après déconnexion : {broker.subscribers}")
+
+
+async def bench_url(base_url, connections, hold):
+    url = urlsplit(base_url)
+    request = (f"GET {PATH} HTTP/1.1\r\nHost: {url.netloc}\r\nAccept: text/event-stream\r\n\r\n").encode()
+
+    async def open_stream():
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+        writer.write(request)
+        status = await reader.readline()
+        assert b' 200 ' in status, status
+        # En-têtes, puis la directive 'retry' envoyée dès l'abonnement
+        while not (await reader.readline()).startswith(b'retry:') and not reader.at_eof():
+            pass
+        return reader, writer, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    streams = await asyncio.gather(*(open_stream() for _ in range(connections)))
+    print(f"{connections} connexions ouvertes en {(time.perf_counter() - start) * 1000:.0f} ms")
+    summary("Ouverture d'une connexion", [delay for _, _, delay in streams])
+    await asyncio.sleep(hold)
+    alive = sum(not reader.at_eof() for reader, _, _ in streams)
+    print(f"Connexions toujours ouvertes après {hold} s : {alive}")
+    for _, writer, _ in streams:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--memory', action='store_true', help="Mesure la mémoire par connexion")
+    parser.add_argument('--hold', type=int, default=5, help="Durée (en secondes) du maintien des connexions (--url)")
+    parser.add_argument('--url', help="Serveur à interroger plutôt que le gestionnaire en processus")
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(bench_url(args.url, args.connections, args.hold))
+        return
+
+    teardown = setup_test_database()
+    try:
+        asyncio.run(bench_asgi(args.connections, args.rounds, args.memory))
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
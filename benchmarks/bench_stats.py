@@ -0,0 +1,99 @@
+""" Compare le tableau de bord des statistiques (agrégats) au calcul direct sur les emprunts,
+et mesure le recalcul complet puis incrémental des agrégats.
+
+Usage : python -m benchmarks.bench_stats [--loans 200000] [--repeat 20]
+"""
+import argparse
+import statistics
+import time
+from datetime import timedelta
+from benchmarks._django import setup_test_database
+
+
+def populate(loans, start=0, history=True):
+    """ Ajoute des emprunts rendus, répartis sur l'année écoulée (history=True) ou commencés ce jour. """
+    from django.db.models import F
+    from django.utils import timezone
+    from app_bibliothecaire.models import Member, Media, Loan
+
+    member = Member.objects.first() or Member.objects.create(name='Bench', first_name='Stats')
+    media = list(Media.objects.all()) or Media.objects.bulk_create(
+        Media(name=f'Média {i}', author='Auteur', category=('book', 'dvd', 'cd', 'board')[i % 4])
+        for i in range(2000))
+    now = timezone.now()
+    batch = []
+    for i in range(start, start + loans):
+        loan_date = now - timedelta(days=i % 365, hours=i % 24) if history else now
+        batch.append(Loan(borrower=member, media=media[i % len(media)], loan_date=loan_date,
+                          expected_return_date=loan_date.date() + timedelta(days=7),
+                          effective_return_date=loan_date.date() + timedelta(days=3 + i % 9)))
+        if len(batch) == 10000:
+            Loan.objects.bulk_create(batch)
+            batch = []
+    Loan.objects.bulk_create(batch)
+    if history:
+        # Un emprunt ancien a été modifié pour la dernière fois lors de son retour
+        Loan.objects.filter(effective_return_date__isnull=False, modified_at__gt=now - timedelta(minutes=1)) \
+            .update(modified_at=F('loan_date') + timedelta(days=3))
+
+
+def direct_dashboard(first, last):
+    # Calcul à la volée sur l'historique des emprunts, pour comparaison
+    from django.db.models import Count, F
+    from django.db.models.functions import TruncDate
+    from app_bibliothecaire.models import Loan
+
+    loans = Loan.objects.filter(loan_date__date__range=(first, last))
+    list(loans.annotate(day=TruncDate('loan_date')).values('day', category=F('media__category'))
+         .annotate(n=Count('id')).order_by())
+    list(loans.values('media_id', name=F('media__name')).annotate(n=Count('id')).order_by('-n')[:10])
+    returned = Loan.objects.filter(effective_return_date__range=(first, last))
+    returned.count()
+    returned.filter(effective_return_date__gt=F('expected_return_date')).count()
+
+
+def timed(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loans', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    teardown = setup_test_database()
+    try:
+        from django.utils import timezone
+        from app_bibliothecaire.stats import get_dashboard, refresh_circulation_stats
+
+        last = timezone.localdate()
+        first = last - timedelta(days=29)
+        loaded = 0
+        for loans in (args.loans // 10, args.loans):
+            populate(loans - loaded, start=loaded)
+            loaded = loans
+            start = time.perf_counter()
+            refresh_circulation_stats(full=True)
+            full = time.perf_counter() - start
+            # Activité d'une journée : seuls les jours touchés sont recalculés
+            populate(100, start=loaded, history=False)
+            loaded += 100
+            start = time.perf_counter()
+            days = refresh_circulation_stats()
+            incremental = (time.perf_counter() - start) * 1000
+            print(f"{loaded:>8} emprunts  recalcul complet {full:6.2f} s  "
+                  f"incrémental ({days} jours) {incremental:7.1f} ms  "
+                  f"tableau de bord {timed(lambda: get_dashboard(first, last), args.repeat):6.1f} ms  "
+                  f"calcul direct {timed(lambda: direct_dashboard(first, last), args.repeat):7.1f} ms")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
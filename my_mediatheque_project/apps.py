@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class MediathequeProjectConfig(AppConfig):
+    """ Réglages du projet propres à chaque connexion à la base, quelle que soit l'application. """
+    name = 'my_mediatheque_project'
+    label = 'mediatheque_project'
+
+    def ready(self):
+        from my_mediatheque_project.database import tune_sqlite_connection
+        from my_mediatheque_project.metrics import record_connection_queries
+        connection_created.connect(tune_sqlite_connection, dispatch_uid='tune_sqlite_connection')
+        connection_created.connect(record_connection_queries, dispatch_uid='record_connection_queries')
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_mediatheque_project.settings')
+# Sous ASGI, les vues de consultation sont servies par leurs versions asynchrones
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,117 @@
+""" Configuration de la base de données à partir des variables d'environnement.
+
+Profils (DJANGO_DB_ENGINE) :
+    - sqlite (par défaut) : fichier DJANGO_DB_NAME (db.sqlite3). Le mode WAL, enregistré dans
+      le fichier, est activé une fois par la migration app_bibliothecaire 0029_sqlite_wal
+      (manage.py migrate). Les PRAGMA de SQLITE_PRAGMAS, propres à chaque connexion, sont
+      appliqués à son ouverture (tune_sqlite_connection(), receveur de connection_created).
+    - postgresql : serveur DJANGO_DB_HOST:DJANGO_DB_PORT, avec le pool de connexions natif
+      de Django 5.1 (nécessite psycopg[pool]).
+
+Variables communes : DJANGO_DB_NAME, DJANGO_DB_CONN_MAX_AGE (secondes, SQLite seulement).
+SQLite : DJANGO_SQLITE_BUSY_TIMEOUT (ms), DJANGO_SQLITE_MMAP_SIZE (octets),
+DJANGO_SQLITE_SYNCHRONOUS.
+PostgreSQL : DJANGO_DB_USER, DJANGO_DB_PASSWORD, DJANGO_DB_HOST, DJANGO_DB_PORT,
+DJANGO_DB_POOL_MIN_SIZE, DJANGO_DB_POOL_MAX_SIZE, DJANGO_DB_POOL_TIMEOUT (secondes).
+"""
+from django.conf import settings
+
+ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgresql': 'django.db.backends.postgresql',
+}
+
+
+def _int(environ, name, default):
+    value = environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def sqlite_pragmas(environ):
+    """ Retourne les PRAGMA appliqués à chaque connexion SQLite, dans l'ordre d'exécution.
+    Aucun n'est enregistré dans le fichier de la base : ouvrir une connexion ne le modifie pas.
+
+    - synchronous=NORMAL : sans risque de corruption en WAL, un fsync par point de contrôle
+      plutôt qu'à chaque transaction.
+    - busy_timeout : un écrivain attend le verrou au lieu d'échouer avec "database is locked".
+    - mmap_size : lectures par projection mémoire plutôt que par appels read().
+    """
+    return {
+        'synchronous': environ.get('DJANGO_SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': _int(environ, 'DJANGO_SQLITE_BUSY_TIMEOUT', 5000),
+        'mmap_size': _int(environ, 'DJANGO_SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'temp_store': 'MEMORY',
+    }
+
+
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """ Receveur de connection_created (voir apps.MediathequeProjectConfig) : applique
+    SQLITE_PRAGMAS à chaque nouvelle connexion SQLite.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def sqlite_config(environ, base_dir):
+    pragmas = sqlite_pragmas(environ)
+    return {
+        'ENGINE': ENGINES['sqlite'],
+        'NAME': environ.get('DJANGO_DB_NAME') or base_dir / 'db.sqlite3',
+        # Connexions persistantes : les PRAGMA ne sont exécutés qu'à l'ouverture
+        'CONN_MAX_AGE': _int(environ, 'DJANGO_DB_CONN_MAX_AGE', 600),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Attente du verrou par le module sqlite3, en secondes (même valeur que busy_timeout)
+            'timeout': pragmas['busy_timeout'] / 1000,
+            # BEGIN IMMEDIATE : une transaction prend le verrou d'écriture dès son début.
+            # En mode DEFERRED, une transaction qui lit puis écrit échoue sans attendre
+            # (busy_timeout ignoré) si un autre écrivain a validé entre-temps.
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # Base de test sur fichier plutôt qu'en mémoire : les tests de concurrence
+        # ouvrent une connexion par thread et doivent attendre les verrous d'écriture.
+        'TEST': {
+            'NAME': base_dir / 'test_db.sqlite3',
+        },
+    }
+
+
+def postgresql_config(environ):
+    return {
+        'ENGINE': ENGINES['postgresql'],
+        'NAME': environ.get('DJANGO_DB_NAME', 'mediatheque'),
+        'USER': environ.get('DJANGO_DB_USER', ''),
+        'PASSWORD': environ.get('DJANGO_DB_PASSWORD', ''),
+        'HOST': environ.get('DJANGO_DB_HOST', ''),
+        'PORT': environ.get('DJANGO_DB_PORT', ''),
+        # Le pool remplace les connexions persistantes, incompatibles avec lui
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'pool': {
+                'min_size': _int(environ, 'DJANGO_DB_POOL_MIN_SIZE', 2),
+                'max_size': _int(environ, 'DJANGO_DB_POOL_MAX_SIZE', 10),
+                'timeout': _int(environ, 'DJANGO_DB_POOL_TIMEOUT', 10),
+            },
+        },
+    }
+
+
+def database_config(environ, base_dir):
+    """ Construit le réglage DATABASES['default'] du profil DJANGO_DB_ENGINE.
+
+    Paramètres :
+        - environ (dict) : Variables d'environnement (os.environ).
+        - base_dir (Path) : Racine du projet, où se trouve la base SQLite par défaut.
+
+    Retour :
+        - dict : La configuration de la base par défaut.
+    """
+    engine = environ.get('DJANGO_DB_ENGINE', 'sqlite')
+    if engine not in ENGINES:
+        raise ValueError(f"DJANGO_DB_ENGINE inconnu : '{engine}' (valeurs possibles : {', '.join(ENGINES)}).")
+    if engine == 'postgresql':
+        return postgresql_config(environ)
+    return sqlite_config(environ, base_dir)
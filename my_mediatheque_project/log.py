@@ -0,0 +1,138 @@
+""" Journalisation non bloquante : les vues déposent les enregistrements dans une file,
+et un thread d'écoute (QueueListener) les formate et les écrit dans les journaux.
+
+Configuration dans settings.py :
+    LOGGING_CONFIG = 'my_mediatheque_project.log.configure_logging'
+    LOGGING = {..., 'handlers': {..., 'queue': {
+        '()': 'my_mediatheque_project.log.QueueListenerHandler',
+        'handlers': ['console', 'file'],
+        'filters': ['request'],
+    }}}
+Les gestionnaires cibles sont désignés par leur nom : configure_logging() les résout une fois
+tous les gestionnaires créés, quel que soit l'ordre de leurs noms.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.config
+import queue
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Identifiant et instant de début de la requête en cours (thread ou tâche asynchrone)
+request_id_var = contextvars.ContextVar('request_id', default=None)
+request_start_var = contextvars.ContextVar('request_start', default=None)
+
+
+class RequestContextFilter(logging.Filter):
+    """ Ajoute à chaque enregistrement l'identifiant de la requête en cours ('request_id')
+    et le temps écoulé depuis son début en millisecondes ('duration_ms'), ou None hors requête.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        if not hasattr(record, 'duration_ms'):
+            start = request_start_var.get()
+            record.duration_ms = round((time.perf_counter() - start) * 1000, 2) if start is not None else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """ Formate chaque enregistrement en une ligne JSON. """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'duration_ms': getattr(record, 'duration_ms', None),
+        }
+        for key in ('method', 'path', 'status'):
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueueListenerHandler(QueueHandler):
+    """ Dépose les enregistrements dans une file, vidée par un thread qui les transmet aux
+    gestionnaires cibles. Le thread de la requête ne fait ni écriture ni formatage.
+
+    Paramètres :
+        - handlers (list) : Gestionnaires cibles, chacun avec son niveau et son formateur, ou
+          leurs noms dans LOGGING : le thread d'écoute est alors démarré par configure_logging().
+        - maxsize (int) : Taille maximale de la file (0 : illimitée). File pleine : l'appelant attend.
+    """
+
+    def __init__(self, handlers, maxsize=0):
+        super().__init__(queue.Queue(maxsize))
+        self.listener = None
+        self.listening = False
+        handlers = list(handlers)
+        self.target_names = [name for name in handlers if isinstance(name, str)]
+        if not self.target_names:
+            self.start(handlers)
+
+    def start(self, handlers):
+        """ Démarre le thread d'écoute, qui transmet les enregistrements aux gestionnaires 'handlers'. """
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self.listening = True
+        atexit.register(self.close)
+
+    def prepare(self, record):
+        # Seuls le message et la trace d'exception sont calculés dans le thread appelant :
+        # les arguments pourraient être modifiés avant que le thread d'écoute ne les lise.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self.queue.put(record)
+
+    def flush(self):
+        # Attend que le thread d'écoute ait traité les enregistrements déjà déposés
+        if self.listening:
+            self.queue.join()
+
+    def close(self):
+        # Vide la file puis arrête le thread d'écoute (fin du processus ou reconfiguration)
+        if self.listening:
+            self.listening = False
+            self.listener.stop()
+        super().close()
+
+
+def configure_logging(config):
+    """ Applique la configuration 'config' comme logging.config.dictConfig(), puis démarre le
+    thread d'écoute de chaque QueueListenerHandler avec ses gestionnaires cibles, désignés par nom.
+
+    Paramètres :
+        - config (dict) : Configuration au format de dictConfig (LOGGING).
+    """
+    configurator = logging.config.dictConfigClass(config)
+    configurator.configure()
+    # Après configuration, chaque entrée de 'handlers' est le gestionnaire créé
+    handlers = configurator.config.get('handlers', {})
+    for name in handlers:
+        handler = handlers[name]
+        if not isinstance(handler, QueueListenerHandler) or handler.listening:
+            continue
+        targets = []
+        for target in handler.target_names:
+            if target not in handlers:
+                raise ValueError(f"Gestionnaire cible inconnu pour '{name}' : {target}")
+            targets.append(handlers[target])
+        handler.start(targets)
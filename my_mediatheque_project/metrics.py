@@ -0,0 +1,172 @@
+""" Mesures par vue : durée, nombre et durée des requêtes SQL, taille des réponses.
+
+Les requêtes SQL sont comptées par un « execute wrapper » installé sur chaque connexion
+(signal connection_created, connecté dans my_mediatheque_project.apps.MediathequeProjectConfig),
+qui les attribue à la requête HTTP en cours par une variable de contexte : le comptage
+fonctionne aussi lorsque l'ORM s'exécute dans un autre thread (vues asynchrones, sync_to_async).
+
+Les mesures sont propres au processus : avec plusieurs workers, chacun expose les siennes.
+"""
+import contextvars
+import threading
+import time
+
+# Bornes (en secondes) de l'histogramme des durées de réponse
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class RequestStats:
+    """ Requêtes SQL exécutées pendant une requête HTTP.
+    Attributs :
+        queries (int) : Nombre de requêtes SQL.
+        sql_time (float) : Durée cumulée des requêtes SQL, en secondes.
+    """
+    __slots__ = ('queries', 'sql_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+
+
+request_stats_var = contextvars.ContextVar('request_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """ Execute wrapper : attribue la requête SQL à la requête HTTP en cours, s'il y en a une. """
+    stats = request_stats_var.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.sql_time += time.perf_counter() - start
+        stats.queries += 1
+
+
+def record_connection_queries(sender, connection, **kwargs):
+    """ Receveur de connection_created (voir apps.MediathequeProjectConfig) : compte les requêtes
+    SQL de chaque requête HTTP. Une connexion rouverte garde ses wrappers : le nôtre n'est ajouté qu'une fois.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class ViewMetrics:
+    """ Cumul des mesures d'une vue depuis le démarrage du processus. """
+
+    def __init__(self):
+        self.requests = {}  # (méthode, statut) -> nombre
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration = 0.0
+        self.count = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.sql_time = 0.0
+        self.response_bytes = 0
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """ Mesures de toutes les vues, partagées entre les threads du processus. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def _view(self, view):
+        if view not in self._views:
+            self._views[view] = ViewMetrics()
+        return self._views[view]
+
+    def observe(self, view, method, status, duration, stats):
+        """ Enregistre une requête traitée par la vue 'view' (durée en secondes). """
+        with self._lock:
+            metrics = self._view(view)
+            key = (method, status)
+            metrics.requests[key] = metrics.requests.get(key, 0) + 1
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    metrics.buckets[i] += 1
+            metrics.duration += duration
+            metrics.count += 1
+            metrics.queries += stats.queries
+            metrics.max_queries = max(metrics.max_queries, stats.queries)
+            metrics.sql_time += stats.sql_time
+
+    def add_response_bytes(self, view, size):
+        with self._lock:
+            self._view(view).response_bytes += size
+
+    def snapshot(self):
+        """ Retourne une copie des mesures : {vue: ViewMetrics}. """
+        with self._lock:
+            copies = {}
+            for view, metrics in self._views.items():
+                copy = ViewMetrics()
+                copy.__dict__.update(metrics.__dict__, requests=dict(metrics.requests),
+                                     buckets=list(metrics.buckets))
+                copies[view] = copy
+            return copies
+
+    def render(self):
+        """ Retourne les mesures au format texte de Prometheus (version 0.0.4). """
+        views = sorted(self.snapshot().items())
+        lines = [
+            "# HELP mediatheque_requests_total Requêtes HTTP traitées, par vue, méthode et statut.",
+            "# TYPE mediatheque_requests_total counter",
+        ]
+        for view, metrics in views:
+            for (method, status), count in sorted(metrics.requests.items()):
+                lines.append(f'mediatheque_requests_total{{view="{_escape(view)}",method="{method}",'
+                             f'status="{status}"}} {count}')
+        lines += [
+            "# HELP mediatheque_request_duration_seconds Durée de traitement des requêtes, par vue.",
+            "# TYPE mediatheque_request_duration_seconds histogram",
+        ]
+        for view, metrics in views:
+            label = f'view="{_escape(view)}"'
+            for bound, count in zip(DURATION_BUCKETS, metrics.buckets):
+                lines.append(f'mediatheque_request_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'mediatheque_request_duration_seconds_bucket{{{label},le="+Inf"}} {metrics.count}')
+            lines.append(f'mediatheque_request_duration_seconds_sum{{{label}}} {metrics.duration:.6f}')
+            lines.append(f'mediatheque_request_duration_seconds_count{{{label}}} {metrics.count}')
+        for name, kind, help_text, attribute in (
+                ('mediatheque_db_queries_total', 'counter', "Requêtes SQL exécutées, par vue.", 'queries'),
+                ('mediatheque_db_queries_max', 'gauge', "Nombre maximal de requêtes SQL d'une requête HTTP, "
+                                                        "par vue.", 'max_queries'),
+                ('mediatheque_db_duration_seconds_total', 'counter', "Durée cumulée des requêtes SQL, par vue.",
+                 'sql_time'),
+                ('mediatheque_response_bytes_total', 'counter', "Taille cumulée des réponses, par vue.",
+                 'response_bytes')):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for view, metrics in views:
+                value = getattr(metrics, attribute)
+                value = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f'{name}{{view="{_escape(view)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def render_counter(name, help_text, label, values):
+    """ Retourne un compteur au format texte de Prometheus, avec une ligne par valeur de l'étiquette.
+
+    Paramètres :
+        - name (str) : Nom du compteur.
+        - help_text (str) : Description du compteur.
+        - label (str) : Nom de l'étiquette.
+        - values (dict) : {valeur de l'étiquette: valeur du compteur}.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for key, value in sorted(values.items()):
+        lines.append(f'{name}{{{label}="{_escape(key)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
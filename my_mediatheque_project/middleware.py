@@ -0,0 +1,136 @@
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from my_mediatheque_project.log import request_id_var, request_start_var
+from my_mediatheque_project.metrics import RequestStats, registry, request_stats_var
+
+logger = logging.getLogger('my_mediatheque_project.requests')
+
+
+class ContextMiddleware(ABC):
+    """ Base des middlewares qui encadrent chaque requête : start() avant la vue, finish()
+    sur la réponse, reset() dans tous les cas. Compatible WSGI et ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = self.start(request)
+        try:
+            response = self.get_response(request)
+            self.finish(request, response, state)
+            return response
+        finally:
+            self.reset(state)
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        try:
+            response = await self.get_response(request)
+            self.finish(request, response, state)
+            return response
+        finally:
+            self.reset(state)
+
+    @abstractmethod
+    def start(self, request):
+        """ Prépare la requête 'request' avant la vue ; retourne l'état passé à finish() et reset(). """
+
+    @abstractmethod
+    def finish(self, request, response, state):
+        """ Traite la réponse 'response' de la vue. """
+
+    @abstractmethod
+    def reset(self, state):
+        """ Rétablit le contexte modifié par start(), que la vue ait réussi ou non. """
+
+
+class RequestLogMiddleware(ContextMiddleware):
+    """ Attribue un identifiant à chaque requête (en-tête X-Request-ID reçu, ou généré),
+    le rend disponible aux journaux (my_mediatheque_project.log.RequestContextFilter)
+    et journalise la requête traitée avec sa durée.
+    """
+
+    def start(self, request):
+        # Identifiant transmis par le proxy (tronqué), sinon généré
+        request.id = request.headers.get('X-Request-ID', '')[:64] or uuid.uuid4().hex
+        return request_id_var.set(request.id), request_start_var.set(time.perf_counter())
+
+    def reset(self, state):
+        request_id_var.reset(state[0])
+        request_start_var.reset(state[1])
+
+    def finish(self, request, response, state):
+        duration = round((time.perf_counter() - request_start_var.get()) * 1000, 2)
+        response['X-Request-ID'] = request.id
+        logger.info("%s %s %s (%s ms)", request.method, request.path, response.status_code, duration,
+                    extra={'method': request.method, 'path': request.path, 'status': response.status_code,
+                           'duration_ms': duration})
+
+
+def _count_bytes(content, view):
+    # Taille d'une réponse en flux, connue seulement une fois le flux entièrement envoyé
+    size = 0
+    try:
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+    finally:
+        registry.add_response_bytes(view, size)
+
+
+async def _acount_bytes(content, view):
+    size = 0
+    try:
+        async for chunk in content:
+            size += len(chunk)
+            yield chunk
+    finally:
+        registry.add_response_bytes(view, size)
+
+
+class MetricsMiddleware(ContextMiddleware):
+    """ Mesure chaque requête : durée, nombre et durée des requêtes SQL, taille de la réponse.
+
+    Les mesures sont cumulées par vue (my_mediatheque_project.metrics, exposées par la vue
+    'metrics') et renvoyées dans l'en-tête Server-Timing. Une vue qui exécute plus de
+    QUERY_BUDGET requêtes SQL est signalée dans les journaux (avertissement).
+    """
+
+    def start(self, request):
+        stats = RequestStats()
+        return stats, time.perf_counter(), request_stats_var.set(stats)
+
+    def reset(self, state):
+        request_stats_var.reset(state[2])
+
+    def finish(self, request, response, state):
+        stats, start, _ = state
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        registry.observe(view, request.method, response.status_code, duration, stats)
+
+        if response.streaming:
+            count = _acount_bytes if response.is_async else _count_bytes
+            response.streaming_content = count(response.streaming_content, view)
+        else:
+            registry.add_response_bytes(view, len(response.content))
+        response['Server-Timing'] = (f'app;dur={duration * 1000:.1f}, '
+                                     f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.queries} queries"')
+
+        budget = getattr(settings, 'QUERY_BUDGET', None)
+        if budget is not None and stats.queries > budget:
+            logger.warning("Budget de requêtes SQL dépassé par %s : %s requêtes (budget : %s) pour %s %s",
+                           view, stats.queries, budget, request.method, request.get_full_path())
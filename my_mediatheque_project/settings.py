@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
+from my_mediatheque_project.database import database_config, sqlite_pragmas
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -41,11 +42,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'my_mediatheque_project.apps.MediathequeProjectConfig',
     'app_bibliothecaire',
     'app_membre',
 ]
 
 MIDDLEWARE = [
+    'my_mediatheque_project.middleware.RequestLogMiddleware',
+    'my_mediatheque_project.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,17 +81,42 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'my_mediatheque_project.wsgi.application'
 
+# Vues de consultation asynchrones (catalogue, membres, emprunts en cours), à activer
+# lorsque l'application est servie par un serveur ASGI (my_mediatheque_project.asgi).
+# Sous WSGI, chaque vue asynchrone s'exécuterait dans sa propre boucle d'événements.
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Profil choisi par les variables d'environnement DJANGO_DB_* (voir my_mediatheque_project.database)
 DATABASES = {
+    'default': database_config(os.environ, BASE_DIR),
+}
+
+# PRAGMA exécutés à l'ouverture de chaque connexion SQLite (my_mediatheque_project.database)
+SQLITE_PRAGMAS = sqlite_pragmas(os.environ)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mediatheque',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
     }
 }
 
+# Cache des fragments du catalogue, versionnés par l'état des tables dans la base (app_bibliothecaire.cache) :
+# un cache propre à chaque processus (LocMemCache) reste cohérent entre les workers
+CATALOGUE_CACHE_ALIAS = 'default'
+CATALOGUE_CACHE_TIMEOUT = 24 * 3600
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -139,10 +168,32 @@ LOGOUT_REDIRECT_URL = '/'
 # URL de connexion par défaut pour protéger les vues
 LOGIN_URL = '/login/'
 
+# Emails (relances des emprunts en retard) : affichés dans la console en développement,
+# à remplacer par 'django.core.mail.backends.smtp.EmailBackend' en production
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'mediatheque@example.com'
+
+# Mesures des vues (my_mediatheque_project.metrics)
+# Nombre de requêtes SQL au-delà duquel une requête HTTP est signalée dans les journaux
+QUERY_BUDGET = int(os.environ.get('DJANGO_QUERY_BUDGET', 20))
+# Adresses autorisées à lire les mesures au format Prometheus (/metrics/)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
 # Logging configuration
+# Les vues déposent les enregistrements dans une file ; un thread d'écoute les écrit dans la
+# console et, en lignes JSON avec rotation par taille, dans logs/bibliothecaire.jsonl.
+LOG_LEVEL = os.environ.get('DJANGO_LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO')
+
+LOGGING_CONFIG = 'my_mediatheque_project.log.configure_logging'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'request': {
+            '()': 'my_mediatheque_project.log.RequestContextFilter',
+        },
+    },
     'formatters': {
         'verbose': {
             'format': '{levelname} {asctime} {module} {message}',
@@ -152,6 +203,9 @@ LOGGING = {
             'format': '{levelname} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'my_mediatheque_project.log.JsonFormatter',
+        },
     },
     'handlers': {
         'console': {
@@ -161,21 +215,35 @@ LOGGING = {
         },
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs/bibliothecaire.log',  # Logs dans un dossier spécifique
-            'formatter': 'verbose',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs/bibliothecaire.jsonl',  # Logs dans un dossier spécifique
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'formatter': 'json',
+        },
+        # Gestionnaires cibles désignés par nom, résolus par LOGGING_CONFIG (voir my_mediatheque_project.log)
+        'queue': {
+            '()': 'my_mediatheque_project.log.QueueListenerHandler',
+            'handlers': ['console', 'file'],
+            'filters': ['request'],
         },
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': True,
         },
         'app_bibliothecaire': {
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'my_mediatheque_project': {
+            'handlers': ['queue'],
+            'level': 'INFO',
             'propagate': False,
         },
     },
-}
\ No newline at end of file
+}
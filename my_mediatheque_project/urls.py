@@ -10,4 +10,5 @@ urlpatterns = [
     path('membre/', include('app_membre.urls'), name='membre'), #Page d'accueil pour les membres
     path('login/', auth_views.LoginView.as_view(template_name='app_biblio/login.html'), name='login'), # Page de connexion
     path('logout/', auth_views.LogoutView.as_view(), name='logout'), # Page de déconnexion de l'utilisateur
+    path('metrics/', views.metrics, name='metrics'), # Mesures des vues (format Prometheus)
 ]
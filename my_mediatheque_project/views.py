@@ -1,5 +1,23 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from app_bibliothecaire.cache import get_cache_stats
+from my_mediatheque_project.metrics import registry, render_counter
 
 
 def home(request):
     return render(request, 'general/home.html')
+
+
+def metrics(request):
+    """ Expose les mesures des vues et les compteurs du cache du catalogue au format texte de Prometheus.
+    Réservé aux adresses de METRICS_ALLOWED_IPS : les autres reçoivent une réponse 404.
+    """
+    if request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICS_ALLOWED_IPS', []):
+        raise Http404()
+    cache_stats = get_cache_stats()
+    body = registry.render() + render_counter(
+        'mediatheque_catalogue_cache_total', "Lectures des fragments du catalogue en cache, par résultat "
+                                             "(compteurs partagés par les processus qui utilisent ce cache).",
+        'result', {'hit': cache_stats['hits'], 'miss': cache_stats['misses']})
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
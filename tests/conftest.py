@@ -0,0 +1,32 @@
+import importlib
+import pytest
+from django.core.cache import caches
+from django.test import AsyncClient
+from django.urls import clear_url_caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Le cache local survit d'un test à l'autre, contrairement à la base de test
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+URLCONFS = ('app_bibliothecaire.urls', 'app_membre.urls', 'my_mediatheque_project.urls')
+
+
+def reload_urls():
+    for name in URLCONFS:
+        importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    """ Sert les vues de consultation par leurs versions asynchrones, le temps du test. """
+    settings.ASYNC_VIEWS = True
+    reload_urls()
+    yield AsyncClient()
+    settings.ASYNC_VIEWS = False
+    reload_urls()
@@ -0,0 +1,73 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.models import Member, Book, Dvd, Loan
+
+
+def get(client, url, **headers):
+    return async_to_sync(client.get)(url, headers=headers)
+
+
+# Vérifie que les vues asynchrones sont bien celles des URL et affichent le catalogue
+@pytest.mark.django_db
+def test_async_catalogue_pages(async_views):
+    from app_bibliothecaire import async_views as views
+    member = Member.objects.create(name='Doe', first_name='John')
+    book = Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+    Dvd.objects.create(name='Alien', author='Scott', genre='SF')
+    Loan.objects.create(borrower=member, media=book, loan_date=timezone.now())
+
+    response = get(async_views, reverse('app_bibliothecaire:listmedia'))
+    assert response.resolver_match.func.__wrapped__ is views.listmedia.__wrapped__
+    assert 'Dune' in response.content.decode() and 'Alien' in response.content.decode()
+
+    response = get(async_views, reverse('app_bibliothecaire:listmembres') + '?q=do')
+    assert 'Doe' in response.content.decode() and 'Dune' in response.content.decode()
+
+    response = get(async_views, reverse('app_membre:liste_medias_membre'))
+    assert response['X-Cache'] == 'MISS'
+    assert "déjà en cours d'emprunt" in response.content.decode()
+    response = get(async_views, reverse('app_membre:liste_medias_membre'))
+    assert response['X-Cache'] == 'HIT'
+
+
+# Vérifie la validation conditionnelle des vues asynchrones
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['app_bibliothecaire:listmedia', 'app_membre:liste_medias_membre',
+                                      'app_bibliothecaire:listmembres'])
+def test_async_unchanged_page_returns_304(async_views, url_name):
+    Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+    # La première visite dépose le cookie CSRF, qui entre dans l'ETag
+    get(async_views, reverse(url_name))
+    response = get(async_views, reverse(url_name))
+    assert response.status_code == 200
+    assert response['ETag'] and response['Last-Modified']
+
+    response = get(async_views, reverse(url_name), if_none_match=response['ETag'])
+    assert response.status_code == 304
+    Book.objects.create(name='Dune Messiah', author='Herbert', nb_pages=300)
+    response = get(async_views, reverse(url_name), if_none_match=response['ETag'])
+    assert response.status_code == 200
+
+
+# Vérifie la liste des emprunts en cours et la délégation des autres étapes du retour
+@pytest.mark.django_db
+def test_async_return_loan(async_views):
+    borrower = Member.objects.create(name='Doe', first_name='John')
+    book = Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+    loan = Loan.objects.create(borrower=borrower, media=book, loan_date=timezone.now())
+    url = reverse('app_bibliothecaire:retour_emprunt')
+
+    response = get(async_views, url)
+    assert response.status_code == 200
+    assert 'form' in response.context
+
+    response = get(async_views, f"{url}?borrower_id={borrower.id}")
+    assert response.status_code == 200
+    assert list(response.context['loans']) == [loan]
+
+    response = get(async_views, f"{url}?borrower_id={borrower.id}&loan_id={loan.id}")
+    assert response.context['loan'] == loan
+
+    assert get(async_views, f"{url}?borrower_id=999").status_code == 404
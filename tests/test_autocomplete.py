@@ -0,0 +1,89 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from app_bibliothecaire.models import Member, Media
+from app_bibliothecaire.forms import LoanForm
+
+
+# Vérifie l'autocomplétion des membres par début de nom ou de prénom
+@pytest.mark.django_db
+def test_autocomplete_members(client):
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+    Member.objects.create(name="Dupont", first_name="Jean")
+    Member.objects.create(name="Durand", first_name="Dupuis")
+    Member.objects.create(name="Martin", first_name="Paul")
+    url = reverse('app_bibliothecaire:autocomplete_members')
+
+    response = client.get(url, {'q': 'dup'})
+    assert [item['label'] for item in response.json()['results']] == ["Dupont Jean", "Durand Dupuis"]
+
+    response = client.get(url, {'q': 'Du', 'limit': 1})
+    assert len(response.json()['results']) == 1
+
+    assert client.get(url, {'q': ''}).json()['results'] == []
+
+    # Noms saisis en majuscules ou en casse mixte
+    Member.objects.create(name="DUPRÉ", first_name="Anne")
+    Member.objects.create(name="duPont", first_name="Marc")
+    response = client.get(url, {'q': 'dup'})
+    assert [item['label'] for item in response.json()['results']] == ["DUPRÉ Anne", "Dupont Jean", "Durand Dupuis",
+                                                                       "duPont Marc"]
+
+
+# Vérifie que l'autocomplétion des médias ne propose que les médias disponibles de la catégorie
+@pytest.mark.django_db
+def test_autocomplete_medias(client):
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+    dune = Media.objects.create(name="Dune", author="Frank Herbert", category='book')
+    Media.objects.create(name="Dune (film)", author="Denis Villeneuve", category='dvd')
+    Media.objects.create(name="Dunkerque", author="Christopher Nolan", category='book', availability=False)
+    url = reverse('app_bibliothecaire:autocomplete_medias')
+
+    response = client.get(url, {'q': 'dun', 'categorie': 'book'})
+
+    assert response.json()['results'] == [{'id': dune.id, 'label': "Dune - Frank Herbert"}]
+
+
+
+# Vérifie que les API JSON des membres et du catalogue sont réservées aux bibliothécaires connectés
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['autocomplete_members', 'autocomplete_medias', 'api_medias'])
+def test_json_endpoints_require_login(client, url_name):
+    Member.objects.create(name="Dupont", first_name="Jean")
+    url = reverse(f'app_bibliothecaire:{url_name}')
+
+    response = client.get(url, {'q': 'dup'})
+
+    assert response.status_code == 302
+    assert response['Location'].startswith('/login/')
+
+
+# Vérifie que la page d'emprunt ne liste plus les membres ni les médias, quel que soit leur nombre
+@pytest.mark.django_db
+def test_create_loan_page_does_not_render_options(client, django_assert_max_num_queries):
+    Member.objects.bulk_create(Member(name=f"Membre {i}", first_name="Test") for i in range(100))
+    Media.objects.bulk_create(Media(name=f"Média {i}", author="Auteur") for i in range(100))
+
+    with django_assert_max_num_queries(0):
+        response = client.get(reverse('app_bibliothecaire:creer_emprunt'), {'categorie': 'book'})
+
+    content = response.content.decode()
+    assert "Membre 1" not in content
+    assert "<option" not in content.split('name="categorie"')[0]
+    assert reverse('app_bibliothecaire:autocomplete_medias') + "?categorie=book" in content
+    assert reverse('app_bibliothecaire:autocomplete_members') in content
+
+
+# Vérifie que le formulaire d'emprunt valide la clé primaire soumise
+@pytest.mark.django_db
+def test_loan_form_validates_submitted_pk():
+    member = Member.objects.create(name="Dupont", first_name="Jean")
+    media = Media.objects.create(name="Dune", author="Frank Herbert", category='book')
+
+    form = LoanForm({'member_id': member.id, 'media_id': media.id, 'loan_date': '2025-01-01'}, categorie='book')
+    assert form.is_valid()
+    assert form.cleaned_data['member_id'] == member
+
+    form = LoanForm({'member_id': 9999, 'media_id': media.id, 'loan_date': '2025-01-01'})
+    assert not form.is_valid()
+    assert 'member_id' in form.errors
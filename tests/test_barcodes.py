@@ -0,0 +1,133 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.barcodes import MEDIA, MEMBER, assign_barcodes, generated_barcode, lookup_barcode
+from app_bibliothecaire.models import Member, Media, Book, Loan
+
+
+@pytest.fixture
+def desk():
+    member = Member.objects.create(name='Doe', first_name='John', barcode='A100')
+    books = [Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100, barcode=f'M10{i}')
+             for i in range(3)]
+    Loan.objects.create(borrower=member, media=books[0], loan_date=timezone.now())
+    Loan.objects.create(borrower=member, media=books[1], loan_date=timezone.now())
+    return member, books
+
+
+# Vérifie l'identification d'un média emprunté, en une seule requête
+@pytest.mark.django_db
+def test_lookup_media_with_active_loan(desk):
+    member, books = desk
+
+    with CaptureQueriesContext(connection) as queries:
+        result = lookup_barcode(' M100\n')
+    assert len(queries) == 1
+
+    assert (result['type'], result['id'], result['availability']) == (MEDIA, books[0].id, False)
+    assert result['active_loan']['borrower'] == 'Doe John'
+    assert result['active_loan']['late'] is False
+    assert lookup_barcode('M102')['active_loan'] is None
+
+
+# Vérifie l'identification d'un membre et de ses emprunts en cours, en une seule requête
+@pytest.mark.django_db
+def test_lookup_member_with_active_loans(desk):
+    member, books = desk
+
+    with CaptureQueriesContext(connection) as queries:
+        result = lookup_barcode('A100', MEMBER)
+    assert len(queries) == 1
+
+    assert (result['type'], result['label'], result['active_loan_count']) == (MEMBER, 'Doe John', 2)
+    assert sorted(loan['media_name'] for loan in result['active_loans']) == ['Livre 0', 'Livre 1']
+    Member.objects.create(name='Smith', first_name='Jane', barcode='A200')
+    assert lookup_barcode('A200')['active_loans'] == []
+
+
+# Vérifie les codes inconnus et les types invalides
+@pytest.mark.django_db
+def test_lookup_unknown_code(desk):
+    assert lookup_barcode('X999') is None
+    assert lookup_barcode('M100', MEMBER) is None
+    assert lookup_barcode('  ') is None
+    with pytest.raises(ValueError):
+        lookup_barcode('M100', 'shelf')
+
+
+# Vérifie que la recherche passe par l'index unique partiel
+@pytest.mark.django_db
+def test_lookup_uses_barcode_index(desk):
+    assert 'media_barcode_unique' in Media.objects.filter(barcode='M100').explain()
+    assert 'member_barcode_unique' in Member.objects.filter(barcode='A100').explain()
+
+
+# Vérifie l'unicité des codes, les éléments sans code n'étant pas concernés
+@pytest.mark.django_db
+def test_barcode_is_unique_when_set(desk):
+    Member.objects.create(name='Sans', first_name='Carte')
+    Member.objects.create(name='Sans', first_name='Carte')
+    with pytest.raises(IntegrityError):
+        Member.objects.create(name='Smith', first_name='Jane', barcode='A100')
+
+
+# Vérifie l'attribution des codes par lots, sans toucher aux codes existants
+@pytest.mark.django_db
+def test_assign_barcodes():
+    medias = Media.objects.bulk_create(Media(name=f'Media {i}', author='Auteur') for i in range(5))
+    Media.objects.filter(pk=medias[0].pk).update(barcode='MANUEL')
+    # Étiquette saisie à la main qui reprend le code qui serait attribué à un autre média
+    Media.objects.filter(pk=medias[1].pk).update(barcode=f'M{medias[2].pk:09d}')
+
+    assert assign_barcodes(MEDIA, batch_size=2) == (2, 1)
+
+    barcodes = dict(Media.objects.values_list('id', 'barcode'))
+    assert barcodes[medias[0].pk] == 'MANUEL'
+    assert barcodes[medias[2].pk] is None
+    assert barcodes[medias[3].pk] == f'M{medias[3].pk:09d}'
+    assert assign_barcodes(MEDIA) == (0, 1)
+
+
+
+# Vérifie que les identifiants de plus de 9 chiffres ne sont pas tronqués (codes distincts)
+@pytest.mark.django_db
+def test_assign_barcodes_for_large_ids():
+    members = [Member.objects.create(id=pk, name='Doe', first_name='John') for pk in (234567890, 1234567890)]
+
+    assert assign_barcodes(MEMBER) == (2, 0)
+
+    for member in members:
+        member.refresh_from_db()
+        assert member.barcode == generated_barcode(MEMBER, member.pk)
+    assert members[1].barcode == 'A1234567890'
+
+
+# Vérifie la commande d'attribution des codes
+@pytest.mark.django_db
+def test_assign_barcodes_command(capsys):
+    member = Member.objects.create(name='Doe', first_name='John')
+    Book.objects.create(name='Livre', author='Auteur', nb_pages=100)
+
+    call_command('assign_barcodes', '--only', 'member')
+
+    member.refresh_from_db()
+    assert member.barcode == f'A{member.pk:09d}'
+    assert not Media.objects.filter(barcode__isnull=False).exists()
+    assert "1 codes-barres attribués aux membres." in capsys.readouterr().out
+
+
+# Vérifie l'API d'identification d'un code-barres
+@pytest.mark.django_db
+def test_api_barcode(client, desk):
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+
+    response = client.get(reverse('app_bibliothecaire:api_code', args=['M101']))
+    assert response.status_code == 200
+    assert response.json()['active_loan']['borrower'] == 'Doe John'
+
+    assert client.get(reverse('app_bibliothecaire:api_code', args=['X999'])).status_code == 404
+    assert client.get(reverse('app_bibliothecaire:api_code', args=['M101']), {'type': 'shelf'}).status_code == 400
@@ -0,0 +1,117 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.cache import get_cache_stats
+from app_bibliothecaire.imports import import_media
+from app_bibliothecaire.models import Member, Book, Loan
+
+
+@pytest.fixture(params=['locmem', 'file'])
+def catalogue_cache(request, tmp_path):
+    """ Exécute le test avec le cache en mémoire locale, puis avec un cache fichier. """
+    if request.param == 'locmem':
+        backend = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'}
+    else:
+        backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path)}
+    with override_settings(CACHES={'default': backend}):
+        yield request.param
+
+
+def get_page(client):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse('app_membre:liste_medias_membre'))
+    assert response.status_code == 200
+    return response, len(context)
+
+
+# Vérifie que la seconde visite est servie depuis le cache, avec la seule requête du validateur ETag
+@pytest.mark.django_db
+def test_member_catalogue_served_from_cache(client, catalogue_cache):
+    Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+
+    response, _ = get_page(client)
+    assert response['X-Cache'] == 'MISS'
+    response, queries = get_page(client)
+    assert response['X-Cache'] == 'HIT'
+    assert queries == 1
+    assert 'Dune' in response.content.decode()
+    assert get_cache_stats() == {'hits': 1, 'misses': 1}
+    # Compteurs exposés pour la supervision
+    metrics = client.get(reverse('metrics')).content.decode()
+    assert 'mediatheque_catalogue_cache_total{result="hit"} 1' in metrics
+    assert 'mediatheque_catalogue_cache_total{result="miss"} 1' in metrics
+
+
+# Vérifie qu'un emprunt puis un retour invalident le cache
+@pytest.mark.django_db
+def test_member_catalogue_invalidated_by_loan_and_return(client, catalogue_cache):
+    member = Member.objects.create(name='Doe', first_name='John')
+    book = Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+    get_page(client)
+
+    loan = Loan.objects.create(borrower=member, media=book, loan_date=timezone.now())
+    response, _ = get_page(client)
+    assert response['X-Cache'] == 'MISS'
+    assert "déjà en cours d'emprunt" in response.content.decode()
+
+    loan.effective_return_date = timezone.now().date()
+    loan.save()
+    response, _ = get_page(client)
+    assert response['X-Cache'] == 'MISS'
+    assert "Disponible à l'emprunt" in response.content.decode()
+
+
+# Vérifie que la modification ou la suppression d'un média invalide le cache
+@pytest.mark.django_db
+def test_member_catalogue_invalidated_by_media_edit(client, catalogue_cache):
+    book = Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+    get_page(client)
+
+    book.name = 'Dune Messiah'
+    book.save()
+    response, _ = get_page(client)
+    assert response['X-Cache'] == 'MISS'
+    assert 'Dune Messiah' in response.content.decode()
+
+    book.delete()
+    response, _ = get_page(client)
+    assert response['X-Cache'] == 'MISS'
+    assert 'Dune' not in response.content.decode()
+
+
+# Vérifie que l'import en masse, qui n'émet pas de signaux, écarte aussi les fragments en cache
+@pytest.mark.django_db
+def test_import_invalidates_catalogue(client, catalogue_cache):
+    get_page(client)
+    import_media([(2, {'name': 'Dune', 'author': 'Herbert', 'nb_pages': '600'})], default_type='book')
+    response, _ = get_page(client)
+    assert response['X-Cache'] == 'MISS'
+    assert 'Dune' in response.content.decode()
+
+
+# Vérifie qu'une écriture traitée par un processus écarte les fragments en cache des autres :
+# chaque processus a son propre cache en mémoire locale, la version est lue dans la base
+@pytest.mark.django_db
+def test_write_in_one_worker_invalidates_the_others(client, settings):
+    settings.CACHES = {
+        'worker_a': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker_a'},
+        'worker_b': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker_b'},
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'},
+    }
+    member = Member.objects.create(name='Doe', first_name='John')
+    book = Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+    for worker in ('worker_a', 'worker_b'):
+        settings.CATALOGUE_CACHE_ALIAS = worker
+        get_page(client)
+        assert get_page(client)[0]['X-Cache'] == 'HIT'
+
+    # Emprunt enregistré par le worker B
+    Loan.objects.create(borrower=member, media=book, loan_date=timezone.now())
+
+    settings.CATALOGUE_CACHE_ALIAS = 'worker_a'
+    response, _ = get_page(client)
+    assert response['X-Cache'] == 'MISS'
+    assert "déjà en cours d'emprunt" in response.content.decode()
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from app_bibliothecaire.models import Member, Book, Dvd, Cd, Board, Loan, MediaFlat
+from app_bibliothecaire.imports import import_media
+from app_bibliothecaire.catalogue import catalogue_queryset, group_by_subtype
+from django.utils import timezone
+
+
+def create_catalogue(size):
+    """ Crée 'size' médias de chaque sous-type, dont un emprunté par sous-type empruntable. """
+    member = Member.objects.create(name=f'Membre {size}', first_name='Test')
+    for i in range(size):
+        book = Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100)
+        dvd = Dvd.objects.create(name=f'DVD {i}', author='Réalisateur', genre='Drame')
+        cd = Cd.objects.create(name=f'CD {i}', author='Artiste')
+        Board.objects.create(name=f'Jeu {i}', author='Créateur', number_players_min=2, number_players_max=4)
+        if i == 0:
+            for media in (book, dvd, cd):
+                Loan.objects.create(borrower=member, media=media, loan_date=timezone.now())
+
+
+def count_queries(url, client):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context)
+
+
+# Vérifie le regroupement par sous-type et l'emprunt en cours de chaque média
+@pytest.mark.django_db
+def test_catalogue_groups_by_subtype():
+    create_catalogue(2)
+    catalogue = group_by_subtype(catalogue_queryset().order_by('id'))
+
+    assert [len(catalogue[key]) for key in ('books', 'dvds', 'cds', 'boards')] == [2, 2, 2, 2]
+    book = catalogue['books'][0]
+    assert book.nb_pages == 100
+    assert str(book.current_loans.borrower) == "Membre 2 Test"
+    assert catalogue['books'][1].current_loans is None
+
+
+# Vérifie que le nombre de requêtes ne dépend pas de la taille du catalogue
+# (validateur ETag, puis médias et emprunts en cours)
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['app_bibliothecaire:listmedia', 'app_membre:liste_medias_membre'])
+def test_catalogue_query_count_is_constant(client, url_name):
+    url = reverse(url_name)
+    create_catalogue(1)
+    small = count_queries(url, client)
+    create_catalogue(10)
+    large = count_queries(url, client)
+
+    assert small == large == 3
+
+
+# Vérifie que le modèle de lecture suit les écritures sur Media et ses sous-types
+@pytest.mark.django_db
+def test_media_flat_follows_writes():
+    member = Member.objects.create(name='Doe', first_name='John')
+    dvd = Dvd.objects.create(name='Alien', author='Ridley Scott', genre='SF')
+    flat = MediaFlat.objects.get(pk=dvd.pk)
+    assert (flat.subtype, flat.name, flat.genre, flat.nb_pages) == ('dvd', 'Alien', 'SF', None)
+
+    dvd.genre = 'Horreur'
+    dvd.save()
+    Loan.objects.create(borrower=member, media=dvd, loan_date=timezone.now())
+    flat.refresh_from_db()
+    assert (flat.genre, flat.availability) == ('Horreur', False)
+
+    # Écritures en masse, sans signal : l'import insère directement dans les tables des sous-types
+    import_media([(2, {'name': 'Dune', 'author': 'Herbert', 'nb_pages': '600'})], default_type='book')
+    assert MediaFlat.objects.get(name='Dune').nb_pages == 600
+
+    dvd.delete()
+    assert not MediaFlat.objects.filter(pk=dvd.pk).exists()
@@ -0,0 +1,182 @@
+import json
+from datetime import datetime, time, timedelta
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.conditional import MEMBER_CATALOGUE_MODELS, get_tables_state
+from app_bibliothecaire.checkouts import CheckoutError, lend_medias
+from app_bibliothecaire.models import Member, Book, Loan
+
+
+def create_books(count):
+    return [Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100) for i in range(count)]
+
+
+@pytest.fixture
+def member():
+    return Member.objects.create(name='Doe', first_name='John')
+
+
+@pytest.fixture
+def librarian(client):
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+    return client
+
+
+# Vérifie la création de tous les emprunts du panier et la mise à jour des compteurs
+@pytest.mark.django_db
+def test_lend_medias_creates_all_loans(member):
+    books = create_books(3)
+    state = get_tables_state(MEMBER_CATALOGUE_MODELS)
+
+    loans = lend_medias(member.id, [book.id for book in books])
+
+    assert [loan.media_id for loan in loans] == [book.id for book in books]
+    assert all(loan.pk for loan in loans)
+    assert Loan.objects.filter(borrower=member, effective_return_date__isnull=True).count() == 3
+    assert not Book.objects.filter(availability=True).exists()
+    member.refresh_from_db()
+    assert member.active_loan_count == 3
+    assert member.earliest_due_date == timezone.localdate() + timedelta(days=7)
+    # Les fragments du catalogue en cache sont écartés, dans tous les processus
+    assert get_tables_state(MEMBER_CATALOGUE_MODELS) != state
+
+
+# Vérifie qu'une date seule ou une datetime naïve est enregistrée dans le fuseau horaire courant
+@pytest.mark.django_db
+def test_lend_medias_stores_aware_loan_date(member, recwarn):
+    books = create_books(2)
+    today = timezone.localdate()
+
+    by_day = lend_medias(member.id, [books[0].id], loan_date=today)
+    naive = lend_medias(member.id, [books[1].id], loan_date=datetime.combine(today, time(23, 30)))
+
+    for loan in by_day + naive:
+        loan.refresh_from_db()
+        assert timezone.is_aware(loan.loan_date)
+        assert loan.expected_return_date == today + timedelta(days=7)
+    assert timezone.localtime(naive[0].loan_date).hour == 23
+    assert not [warning for warning in recwarn if 'naive datetime' in str(warning.message)]
+
+
+# Vérifie que le nombre de requêtes ne dépend pas de la taille du panier
+@pytest.mark.django_db
+def test_lend_medias_query_count_is_constant():
+    counts = []
+    for size in (1, 3):
+        borrower = Member.objects.create(name=f'Membre {size}', first_name='Test')
+        media_ids = [book.id for book in create_books(size)]
+        with CaptureQueriesContext(connection) as queries:
+            lend_medias(borrower.id, media_ids)
+        counts.append(len(queries))
+    assert counts[0] == counts[1]
+
+
+# Vérifie qu'un média indisponible fait refuser tout le panier
+@pytest.mark.django_db
+def test_lend_medias_is_all_or_nothing(member):
+    books = create_books(3)
+    other = Member.objects.create(name='Smith', first_name='Jane')
+    Loan.objects.create(borrower=other, media=books[1], loan_date=timezone.now())
+
+    with pytest.raises(CheckoutError) as excinfo:
+        lend_medias(member.id, [books[0].id, books[1].id, 999])
+
+    assert excinfo.value.errors == ["Le média n° 999 n'existe pas.", "Livre 1 n'est pas disponible à l'emprunt."]
+    assert not Loan.objects.filter(borrower=member).exists()
+    assert Book.objects.get(pk=books[0].pk).availability
+    member.refresh_from_db()
+    assert member.active_loan_count == 0
+
+
+# Vérifie que la limite de 3 emprunts s'applique à l'ensemble du panier
+@pytest.mark.django_db
+def test_lend_medias_limit_across_basket(member):
+    books = create_books(3)
+    Loan.objects.create(borrower=member, media=books[0], loan_date=timezone.now())
+
+    with pytest.raises(CheckoutError) as excinfo:
+        lend_medias(member.id, [books[1].id, books[2].id, create_books(1)[0].id])
+
+    assert "ne peut emprunter que 2 média(s) de plus" in excinfo.value.errors[0]
+    # Le refus du membre annule aussi la réservation des médias
+    assert Book.objects.filter(availability=True).count() == 3
+    member.refresh_from_db()
+    assert member.active_loan_count == 1
+
+    lend_medias(member.id, [books[1].id, books[2].id])
+    member.refresh_from_db()
+    assert member.active_loan_count == 3
+
+
+# Vérifie qu'un membre en retard ne peut pas emprunter
+@pytest.mark.django_db
+def test_lend_medias_refuses_late_member(member):
+    books = create_books(2)
+    loan = Loan.objects.create(borrower=member, media=books[0], loan_date=timezone.now())
+    Member.objects.filter(pk=member.pk).update(earliest_due_date=timezone.localdate() - timedelta(days=1))
+
+    with pytest.raises(CheckoutError) as excinfo:
+        lend_medias(member.id, [books[1].id])
+
+    assert excinfo.value.errors == ["Doe John a des emprunts en retard et ne peut pas emprunter de nouveaux médias."]
+    assert Loan.objects.filter(borrower=member).get() == loan
+
+
+# Vérifie les paniers vides ou en double
+@pytest.mark.django_db
+def test_lend_medias_rejects_empty_and_duplicate_basket(member):
+    book = create_books(1)[0]
+    with pytest.raises(CheckoutError):
+        lend_medias(member.id, [])
+    with pytest.raises(CheckoutError):
+        lend_medias(member.id, [book.id, book.id])
+    assert not Loan.objects.exists()
+
+
+# Vérifie la page d'emprunt groupé
+@pytest.mark.django_db
+def test_batch_checkout_view(librarian, member):
+    books = create_books(2)
+    url = reverse('app_bibliothecaire:emprunt_lot')
+
+    response = librarian.post(url, {'member_id': member.id, 'media_ids': f'{books[0].id}\n{books[1].id}',
+                                    'loan_date': timezone.localdate().isoformat()})
+
+    assert response.status_code == 302
+    assert Loan.objects.filter(borrower=member).count() == 2
+
+    response = librarian.post(url, {'member_id': member.id, 'media_ids': str(books[0].id),
+                                    'loan_date': timezone.localdate().isoformat()})
+    assert response.status_code == 200
+    assert "Livre 0 n&#x27;est pas disponible" in response.content.decode()
+
+    # Chiffre Unicode accepté par isdigit(), refusé par int()
+    response = librarian.post(url, {'member_id': member.id, 'media_ids': f'{books[1].id} ²',
+                                    'loan_date': timezone.localdate().isoformat()})
+    assert response.status_code == 200
+    assert 'media_ids' in response.context['form'].errors
+
+
+# Vérifie l'API d'emprunt groupé
+@pytest.mark.django_db
+def test_api_batch_checkout(librarian, member):
+    books = create_books(2)
+    url = reverse('app_bibliothecaire:api_emprunts')
+
+    response = librarian.post(url, json.dumps({'member_id': member.id, 'media_ids': [b.id for b in books]}),
+                              content_type='application/json')
+    assert response.status_code == 201
+    assert [loan['media_name'] for loan in response.json()['loans']] == ['Livre 0', 'Livre 1']
+
+    response = librarian.post(url, json.dumps({'member_id': member.id, 'media_ids': [books[0].id]}),
+                              content_type='application/json')
+    assert response.status_code == 400
+    assert response.json()['errors'] == ["Livre 0 n'est pas disponible à l'emprunt."]
+
+    response = librarian.post(url, json.dumps({'member_id': member.id, 'media_ids': 'abc'}),
+                              content_type='application/json')
+    assert response.status_code == 400
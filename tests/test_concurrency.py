@@ -0,0 +1,159 @@
+import sqlite3
+import threading
+from contextlib import closing
+import pytest
+from django.db import connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test.utils import CaptureQueriesContext
+from app_bibliothecaire.catalogue import catalogue_queryset
+from app_bibliothecaire.models import Member, Media, Book, Loan, DailyCategoryStats
+from django.utils import timezone
+
+THREADS = 8
+# Nombre d'opérations de chaque poste dans les tests de charge
+ROUNDS = 20
+
+
+def run_in_parallel(target, args_list):
+    """ Lance target(*args) dans un thread par élément de args_list, en même temps,
+    et retourne la liste des résultats ('ok' ou l'exception levée).
+    """
+    barrier = threading.Barrier(len(args_list))
+    results = []
+
+    def worker(*args):
+        try:
+            barrier.wait()
+            target(*args)
+            results.append('ok')
+        except Exception as e:
+            results.append(e)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def lend(member_id, media_id):
+    Loan.objects.create(borrower=Member.objects.get(pk=member_id), media=Media.objects.get(pk=media_id),
+                        loan_date=timezone.now())
+
+
+# Vérifie qu'un même média prêté simultanément depuis plusieurs postes n'est prêté qu'une fois
+@pytest.mark.django_db(transaction=True)
+def test_parallel_loans_of_same_media():
+    media = Media.objects.create(name='Média convoité', author='Auteur')
+    members = [Member.objects.create(name=f'Membre {i}', first_name='Test') for i in range(THREADS)]
+
+    results = run_in_parallel(lend, [(member.id, media.id) for member in members])
+
+    assert results.count('ok') == 1
+    assert all(isinstance(result, ValueError) for result in results if result != 'ok')
+    assert Loan.objects.filter(media=media).count() == 1
+    media.refresh_from_db()
+    assert not media.availability
+
+
+# Vérifie que des emprunts simultanés ne font pas dépasser la limite de 3 emprunts actifs
+@pytest.mark.django_db(transaction=True)
+def test_parallel_loans_respect_borrowing_limit():
+    member = Member.objects.create(name='Membre', first_name='Pressé')
+    medias = [Media.objects.create(name=f'Média {i}', author='Auteur') for i in range(THREADS)]
+
+    results = run_in_parallel(lend, [(member.id, media.id) for media in medias])
+
+    assert results.count('ok') == 3
+    assert Loan.objects.filter(borrower=member).count() == 3
+    # Les médias des emprunts refusés restent disponibles
+    assert Media.objects.filter(availability=False).count() == 3
+
+
+# Vérifie que la création d'un emprunt fait moins d'allers-retours avec la base qu'auparavant (4)
+@pytest.mark.django_db
+def test_loan_creation_round_trips():
+    member = Member.objects.create(name='Membre', first_name='Test')
+    media = Media.objects.create(name='Média', author='Auteur')
+
+    with CaptureQueriesContext(connection) as context:
+        Loan.objects.create(borrower=member, media=media, loan_date=timezone.now())
+
+    # UPDATE conditionnels du média et des compteurs du membre, INSERT de l'emprunt
+    statements = [query['sql'] for query in context if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+    assert len(statements) == 3
+
+
+# Vérifie les PRAGMA appliqués à chaque connexion SQLite (signal connection_created),
+# et le mode WAL activé par la migration 0029_sqlite_wal
+@pytest.mark.django_db
+def test_sqlite_connection_pragmas(settings):
+    with connection.cursor() as cursor:
+        values = {name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                  for name in ('journal_mode', 'synchronous', 'busy_timeout')}
+    assert values == {'journal_mode': 'wal', 'synchronous': 1,
+                      'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout']}
+
+
+# Vérifie qu'ouvrir une connexion ne fait pas passer une base non migrée en mode WAL
+@pytest.mark.django_db
+def test_connection_leaves_journal_mode_alone(tmp_path):
+    path = tmp_path / 'legacy.sqlite3'
+    with closing(sqlite3.connect(path)) as legacy:
+        legacy.execute("CREATE TABLE t (x INTEGER)")
+    wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': str(path)}, alias='legacy')
+    try:
+        with wrapper.cursor() as cursor:
+            values = [cursor.execute(f"PRAGMA {name}").fetchone()[0] for name in ('journal_mode', 'synchronous')]
+    finally:
+        wrapper.close()
+    assert values == ['delete', 1]
+    assert not (tmp_path / 'legacy.sqlite3-wal').exists()
+
+
+def desk_traffic(member_id, media_id):
+    # Prêts et retours d'un poste, entrecoupés de lectures du catalogue
+    for _ in range(ROUNDS):
+        lend(member_id, media_id)
+        loan = Loan.objects.get(media_id=media_id, effective_return_date__isnull=True)
+        loan.effective_return_date = timezone.now().date()
+        loan.save()
+        list(catalogue_queryset()[:50])
+
+
+def increment_counter(stats_id):
+    # Lecture puis écriture dans une même transaction : en mode DEFERRED, l'écriture échoue
+    # sans attendre ("database is locked") si un autre poste a écrit depuis la lecture.
+    for _ in range(ROUNDS):
+        with transaction.atomic():
+            stats = DailyCategoryStats.objects.get(pk=stats_id)
+            stats.loans += 1
+            stats.save(update_fields=['loans'])
+
+
+# Vérifie qu'un trafic simultané de prêts, retours et lectures ne lève aucune erreur de verrou
+@pytest.mark.django_db(transaction=True)
+def test_parallel_desk_traffic_without_lock_errors():
+    members = [Member.objects.create(name=f'Membre {i}', first_name='Test') for i in range(THREADS)]
+    medias = [Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100) for i in range(THREADS)]
+
+    results = run_in_parallel(desk_traffic, [(member.id, media.id) for member, media in zip(members, medias)])
+
+    assert results == ['ok'] * THREADS
+    assert Loan.objects.filter(effective_return_date__isnull=False).count() == THREADS * ROUNDS
+    assert Media.objects.filter(availability=True).count() == THREADS
+
+
+# Vérifie que des transactions qui lisent puis écrivent la même ligne sont sérialisées, sans erreur
+@pytest.mark.django_db(transaction=True)
+def test_parallel_read_modify_write_without_lock_errors():
+    stats = DailyCategoryStats.objects.create(day=timezone.now().date(), category='book')
+
+    results = run_in_parallel(increment_counter, [(stats.id,)] * THREADS)
+
+    assert results == ['ok'] * THREADS
+    stats.refresh_from_db()
+    assert stats.loans == THREADS * ROUNDS
@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.conditional import get_tables_state
+from app_bibliothecaire.models import Member, Media, Book, Loan
+
+
+def get(client, url_name, **headers):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse(url_name), headers=headers)
+    return response, len(context)
+
+
+# Vérifie qu'une page inchangée est validée par un 304, en une seule requête et sans rendu
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['app_bibliothecaire:listmedia', 'app_membre:liste_medias_membre',
+                                      'app_bibliothecaire:listmembres'])
+def test_unchanged_page_returns_304(client, url_name):
+    Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+    # La première visite dépose le cookie CSRF, qui entre dans l'ETag
+    get(client, url_name)
+    response, _ = get(client, url_name)
+    assert response.status_code == 200
+    assert response['ETag'] and response['Last-Modified']
+
+    response, queries = get(client, url_name, if_none_match=response['ETag'])
+    assert response.status_code == 304
+    assert queries == 1
+    assert response.content == b''
+
+
+# Vérifie que l'ETag change après un emprunt, un retour, une modification et une suppression
+@pytest.mark.django_db
+def test_etag_changes_with_catalogue(client):
+    member = Member.objects.create(name='Doe', first_name='John')
+    book = Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+    url_name = 'app_bibliothecaire:listmedia'
+    get(client, url_name)
+    etags = [get(client, url_name)[0]['ETag']]
+
+    loan = Loan.objects.create(borrower=member, media=book, loan_date=timezone.now())
+    etags.append(get(client, url_name)[0]['ETag'])
+    loan.effective_return_date = timezone.now().date()
+    loan.save()
+    etags.append(get(client, url_name)[0]['ETag'])
+    book.name = 'Dune Messiah'
+    book.save()
+    etags.append(get(client, url_name)[0]['ETag'])
+    Media.objects.filter(pk=book.pk).delete()
+    etags.append(get(client, url_name)[0]['ETag'])
+
+    assert len(set(etags)) == len(etags)
+    response, _ = get(client, url_name, if_none_match=etags[0])
+    assert response.status_code == 200
+
+
+
+# Vérifie qu'une suppression, même d'une ligne ancienne, change l'état lu sans parcourir les tables
+@pytest.mark.django_db
+def test_tables_state_counts_deletions_without_scanning():
+    member = Member.objects.create(name='Doe', first_name='John')
+    books = [Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100) for i in range(3)]
+    for book in books:
+        Loan.objects.create(borrower=member, media=book, loan_date=timezone.now())
+    state = get_tables_state((Media, Loan, Member))
+
+    # Ni la dernière date de modification ni le plus grand identifiant ne changent
+    Loan.objects.filter(media=books[0]).delete()
+    after = get_tables_state((Media, Loan, Member))
+    assert after[1] == (state[1][0], state[1][1] + 1)
+    assert after[0] == state[0]
+
+    with CaptureQueriesContext(connection) as context:
+        get_tables_state((Media, Loan, Member))
+    assert 'COUNT(' not in context.captured_queries[0]['sql']
+
+
+# Vérifie que les UPDATE des compteurs et de la disponibilité renseignent modified_at
+@pytest.mark.django_db
+def test_queryset_updates_touch_modified_at():
+    member = Member.objects.create(name='Doe', first_name='John')
+    book = Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+    before = get_tables_state((Media, Member))
+
+    Loan.objects.create(borrower=member, media=book, loan_date=timezone.now())
+    member.refresh_from_db()
+    book.refresh_from_db()
+    assert member.active_loan_count == 1
+    assert member.modified_at > before[1][0]
+    assert book.modified_at > before[0][0]
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire import events
+from app_bibliothecaire.events import AVAILABILITY, RESET, EventBroker, publish_availability
+from app_bibliothecaire.models import Member, Book, Loan
+
+
+def parse(chunk):
+    # Champs d'un événement SSE encodé : {'id': ..., 'event': ..., 'data': ...}
+    fields = dict(line.split(': ', 1) for line in chunk.decode().strip().split('\n'))
+    if 'data' in fields:
+        fields['data'] = json.loads(fields['data'])
+    return fields
+
+
+async def read(stream, count):
+    # Lit 'count' morceaux du flux après la directive 'retry'
+    assert (await anext(stream)).startswith(b'retry:')
+    return [parse(await anext(stream)) for _ in range(count)]
+
+
+# Vérifie la diffusion d'un événement à tous les abonnés, et leur retrait en fin de flux
+def test_publish_reaches_every_subscriber():
+    broker = EventBroker()
+
+    async def main():
+        streams = [broker.stream() for _ in range(3)]
+        for stream in streams:
+            assert (await anext(stream)).startswith(b'retry:')
+        pending = [asyncio.ensure_future(anext(stream)) for stream in streams]
+        await asyncio.sleep(0)
+        assert broker.subscribers == 3
+        event = broker.publish(AVAILABILITY, {'media_ids': [1], 'available': True})
+        received = [parse(chunk) for chunk in await asyncio.gather(*pending)]
+        for stream in streams:
+            await stream.aclose()
+        return event, received
+
+    event, received = asyncio.run(main())
+    assert [chunk['id'] for chunk in received] == [event.id] * 3
+    assert received[0]['data'] == {'media_ids': [1], 'available': True}
+    assert broker.subscribers == 0
+
+
+# Vérifie la reprise après le dernier événement reçu (Last-Event-ID)
+def test_resume_from_last_event_id():
+    broker = EventBroker()
+    first = broker.publish(AVAILABILITY, {'media_ids': [1], 'available': False})
+    for media_id in (2, 3):
+        broker.publish(AVAILABILITY, {'media_ids': [media_id], 'available': False})
+
+    async def main(last_event_id):
+        stream = broker.stream(last_event_id)
+        try:
+            return await read(stream, 2)
+        finally:
+            await stream.aclose()
+
+    received = asyncio.run(main(first.id))
+    assert [chunk['data']['media_ids'] for chunk in received] == [[2], [3]]
+    # Identifiant d'un autre processus : abonnement sans reprise
+    _, missed = async_to_sync(_subscribe)(broker, 'autre-1')
+    assert missed == []
+
+
+async def _subscribe(broker, last_event_id):
+    subscription, missed = broker.subscribe(last_event_id)
+    broker.unsubscribe(subscription)
+    return subscription, missed
+
+
+# Vérifie l'événement 'reset' lorsque les événements manqués ne sont plus dans l'historique
+def test_reset_when_history_is_exceeded():
+    broker = EventBroker(history_size=2)
+    first = broker.publish(AVAILABILITY, {'media_ids': [1], 'available': False})
+    # L'événement 2 sort de l'historique
+    for media_id in (2, 3, 4):
+        broker.publish(AVAILABILITY, {'media_ids': [media_id], 'available': False})
+
+    async def main():
+        stream = broker.stream(first.id)
+        try:
+            return await read(stream, 1)
+        finally:
+            await stream.aclose()
+
+    assert asyncio.run(main())[0]['event'] == RESET
+    # Numéro postérieur au dernier événement, ou invalide (chiffre Unicode refusé par int())
+    for number in ('99', '²'):
+        _, missed = async_to_sync(_subscribe)(broker, f'{broker.epoch}-{number}')
+        assert missed is None
+
+
+# Vérifie qu'un client qui ne lit plus son flux est déconnecté, sans retenir les autres
+def test_slow_client_is_disconnected():
+    broker = EventBroker(buffer_size=2)
+
+    async def main():
+        slow, _ = broker.subscribe()
+        for media_id in range(3):
+            broker.publish(AVAILABILITY, {'media_ids': [media_id], 'available': True})
+        await asyncio.sleep(0)
+        assert slow.closed
+        assert await slow.queue.get() is None
+        broker.unsubscribe(slow)
+
+    asyncio.run(main())
+    assert broker.subscribers == 0
+
+
+# Vérifie que les changements de disponibilité sont annoncés après validation seulement
+@pytest.mark.django_db
+def test_changes_are_published_on_commit(monkeypatch, django_capture_on_commit_callbacks):
+    broker = EventBroker()
+    monkeypatch.setattr(events, 'broker', broker)
+    member = Member.objects.create(name='Doe', first_name='John')
+    book = Book.objects.create(name='Dune', author='Herbert', nb_pages=600)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        loan = Loan.objects.create(borrower=member, media=book, loan_date=timezone.now())
+    with django_capture_on_commit_callbacks(execute=True):
+        loan.effective_return_date = timezone.localdate()
+        loan.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                publish_availability([book.id], False)
+                raise RuntimeError
+
+    assert [event.data for event in broker._history] == [{'media_ids': [book.id], 'available': False},
+                                                         {'media_ids': [book.id], 'available': True}]
+
+
+# Vérifie le flux servi sous ASGI, et son absence sous WSGI
+@pytest.mark.django_db
+def test_availability_stream_view(client, async_views, monkeypatch):
+    broker = EventBroker()
+    monkeypatch.setattr('app_membre.async_views.broker', broker)
+    url = reverse('app_membre:evenements_disponibilite')
+    first = broker.publish(AVAILABILITY, {'media_ids': [1], 'available': False})
+    broker.publish(AVAILABILITY, {'media_ids': [2], 'available': True})
+
+    async def main():
+        response = await async_views.get(url, {'last_event_id': first.id})
+        assert response['Content-Type'] == 'text/event-stream'
+        stream = aiter(response.streaming_content)
+        try:
+            return await read(stream, 1)
+        finally:
+            await stream.aclose()
+
+    assert asyncio.run(main())[0]['data'] == {'media_ids': [2], 'available': True}
+
+    response = async_to_sync(async_views.get)(reverse('app_membre:liste_medias_membre'))
+    assert 'EventSource' in response.content.decode()
+    assert response.context['last_event_id'] == broker.last_event_id
+
+    monkeypatch.setattr('django.conf.settings.ASYNC_VIEWS', False)
+    assert client.get(url).status_code == 404
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from app_bibliothecaire.models import Member, Media, Book, Dvd, Loan
+from app_bibliothecaire.exports import iter_export
+from django.utils import timezone
+
+
+# Vérifie l'export CSV des médias avec les colonnes des sous-types
+@pytest.mark.django_db
+def test_export_media_csv():
+    book = Book.objects.create(name='Dune', author='Frank Herbert', nb_pages=600)
+    dvd = Dvd.objects.create(name='Alien', author='Ridley Scott', genre='SF')
+
+    rows = list(csv.DictReader(io.StringIO(''.join(iter_export('media', 'csv')))))
+
+    assert [row['id'] for row in rows] == [str(book.id), str(dvd.id)]
+    assert rows[0]['nb_pages'] == '600'
+    assert rows[0]['genre'] == ''
+    assert rows[1]['genre'] == 'SF'
+
+
+# Vérifie l'export JSONL des emprunts
+@pytest.mark.django_db
+def test_export_loans_jsonl():
+    member = Member.objects.create(name='Dupont', first_name='Jean')
+    media = Media.objects.create(name='Média', author='Auteur')
+    loan = Loan.objects.create(borrower=member, media=media, loan_date=timezone.now())
+
+    lines = list(iter_export('loans', 'jsonl'))
+
+    assert len(lines) == 1
+    data = json.loads(lines[0])
+    assert data['id'] == loan.id
+    assert data['borrower_id'] == member.id
+    assert data['expected_return_date'] == loan.expected_return_date.isoformat()
+    assert data['effective_return_date'] is None
+
+
+# Vérifie la commande d'export vers la sortie standard
+@pytest.mark.django_db
+def test_export_data_command():
+    Member.objects.create(name='Dupont', first_name='Jean')
+    output = io.StringIO()
+
+    call_command('export_data', 'members', '--format', 'csv', stdout=output)
+
+    lines = output.getvalue().splitlines()
+    assert lines[0] == 'id,name,first_name,email,phone,creation_date'
+    assert 'Dupont,Jean' in lines[1]
+
+
+# Vérifie la vue d'export en flux, réservée aux bibliothécaires connectés
+@pytest.mark.django_db
+def test_export_view(client):
+    Member.objects.create(name='Dupont', first_name='Jean')
+    url = reverse('app_bibliothecaire:export', args=['members'])
+
+    response = client.get(url)
+    assert response.status_code == 302
+
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+    response = client.get(url, {'format': 'jsonl'})
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert json.loads(b''.join(response.streaming_content))['name'] == 'Dupont'
+
+    assert client.get(reverse('app_bibliothecaire:export', args=['inconnu'])).status_code == 404
@@ -0,0 +1,247 @@
+import json
+from datetime import timedelta
+import pytest
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.checkouts import lend_medias
+from app_bibliothecaire.holds import (cancel_hold, expire_holds, notify_ready_holds, place_hold, queue_position,
+                                      ready_holds)
+from app_bibliothecaire.models import Member, Media, Book, Loan, Hold, allocate_holds
+from app_bibliothecaire.returns import return_loans
+
+
+@pytest.fixture
+def queue():
+    """ Livre emprunté, réservé par trois membres dans l'ordre. """
+    borrower = Member.objects.create(name='Doe', first_name='John')
+    book = Book.objects.create(name='Livre', author='Auteur', nb_pages=100)
+    loan = Loan.objects.create(borrower=borrower, media=book, loan_date=timezone.now())
+    members = [Member.objects.create(name=f'Membre {i}', first_name='Test', email=f'membre{i}@example.com')
+               for i in range(3)]
+    holds = [place_hold(member.id, book.id) for member in members]
+    return loan, members, holds
+
+
+def give_back(loan):
+    loan.effective_return_date = timezone.localdate()
+    loan.save()
+
+
+# Vérifie l'ordre de la file et l'attribution du média rendu à la première réservation
+@pytest.mark.django_db
+def test_return_allocates_first_hold(queue):
+    loan, members, holds = queue
+    assert [queue_position(hold) for hold in holds] == [1, 2, 3]
+
+    give_back(loan)
+
+    statuses = dict(Hold.objects.values_list('id', 'status'))
+    assert [statuses[hold.id] for hold in holds] == [Hold.READY, Hold.WAITING, Hold.WAITING]
+    assert not Media.objects.get(pk=loan.media_id).availability
+    assert queue_position(holds[1]) == 1
+    assert [hold['media_name'] for hold in ready_holds(members[0].id)] == ['Livre']
+    assert ready_holds(members[1].id) == []
+
+
+# Vérifie que seul le réservataire peut emprunter le média mis de côté
+@pytest.mark.django_db
+def test_held_media_is_lent_to_holder_only(queue):
+    loan, members, holds = queue
+    give_back(loan)
+
+    with pytest.raises(ValueError):
+        Loan.objects.create(borrower=members[1], media_id=loan.media_id, loan_date=timezone.now())
+    Loan.objects.create(borrower=members[0], media_id=loan.media_id, loan_date=timezone.now())
+
+    assert Hold.objects.get(pk=holds[0].pk).status == Hold.FULFILLED
+    assert ready_holds(members[0].id) == []
+
+
+# Vérifie l'attribution lors d'un retour par lot et d'un emprunt groupé
+@pytest.mark.django_db
+def test_batch_return_and_checkout_use_holds(queue):
+    loan, members, holds = queue
+    other = Book.objects.create(name='Autre', author='Auteur', nb_pages=100)
+    other_loan = Loan.objects.create(borrower=loan.borrower, media=other, loan_date=timezone.now())
+
+    return_loans(loan_ids=[loan.id, other_loan.id])
+
+    assert dict(Media.objects.values_list('name', 'availability')) == {'Livre': False, 'Autre': True}
+    assert Hold.objects.get(pk=holds[0].pk).status == Hold.READY
+
+    loans = lend_medias(members[0].id, [loan.media_id, other.id])
+    assert len(loans) == 2
+    assert Hold.objects.get(pk=holds[0].pk).status == Hold.FULFILLED
+    with pytest.raises(ValueError):
+        lend_medias(members[1].id, [loan.media_id])
+
+
+# Vérifie qu'un emprunt déjà rendu, enregistré à nouveau, ne libère pas le média emprunté ou mis de côté depuis
+@pytest.mark.django_db
+def test_resaving_returned_loan_keeps_media_unavailable(queue):
+    loan, members, holds = queue
+    give_back(loan)
+    new_loan = Loan.objects.create(borrower=members[0], media_id=loan.media_id, loan_date=timezone.now())
+
+    loan.effective_return_date = timezone.localdate() - timedelta(days=1)
+    loan.save()
+
+    assert not Media.objects.get(pk=loan.media_id).availability
+    assert Hold.objects.get(pk=holds[1].pk).status == Hold.WAITING
+    # Le média rendu par le nouvel emprunt passe à la réservation suivante
+    give_back(new_loan)
+    assert Hold.objects.get(pk=holds[1].pk).status == Hold.READY
+    loan.save()
+    assert not Media.objects.get(pk=loan.media_id).availability
+
+
+# Vérifie qu'un média mis de côté, sans emprunt en cours, est affiché comme indisponible
+@pytest.mark.django_db
+def test_held_media_is_shown_unavailable(client, queue):
+    loan, members, holds = queue
+    give_back(loan)
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+
+    response = client.get(reverse('app_bibliothecaire:api_medias'))
+    assert [media['available'] for media in response.json()['results']] == [False]
+    assert "Média mis de côté pour une réservation" in client.get(reverse('app_membre:liste_medias_membre')).content.decode()
+    assert "Mis de côté pour une réservation" in client.get(reverse('app_bibliothecaire:listmedia')).content.decode()
+
+
+# Vérifie les réservations refusées
+@pytest.mark.django_db
+def test_place_hold_rejections(queue):
+    loan, members, holds = queue
+    available = Book.objects.create(name='Disponible', author='Auteur', nb_pages=100)
+
+    with pytest.raises(ValueError, match="disponible"):
+        place_hold(members[0].id, available.id)
+    with pytest.raises(ValueError, match="déjà réservé"):
+        place_hold(members[0].id, loan.media_id)
+    with pytest.raises(ValueError, match="déjà emprunté"):
+        place_hold(loan.borrower_id, loan.media_id)
+    with pytest.raises(ValueError, match="n'existe pas"):
+        place_hold(999, loan.media_id)
+    assert Hold.objects.count() == 3
+
+
+# Vérifie l'annulation : le média passe à la réservation suivante, puis redevient disponible
+@pytest.mark.django_db
+def test_cancel_ready_hold_passes_media_on(queue):
+    loan, members, holds = queue
+    give_back(loan)
+
+    cancel_hold(holds[0].id)
+    assert Hold.objects.get(pk=holds[1].pk).status == Hold.READY
+    cancel_hold(holds[2].id)
+    cancel_hold(holds[1].id)
+
+    assert Media.objects.get(pk=loan.media_id).availability
+    with pytest.raises(ValueError):
+        cancel_hold(holds[1].id)
+
+
+# Vérifie l'expiration des réservations non retirées et la notification des membres
+@pytest.mark.django_db
+def test_expire_and_notify(queue):
+    loan, members, holds = queue
+    give_back(loan)
+
+    assert notify_ready_holds() == (1, 1)
+    assert mail.outbox[0].to == ['membre0@example.com']
+    assert "Livre" in mail.outbox[0].body
+    assert notify_ready_holds() == (0, 0)
+
+    later = timezone.localdate() + timedelta(days=Hold.PICKUP_DAYS + 1)
+    assert expire_holds(later) == 1
+    assert Hold.objects.get(pk=holds[0].pk).status == Hold.EXPIRED
+    assert Hold.objects.get(pk=holds[1].pk).status == Hold.READY
+
+    call_command('process_holds')
+    assert mail.outbox[-1].to == ['membre1@example.com']
+
+
+# Vérifie la notification par lots de membres : une connexion et un nombre constant de requêtes par lot
+@pytest.mark.django_db
+def test_notify_ready_holds_in_batches(tmp_path):
+    members = Member.objects.bulk_create(Member(name=f'Membre {i}', first_name='Test', email=f'm{i}@example.com')
+                                         for i in range(5))
+    medias = Media.objects.bulk_create(Media(name=f'Media {i}', author='Auteur', availability=False)
+                                       for i in range(10))
+    Hold.objects.bulk_create(Hold(media=media, member=members[i % 5], status=Hold.READY,
+                                  ready_at=timezone.now(), expires_on=timezone.localdate())
+                             for i, media in enumerate(medias))
+
+    with override_settings(EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+                           EMAIL_FILE_PATH=str(tmp_path)):
+        with CaptureQueriesContext(connection) as context:
+            assert notify_ready_holds(batch_size=2) == (5, 10)
+
+    # Par lot : membres du lot, réservations du lot, marquage des notifications ; puis le lot vide
+    assert len(context) == 3 * 3 + 1
+    # Le backend fichier écrit un fichier par connexion
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+# Vérifie que la tête de file et les réservations prêtes sont lues dans les index partiels
+@pytest.mark.django_db
+def test_hold_queries_use_partial_indexes():
+    # Long historique de réservations, presque toutes closes
+    members = Member.objects.bulk_create(Member(name=f'Membre {i}', first_name='Test') for i in range(20))
+    medias = Media.objects.bulk_create(Media(name=f'Media {i}', author='Auteur', availability=False)
+                                       for i in range(50))
+    # Réservations ouvertes parmi les 100 premières : au plus une par membre et par média
+    statuses = [Hold.FULFILLED] * 8 + [Hold.WAITING, Hold.READY]
+    status = [statuses[i % 10] if i < 100 else Hold.FULFILLED for i in range(1000)]
+    Hold.objects.bulk_create(
+        Hold(media=medias[i % 50], member=members[i % 20], status=status[i],
+             expires_on=timezone.localdate() if status[i] == Hold.READY else None)
+        for i in range(1000)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    with CaptureQueriesContext(connection) as queries:
+        allocate_holds([medias[0].id])
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {queries.captured_queries[0]['sql']}")
+        assert 'hold_queue_idx' in str(cursor.fetchall())
+
+    ready = Hold.objects.filter(member=members[0], status=Hold.READY).order_by('expires_on', 'id')
+    assert 'hold_ready_member_idx' in ready.explain()
+
+
+# Vérifie les points d'accès de l'API des réservations
+@pytest.mark.django_db
+def test_holds_api(client, queue):
+    loan, members, holds = queue
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+    late = Member.objects.create(name='Smith', first_name='Jane')
+
+    response = client.post(reverse('app_bibliothecaire:api_reservations'),
+                           json.dumps({'member_id': late.id, 'media_id': loan.media_id}),
+                           content_type='application/json')
+    assert response.status_code == 201
+    assert response.json()['position'] == 4
+
+    response = client.post(reverse('app_bibliothecaire:api_reservations'),
+                           json.dumps({'member_id': late.id, 'media_id': loan.media_id}),
+                           content_type='application/json')
+    assert response.status_code == 400
+
+    give_back(loan)
+    response = client.get(reverse('app_bibliothecaire:api_reservations_pretes', args=[members[0].id]))
+    assert [hold['media_name'] for hold in response.json()['results']] == ['Livre']
+
+    response = client.post(reverse('app_bibliothecaire:api_annuler_reservation', args=[holds[0].id]))
+    assert response.json()['status'] == Hold.CANCELLED
+    assert client.post(reverse('app_bibliothecaire:api_annuler_reservation', args=[holds[0].id])).status_code == 404
+
+    response = client.get(reverse('app_bibliothecaire:retour_emprunt'), {'borrower_id': members[1].id})
+    assert "Réservations à retirer" in response.content.decode()
@@ -0,0 +1,75 @@
+import io
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from app_bibliothecaire.models import Media, Book, Dvd, Cd, Board
+from app_bibliothecaire.imports import read_rows, import_media
+
+CSV_DATA = """type,name,author,nb_pages,genre,release_date,number_players_min,number_players_max
+book,Dune,Frank Herbert,600,,,,
+dvd,Alien,Ridley Scott,,SF,,,
+cd,Nevermind,Nirvana,,,1991-09-24,,
+board,Catan,Klaus Teuber,,,,3,4
+book,,Sans titre,100,,,,
+cd,Date invalide,Artiste,,,pas-une-date,,
+"""
+
+
+# Vérifie l'import par lots des quatre sous-types et le rejet des lignes invalides
+@pytest.mark.django_db
+def test_import_media_csv():
+    result = import_media(read_rows(io.StringIO(CSV_DATA), 'csv'), batch_size=2)
+
+    assert result.created == 4
+    assert [line_num for line_num, _ in result.errors] == [6, 7]
+    assert 'name' in result.errors[0][1]
+    assert Book.objects.get(name='Dune').nb_pages == 600
+    assert Dvd.objects.get(name='Alien').genre == 'SF'
+    assert Cd.objects.get(name='Nevermind').release_date.isoformat() == '1991-09-24'
+    board = Board.objects.get(name='Catan')
+    assert (board.number_players_min, board.number_players_max) == (3, 4)
+    assert not board.availability
+    assert Media.objects.get(name='Dune').category == 'book'
+    assert Media.objects.count() == 4
+
+
+# Vérifie l'import JSONL avec un type par défaut
+@pytest.mark.django_db
+def test_import_media_jsonl_default_type():
+    data = '{"name": "Amélie", "author": "Jean-Pierre Jeunet", "genre": "Comédie"}\n\nnot json\n'
+
+    result = import_media(read_rows(io.StringIO(data), 'jsonl'), default_type='dvd')
+
+    assert result.created == 1
+    assert result.errors == [(3, "Ligne illisible.")]
+    assert Dvd.objects.get().availability
+
+
+# Vérifie la commande d'import
+@pytest.mark.django_db
+def test_import_media_command(tmp_path):
+    path = tmp_path / 'medias.csv'
+    path.write_text(CSV_DATA, encoding='utf-8')
+    output = io.StringIO()
+
+    call_command('import_media', str(path), stdout=output, stderr=io.StringIO())
+
+    assert "4 médias importés, 2 lignes rejetées." in output.getvalue()
+
+
+# Vérifie la vue d'import par envoi de fichier
+@pytest.mark.django_db
+def test_import_media_view(client):
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+
+    response = client.post(reverse('app_bibliothecaire:import_media'), {
+        'file': SimpleUploadedFile('medias.csv', CSV_DATA.encode('utf-8')),
+        'import_format': 'csv',
+        'media_type': '',
+    })
+
+    assert response.status_code == 200
+    assert response.context['result'].created == 4
+    assert "Ligne 6" in response.content.decode()
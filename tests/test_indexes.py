@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+from app_bibliothecaire.models import Member, Media, Loan
+from app_bibliothecaire.pagination import MEMBER_ORDERING
+from app_bibliothecaire.views import member_list_queryset
+
+
+def query_plan(queryset):
+    """ Retourne le plan d'exécution SQLite (EXPLAIN QUERY PLAN) d'un queryset. """
+    return queryset.explain()
+
+
+@pytest.fixture
+def loans():
+    # Long historique d'emprunts d'un membre, presque tous rendus
+    member = Member.objects.create(name='Index', first_name='Test')
+    categories = [category for category, _ in Media.CATEGORY_CHOICES]
+    medias = Media.objects.bulk_create(
+        Media(name=f'Media {i}', author='Auteur', category=categories[i % 4], availability=bool(i % 10))
+        for i in range(200)
+    )
+    Loan.objects.bulk_create(
+        Loan(borrower=member, media=media, loan_date=timezone.now(),
+             effective_return_date=timezone.now().date() if i % 10 else None)
+        for i, media in enumerate(medias)
+    )
+    # Statistiques du planificateur, comme sur une base en production
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return member
+
+
+# Vérifie que les emprunts en cours d'un membre (limite et retards) passent par l'index partiel
+@pytest.mark.django_db
+def test_active_loans_of_borrower_use_partial_index(loans):
+    active = Loan.objects.filter(borrower=loans, effective_return_date__isnull=True)
+
+    assert 'loan_active_borrower_idx' in query_plan(active)
+    assert 'loan_active_borrower_idx' in query_plan(
+        active.filter(expected_return_date__lt=timezone.now().date()))
+
+
+# Vérifie que l'emprunt en cours des médias affichés passe par l'index partiel
+@pytest.mark.django_db
+def test_active_loan_of_media_uses_partial_index(loans):
+    medias = list(Media.objects.values_list('pk', flat=True)[:5])
+
+    plan = query_plan(Loan.objects.filter(media__in=medias, effective_return_date__isnull=True))
+
+    assert 'loan_active_media_idx' in plan
+
+
+# Vérifie que la recherche des retards de tous les membres passe par l'index partiel
+@pytest.mark.django_db
+def test_overdue_loans_use_partial_index(loans):
+    plan = query_plan(Loan.objects.filter(effective_return_date__isnull=True,
+                                          expected_return_date__lt=timezone.now().date()))
+
+    assert 'loan_active_due_idx' in plan
+
+
+# Vérifie que les médias disponibles d'une catégorie passent par l'index composite
+@pytest.mark.django_db
+def test_available_media_by_category_use_composite_index(loans):
+    plan = query_plan(Media.objects.filter(category='book', availability=True))
+
+    assert 'media_category_avail_idx' in plan
+
+
+# Vérifie que la recherche de la liste des membres par début de nom ou de prénom passe par les index
+@pytest.mark.django_db
+def test_member_list_search_uses_name_indexes():
+    Member.objects.bulk_create(Member(name=f'Nom {i:04d}', first_name=f'Prénom {i}') for i in range(1000))
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    members = member_list_queryset('nom 01').order_by(*MEMBER_ORDERING)
+    plan = query_plan(members[:20])
+
+    assert 'member_name_lower_idx' in plan and 'member_first_name_lower_idx' in plan
+    assert 'SCAN app_bibliothecaire_member' not in plan
+    assert members.count() == 100
@@ -0,0 +1,100 @@
+import json
+import logging
+import pytest
+from django.conf import settings
+from django.urls import reverse
+from my_mediatheque_project.middleware import ContextMiddleware
+from my_mediatheque_project.log import JsonFormatter, QueueListenerHandler, RequestContextFilter, configure_logging
+
+
+class ListHandler(logging.Handler):
+    """ Conserve les enregistrements reçus, avec leur formatage JSON. """
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(JsonFormatter())
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(json.loads(self.format(record)))
+
+
+@pytest.fixture
+def queued_log():
+    """ Branche une file de journalisation sur les journaux des vues et des requêtes. """
+    target = ListHandler()
+    handler = QueueListenerHandler([target])
+    handler.addFilter(RequestContextFilter())
+    loggers = [logging.getLogger(name) for name in ('app_bibliothecaire.views', 'my_mediatheque_project.requests')]
+    for logger in loggers:
+        logger.addHandler(handler)
+    yield handler, target.lines
+    for logger in loggers:
+        logger.removeHandler(handler)
+    handler.close()
+
+
+# Vérifie que les journaux d'une requête portent son identifiant et la durée écoulée
+@pytest.mark.django_db
+def test_request_logs_carry_request_id_and_duration(client, queued_log):
+    handler, lines = queued_log
+    response = client.get(reverse('app_bibliothecaire:listmembres'), headers={'x-request-id': 'desk-42'})
+    handler.flush()
+
+    assert response['X-Request-ID'] == 'desk-42'
+    assert {line['request_id'] for line in lines} == {'desk-42'}
+    assert lines[0]['message'] == "Accès à la liste des membres."
+    access = lines[-1]
+    assert (access['method'], access['path'], access['status']) == ('GET', '/bibliothecaire/listmembres/', 200)
+    assert access['duration_ms'] >= lines[0]['duration_ms'] >= 0
+
+
+# Vérifie que les arguments et la trace d'exception sont figés avant la mise en file
+def test_queued_record_is_formatted_in_caller_thread(queued_log):
+    handler, lines = queued_log
+    logger = logging.getLogger('app_bibliothecaire.views')
+    members = ['Doe']
+    try:
+        raise ValueError('invalide')
+    except ValueError:
+        logger.error("Membres : %s", members, exc_info=True)
+    members.append('Smith')
+    handler.flush()
+
+    assert lines[0]['message'] == "Membres : ['Doe']"
+    assert lines[0]['request_id'] is None
+    assert 'ValueError: invalide' in lines[0]['exception']
+
+
+# Vérifie que les gestionnaires cibles sont résolus par nom, quel que soit l'ordre des noms
+def test_configure_logging_resolves_targets_by_name():
+    configure_logging({
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {
+            # 'file' précède 'zz_target' dans l'ordre alphabétique
+            'file': {'()': QueueListenerHandler, 'handlers': ['zz_target']},
+            'zz_target': {'()': ListHandler},
+        },
+        'loggers': {'app_bibliothecaire.tests': {'handlers': ['file'], 'propagate': False}},
+    })
+    try:
+        handler = logging.getLogger('app_bibliothecaire.tests').handlers[0]
+        assert handler.listening
+        logging.getLogger('app_bibliothecaire.tests').warning("Retard de %s jours", 3)
+        handler.flush()
+        assert [line['message'] for line in handler.listener.handlers[0].lines] == ["Retard de 3 jours"]
+    finally:
+        configure_logging(settings.LOGGING)
+    assert not handler.listening
+
+
+# Vérifie qu'un middleware sans l'une des méthodes de ContextMiddleware est refusé dès sa création
+def test_context_middleware_requires_every_hook():
+    class StartOnly(ContextMiddleware):
+        def start(self, request):
+            return None
+
+    with pytest.raises(TypeError):
+        StartOnly(lambda request: None)
+
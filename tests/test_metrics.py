@@ -0,0 +1,104 @@
+import logging
+import re
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.models import Member, Book, Loan
+from my_mediatheque_project.metrics import registry
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    registry.reset()
+
+
+def server_timing_queries(response):
+    return int(re.search(r'desc="(\d+) queries"', response['Server-Timing']).group(1))
+
+
+def populate(count):
+    books = [Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100) for i in range(count)]
+    for i, book in enumerate(books):
+        member = Member.objects.create(name=f'Membre {i}', first_name='Test')
+        Loan.objects.create(borrower=member, media=book, loan_date=timezone.now())
+
+
+# Vérifie l'en-tête Server-Timing et le cumul des mesures par vue
+@pytest.mark.django_db
+def test_server_timing_and_metrics_endpoint(client):
+    populate(3)
+    url = reverse('app_bibliothecaire:listmembres')
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    queries = len(context)
+    assert re.match(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"$', response['Server-Timing'])
+    assert server_timing_queries(response) == queries
+    client.get(url)
+
+    metrics = client.get(reverse('metrics')).content.decode()
+    view = 'view="app_bibliothecaire:listmembres"'
+    assert f'mediatheque_requests_total{{{view},method="GET",status="200"}} 2' in metrics
+    assert f'mediatheque_request_duration_seconds_count{{{view}}} 2' in metrics
+    assert f'mediatheque_db_queries_total{{{view}}} {2 * queries}' in metrics
+    assert f'mediatheque_response_bytes_total{{{view}}} {2 * len(response.content)}' in metrics
+
+
+# Vérifie que les mesures ne sont lisibles que depuis les adresses autorisées
+def test_metrics_endpoint_restricted(client):
+    assert client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.8').status_code == 404
+
+
+# Vérifie que le nombre de requêtes SQL des listes ne dépend pas du nombre de lignes (pas de N+1)
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['app_bibliothecaire:listmedia', 'app_bibliothecaire:listmembres',
+                                      'app_membre:liste_medias_membre'])
+def test_list_pages_within_query_budget(client, settings, url_name):
+    populate(2)
+    few = server_timing_queries(client.get(reverse(url_name)))
+    Book.objects.all().delete()
+    Member.objects.all().delete()
+    populate(30)
+    many = server_timing_queries(client.get(reverse(url_name)))
+    assert many == few <= settings.QUERY_BUDGET
+
+
+# Vérifie qu'une requête HTTP au-delà du budget de requêtes SQL est signalée
+@pytest.mark.django_db
+def test_query_budget_warning(client, settings):
+    settings.QUERY_BUDGET = 1
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger('my_mediatheque_project.requests')
+    logger.addHandler(handler)
+    try:
+        client.get(reverse('app_bibliothecaire:listmembres'))
+    finally:
+        logger.removeHandler(handler)
+    warnings = [record for record in records if record.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert 'app_bibliothecaire:listmembres' in warnings[0].getMessage()
+
+
+# Vérifie la taille mesurée d'une réponse en flux, une fois le flux consommé
+@pytest.mark.django_db
+def test_streaming_response_size(client):
+    populate(5)
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+    response = client.get(reverse('app_bibliothecaire:export', args=['members']))
+    size = len(b''.join(response.streaming_content))
+    assert registry.snapshot()['app_bibliothecaire:export'].response_bytes == size
+
+
+# Vérifie que les requêtes SQL exécutées par l'ORM asynchrone (autre thread) sont comptées
+@pytest.mark.django_db
+def test_async_view_queries_counted(async_views):
+    populate(3)
+    response = async_to_sync(async_views.get)(reverse('app_bibliothecaire:listmedia'))
+    assert response.status_code == 200
+    assert server_timing_queries(response) >= 3
+    assert registry.snapshot()['app_bibliothecaire:listmedia'].max_queries == server_timing_queries(response)
@@ -1,4 +1,6 @@
+import io
 import pytest
+from django.core.management import call_command
 from app_bibliothecaire.models import Member, Media, Loan
 from django.utils import timezone
 from datetime import timedelta
@@ -162,3 +164,66 @@ def test_media_as_unavailable():
             loan_date=timezone.now()
         )
 
+
+
+# Vérifie que les vérifications du membre lisent uniquement ses compteurs
+@pytest.mark.django_db
+def test_borrower_loan_status(django_assert_num_queries):
+    member = Member.objects.create(name='Statut', first_name='Test')
+    for i in range(3):
+        media = Media.objects.create(name=f'Media {i}', author='Auteur', category='livre')
+        # Le dernier emprunt est déjà en retard
+        expected_return_date = timezone.now().date() - timedelta(days=1) if i == 2 else None
+        Loan.objects.create(borrower=member, media=media, loan_date=timezone.now(),
+                            expected_return_date=expected_return_date)
+    loan = Loan(borrower=member)
+
+    with django_assert_num_queries(1):
+        assert loan.borrower_loan_status() == (3, True)
+
+
+# Vérifie la tenue à jour des compteurs d'emprunts du membre et leur recalcul
+@pytest.mark.django_db
+def test_member_loan_counters():
+    member = Member.objects.create(name='Compteurs', first_name='Test')
+    medias = [Media.objects.create(name=f'Media {i}', author='Auteur', category='livre') for i in range(3)]
+    loans = [
+        Loan.objects.create(borrower=member, media=media, loan_date=timezone.now(),
+                            expected_return_date=timezone.now().date() + timedelta(days=5 + i))
+        for i, media in enumerate(medias)
+    ]
+    member.refresh_from_db()
+    assert member.active_loan_count == 3
+    assert member.earliest_due_date == loans[0].expected_return_date
+
+    loans[0].effective_return_date = timezone.now().date()
+    loans[0].save()
+    loans[0].save()  # Un second enregistrement du retour ne décompte pas deux fois
+    member.refresh_from_db()
+    assert member.active_loan_count == 2
+    assert member.earliest_due_date == loans[1].expected_return_date
+
+    medias[1].delete()  # Supprime l'emprunt en cascade
+    member.refresh_from_db()
+    assert member.active_loan_count == 1
+    assert member.earliest_due_date == loans[2].expected_return_date
+
+    Member.objects.filter(pk=member.pk).update(active_loan_count=0, earliest_due_date=None)
+    call_command('refresh_loan_counters', stdout=io.StringIO())
+    member.refresh_from_db()
+    assert member.active_loan_count == 1
+    assert member.earliest_due_date == loans[2].expected_return_date
+
+
+# Vérifie que le retour d'un emprunt rend le média disponible
+@pytest.mark.django_db
+def test_return_marks_media_as_available():
+    member = Member.objects.create(name='Retour', first_name='Test')
+    media = Media.objects.create(name='Media Retour', author='Auteur', category='livre')
+    loan = Loan.objects.create(borrower=member, media=media, loan_date=timezone.now())
+
+    loan.effective_return_date = timezone.now().date()
+    loan.save()
+
+    media.refresh_from_db()
+    assert media.availability is True
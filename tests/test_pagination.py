@@ -0,0 +1,63 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from app_bibliothecaire.models import Book, Dvd, Media
+from app_bibliothecaire.pagination import encode_cursor, decode_cursor, keyset_page
+
+
+# Vérifie qu'un curseur encodé se décode à l'identique
+@pytest.mark.django_db
+def test_cursor_round_trip():
+    book = Book.objects.create(name="L'Étranger", author='Albert Camus', category='book')
+    assert decode_cursor(encode_cursor(book)) == ('book', "L'Étranger", book.id)
+
+
+# Vérifie qu'un curseur invalide est refusé
+def test_invalid_cursor():
+    with pytest.raises(ValueError, match="Curseur de pagination invalide"):
+        decode_cursor('pas-un-curseur')
+
+
+# Vérifie que le parcours page par page couvre tout le catalogue, dans l'ordre, sans doublon
+@pytest.mark.django_db
+def test_keyset_page_walks_whole_catalogue():
+    for i in range(7):
+        Book.objects.create(name=f'Livre {i % 3}', author='Auteur', category='book')
+        Dvd.objects.create(name=f'DVD {i}', author='Réalisateur', category='dvd')
+
+    seen = []
+    cursor = None
+    while True:
+        page = keyset_page(Media.objects.all(), cursor, page_size=4)
+        seen.extend(page.items)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+
+    expected = list(Media.objects.order_by('category', 'name', 'id'))
+    assert seen == expected
+    assert len(seen) == 14
+
+
+# Vérifie l'API JSON paginée du catalogue
+@pytest.mark.django_db
+def test_api_medias(client):
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+    for i in range(3):
+        Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=10 * i, category='book')
+    url = reverse('app_bibliothecaire:api_medias')
+
+    response = client.get(url, {'page_size': 2})
+    data = response.json()
+    assert response.status_code == 200
+    assert [media['name'] for media in data['results']] == ['Livre 0', 'Livre 1']
+    assert data['results'][1]['nb_pages'] == 10
+    assert data['results'][0]['available'] is True
+
+    response = client.get(url, {'page_size': 2, 'cursor': data['next_cursor']})
+    data = response.json()
+    assert [media['name'] for media in data['results']] == ['Livre 2']
+    assert data['next_cursor'] is None
+
+    response = client.get(url, {'cursor': 'invalide'})
+    assert response.status_code == 400
@@ -0,0 +1,84 @@
+import pytest
+from datetime import timedelta
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from app_bibliothecaire.models import Member, Media, Loan, OverdueReminder
+from app_bibliothecaire.reminders import send_overdue_reminders
+
+
+def create_loans(member, count, days_late):
+    # Emprunts créés en masse : les règles d'emprunt (3 au plus, pas de retard) ne s'appliquent pas
+    today = timezone.now().date()
+    media = Media.objects.bulk_create(Media(name=f"{member.name} {i}", author="Auteur", availability=False)
+                                      for i in range(count))
+    return Loan.objects.bulk_create(Loan(borrower=member, media=m, loan_date=timezone.now(),
+                                         expected_return_date=today - timedelta(days=days_late))
+                                    for m in media)
+
+
+# Vérifie qu'un seul message regroupe les retards d'un membre, et que les autres ne sont pas relancés
+@pytest.mark.django_db
+def test_reminders_grouped_per_member():
+    late = Member.objects.create(name="Doe", first_name="John", email="john@example.com")
+    on_time = Member.objects.create(name="Smith", first_name="Anna", email="anna@example.com")
+    create_loans(late, 2, days_late=3)
+    create_loans(on_time, 1, days_late=-2)
+    returned = create_loans(on_time, 1, days_late=5)[0]
+    Loan.objects.filter(pk=returned.pk).update(effective_return_date=timezone.now().date())
+
+    result = send_overdue_reminders()
+
+    assert (result.members, result.loans) == (1, 2)
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ["john@example.com"]
+    assert "Doe 0" in mail.outbox[0].body and "Doe 1" in mail.outbox[0].body
+    assert OverdueReminder.objects.count() == 2
+
+
+# Vérifie qu'une seconde exécution ne relance pas les mêmes emprunts
+@pytest.mark.django_db
+def test_reminders_are_idempotent():
+    member = Member.objects.create(name="Doe", first_name="John", email="john@example.com")
+    create_loans(member, 2, days_late=3)
+    send_overdue_reminders()
+    result = send_overdue_reminders()
+
+    assert result.loans == 0
+    assert len(mail.outbox) == 1
+
+
+# Vérifie l'envoi par lots : une connexion et un nombre constant de requêtes par lot
+@pytest.mark.django_db
+def test_reminders_batches(tmp_path):
+    for i in range(5):
+        member = Member.objects.create(name=f"Membre {i}", first_name="Test", email=f"m{i}@example.com")
+        create_loans(member, 2, days_late=i + 1)
+    Member.objects.create(name="Sans", first_name="Email")
+    create_loans(Member.objects.get(name="Sans"), 1, days_late=3)
+
+    with override_settings(EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+                           EMAIL_FILE_PATH=str(tmp_path)):
+        with CaptureQueriesContext(connection) as context:
+            result = send_overdue_reminders(batch_size=2)
+
+    assert (result.members, result.loans, result.batches) == (5, 10, 3)
+    # Par lot : membres du lot, emprunts du lot, enregistrement des relances ; puis le lot vide
+    assert len(context) == 3 * 3 + 1
+    # Le backend fichier écrit un fichier par connexion
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+# Vérifie que la commande n'envoie rien avec --dry-run
+@pytest.mark.django_db
+def test_send_overdue_reminders_command_dry_run(capsys):
+    member = Member.objects.create(name="Doe", first_name="John", email="john@example.com")
+    create_loans(member, 1, days_late=3)
+    call_command('send_overdue_reminders', '--dry-run')
+
+    assert "1 membres à relancer pour 1 emprunts en retard" in capsys.readouterr().out
+    assert len(mail.outbox) == 0
+    assert not OverdueReminder.objects.exists()
@@ -0,0 +1,119 @@
+import json
+from datetime import timedelta
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.conditional import MEMBER_CATALOGUE_MODELS, get_tables_state
+from app_bibliothecaire.models import Member, Book, Loan
+from app_bibliothecaire.returns import (return_loans, RETURNED, NOT_FOUND, ALREADY_RETURNED, INVALID_DATE,
+                                        DUPLICATE)
+
+
+def lend_books(count, member=None):
+    loans = []
+    for i in range(count):
+        borrower = member or Member.objects.create(name=f'Membre {i}', first_name='Test')
+        book = Book.objects.create(name=f'Livre {i}', author='Auteur', nb_pages=100)
+        loans.append(Loan.objects.create(borrower=borrower, media=book, loan_date=timezone.now()))
+    return loans
+
+
+@pytest.fixture
+def librarian(client):
+    client.force_login(User.objects.create_user(username='biblio', password='secret'))
+    return client
+
+
+# Vérifie les retours valides et le motif de rejet de chaque élément invalide
+@pytest.mark.django_db
+def test_return_loans_per_item_results():
+    member = Member.objects.create(name='Doe', first_name='John')
+    loans = lend_books(3, member)
+    returned_loan = lend_books(1)[0]
+    returned_loan.effective_return_date = timezone.localdate()
+    returned_loan.save()
+    state = get_tables_state(MEMBER_CATALOGUE_MODELS)
+
+    result = return_loans(loan_ids=[loans[0].id, returned_loan.id],
+                          media_ids=[loans[1].media_id, loans[0].media_id, 999])
+
+    assert [(item['kind'], item['status']) for item in result.items] == [
+        ('loan', RETURNED), ('loan', ALREADY_RETURNED), ('media', RETURNED), ('media', DUPLICATE),
+        ('media', NOT_FOUND)]
+    assert result.items[0]['media_name'] == 'Livre 0'
+    assert (result.returned, result.rejected) == (2, 3)
+    assert Loan.objects.filter(effective_return_date=timezone.localdate()).count() == 3
+    assert Book.objects.filter(availability=True).count() == 3
+    member.refresh_from_db()
+    assert member.active_loan_count == 1
+    assert member.earliest_due_date == loans[2].expected_return_date
+    # Les fragments du catalogue en cache sont écartés, dans tous les processus
+    assert get_tables_state(MEMBER_CATALOGUE_MODELS) != state
+
+
+# Vérifie qu'une date de retour antérieure à l'emprunt est rejetée sans bloquer le lot
+@pytest.mark.django_db
+def test_return_loans_rejects_date_before_loan():
+    loans = lend_books(2)
+    Loan.objects.filter(pk=loans[0].pk).update(loan_date=timezone.now() - timedelta(days=10))
+
+    result = return_loans(media_ids=[loan.media_id for loan in loans],
+                          return_date=timezone.localdate() - timedelta(days=5))
+
+    assert [item['status'] for item in result.items] == [RETURNED, INVALID_DATE]
+
+
+# Vérifie que le nombre de requêtes ne dépend pas de la taille du lot
+@pytest.mark.django_db
+def test_return_loans_constant_queries():
+    counts = []
+    for size in (2, 40):
+        loans = lend_books(size)
+        with CaptureQueriesContext(connection) as context:
+            result = return_loans(media_ids=[loan.media_id for loan in loans])
+        assert result.returned == size
+        counts.append(len(context))
+    assert counts[0] == counts[1]
+
+
+# Vérifie la page de retour par lot
+@pytest.mark.django_db
+def test_batch_return_view(librarian):
+    loans = lend_books(2)
+    url = reverse('app_bibliothecaire:retour_lot')
+    assert librarian.get(url).status_code == 200
+
+    response = librarian.post(url, {'media_ids': f"{loans[0].media_id}\n{loans[1].media_id}, 999",
+                                    'effective_return_date': timezone.localdate().isoformat()})
+    assert response.status_code == 200
+    assert response.context['result'].returned == 2
+    assert "Aucun emprunt en cours ne correspond." in response.content.decode()
+
+    # Lettres, et chiffres Unicode qu'int() refuse
+    for media_ids in ("12 abc", "12 ²", "①"):
+        response = librarian.post(url, {'media_ids': media_ids, 'effective_return_date': '2025-01-01'})
+        assert response.status_code == 200
+        assert response.context['result'] is None
+        assert 'media_ids' in response.context['form'].errors
+
+
+# Vérifie l'API JSON de retour par lot
+@pytest.mark.django_db
+def test_batch_return_api(librarian):
+    loans = lend_books(2)
+    url = reverse('app_bibliothecaire:api_retours')
+
+    response = librarian.post(url, json.dumps({'loan_ids': [loans[0].id], 'media_ids': [loans[1].media_id],
+                                               'return_date': timezone.localdate().isoformat()}),
+                              content_type='application/json')
+    assert response.status_code == 200
+    data = response.json()
+    assert (data['returned'], data['rejected']) == (2, 0)
+    assert [item['loan_id'] for item in data['results']] == [loans[0].id, loans[1].id]
+
+    for body in ('pas du json', json.dumps({'media_ids': ['1']}), json.dumps({'return_date': '15/01/2025'})):
+        assert librarian.post(url, body, content_type='application/json').status_code == 400
+    assert librarian.get(url).status_code == 405
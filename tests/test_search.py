@@ -0,0 +1,72 @@
+import io
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.models import Member, Media, Book, Dvd, Loan
+from app_bibliothecaire.imports import read_rows, import_media
+from app_bibliothecaire.search import build_match_query, search_media
+
+
+def names(medias):
+    return [media.name for media in medias]
+
+
+# Vérifie la conversion de la saisie en requête FTS5 par préfixes
+def test_build_match_query():
+    assert build_match_query('dune "herb') == '"dune"* "herb"*'
+    assert build_match_query(' -- ') is None
+
+
+# Vérifie la recherche par préfixe, sans accents, et le classement (titre avant auteur)
+@pytest.mark.django_db
+def test_search_prefix_and_ranking():
+    Book.objects.create(name="Les Misérables", author="Victor Hugo", category='book')
+    Book.objects.create(name="Notre-Dame de Paris", author="Victor Hugo", category='book')
+    Dvd.objects.create(name="Hugo Cabret", author="Martin Scorsese", genre="Aventure", category='dvd')
+
+    assert names(search_media('hug')) == ["Hugo Cabret", "Les Misérables", "Notre-Dame de Paris"]
+    assert names(search_media('miserab')) == ["Les Misérables"]
+    assert names(search_media('aventu')) == ["Hugo Cabret"]
+    assert names(search_media('hugo notre')) == ["Notre-Dame de Paris"]
+
+
+# Vérifie que l'index suit les modifications, suppressions et imports en masse
+@pytest.mark.django_db
+def test_search_index_stays_in_sync():
+    dvd = Dvd.objects.create(name="Alien", author="Ridley Scott", genre="Horreur", category='dvd')
+    dvd.genre = "Science-fiction"
+    dvd.name = "Alien, le huitième passager"
+    dvd.save()
+    assert names(search_media('science huiti')) == ["Alien, le huitième passager"]
+    assert search_media('horreur') == []
+
+    dvd.delete()
+    assert search_media('alien') == []
+
+    import_media(read_rows(io.StringIO("name,author,genre\nBlade Runner,Ridley Scott,SF\n"), 'csv'), 'dvd')
+    assert names(search_media('blade sf')) == ["Blade Runner"]
+
+
+# Vérifie les filtres par catégorie et disponibilité
+@pytest.mark.django_db
+def test_search_filters():
+    member = Member.objects.create(name="Dupont", first_name="Jean")
+    dune = Book.objects.create(name="Dune", author="Frank Herbert", category='book')
+    Dvd.objects.create(name="Dune", author="Denis Villeneuve", category='dvd')
+    Loan.objects.create(borrower=member, media=dune, loan_date=timezone.now())
+
+    assert [media.category for media in search_media('dune', category='dvd')] == ['dvd']
+    assert [media.category for media in search_media('dune', available=True)] == ['dvd']
+    assert [media.category for media in search_media('dune', available=False)] == ['book']
+
+
+# Vérifie la recherche depuis la liste des médias des membres
+@pytest.mark.django_db
+def test_search_in_member_catalogue(client):
+    Book.objects.create(name="Dune", author="Frank Herbert", category='book')
+    Book.objects.create(name="Fondation", author="Isaac Asimov", category='book')
+
+    response = client.get(reverse('app_membre:liste_medias_membre'), {'q': 'herbert'})
+
+    assert names(response.context['books']) == ["Dune"]
+    assert response.context['results_count'] == 1
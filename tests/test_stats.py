@@ -0,0 +1,122 @@
+import pytest
+from datetime import datetime, time, timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from app_bibliothecaire.models import (Member, Media, Loan, DailyCategoryStats, DailyMediaStats, StatsDirtyDay,
+                                       StatsWatermark, refresh_loan_counters)
+from app_bibliothecaire.stats import WATERMARK_NAME, get_dashboard, refresh_circulation_stats
+
+
+def loan_on(member, media, day, duration=None, late=False):
+    # Emprunt commencé à midi le jour donné, éventuellement rendu 'duration' jours plus tard
+    loan_date = timezone.make_aware(datetime.combine(day, time(12)))
+    returned = day + timedelta(days=duration) if duration is not None else None
+    expected = day + timedelta(days=duration - 1 if late else 7) if duration is not None else day + timedelta(days=7)
+    return Loan(borrower=member, media=media, loan_date=loan_date,
+                expected_return_date=expected, effective_return_date=returned)
+
+
+@pytest.fixture
+def history():
+    """ Historique de 3 emprunts : 2 livres (dont un rendu en retard) et un DVD. """
+    today = timezone.localdate()
+    member = Member.objects.create(name="Doe", first_name="John")
+    book = Media.objects.create(name="Dune", author="Herbert", category='book')
+    dvd = Media.objects.create(name="Alien", author="Scott", category='dvd')
+    Loan.objects.bulk_create([
+        loan_on(member, book, today - timedelta(days=10), duration=4),
+        loan_on(member, book, today - timedelta(days=5), duration=3, late=True),
+        loan_on(member, dvd, today - timedelta(days=5)),
+    ])
+    # bulk_create() ne met pas à jour les compteurs d'emprunts du membre
+    refresh_loan_counters()
+    return today, book, dvd
+
+
+# Vérifie le calcul complet des agrégats quotidiens
+@pytest.mark.django_db
+def test_refresh_computes_daily_aggregates(history):
+    today, book, dvd = history
+    assert refresh_circulation_stats() == 4
+
+    day = DailyCategoryStats.objects.get(day=today - timedelta(days=5), category='book')
+    assert day.loans == 1
+    returned = DailyCategoryStats.objects.get(day=today - timedelta(days=2), category='book')
+    assert (returned.returns, returned.late_returns, returned.loan_days) == (1, 1, 3)
+    assert DailyMediaStats.objects.filter(media=book).count() == 2
+
+    dashboard = get_dashboard(today - timedelta(days=29), today)
+    assert dashboard['totals']['loans'] == 3
+    assert dashboard['average_duration'] == 3.5
+    assert dashboard['late_rate'] == 50
+    assert dashboard['top_titles'][0]['name'] == "Dune"
+    assert dashboard['top_titles'][0]['loans'] == 2
+
+
+# Vérifie que seuls les jours touchés depuis le dernier calcul sont recalculés
+@pytest.mark.django_db
+def test_refresh_is_incremental(history):
+    today, book, dvd = history
+    refresh_circulation_stats()
+    # Historique ancien, déjà pris en compte par le calcul précédent
+    Loan.objects.update(modified_at=timezone.now() - timedelta(days=2))
+    StatsWatermark.objects.filter(name=WATERMARK_NAME).update(modified_at=timezone.now() - timedelta(days=1))
+    DailyCategoryStats.objects.filter(day=today - timedelta(days=10)).delete()
+
+    loan = Loan.objects.get(media=dvd)
+    loan.effective_return_date = today
+    loan.save()
+
+    # Jour de l'emprunt du DVD et jour de son retour seulement
+    assert refresh_circulation_stats() == 2
+    assert DailyCategoryStats.objects.get(day=today, category='dvd').returns == 1
+    assert DailyCategoryStats.objects.get(day=today - timedelta(days=5), category='dvd').loans == 1
+    assert not DailyCategoryStats.objects.filter(day=today - timedelta(days=10)).exists()
+    # Le recalcul complet reprend tout l'historique
+    assert refresh_circulation_stats(full=True) == 5
+    assert DailyCategoryStats.objects.filter(day=today - timedelta(days=10)).exists()
+
+
+
+# Vérifie qu'une date de retour ou d'emprunt corrigée fait aussi recalculer l'ancien jour
+@pytest.mark.django_db
+def test_refresh_after_corrected_dates(history):
+    today, book, dvd = history
+    refresh_circulation_stats()
+    late = Loan.objects.get(media=book, effective_return_date=today - timedelta(days=2))
+
+    late.effective_return_date = today - timedelta(days=1)
+    with CaptureQueriesContext(connection) as context:
+        late.save()
+    # Les anciennes dates sont celles lues avec l'emprunt : pas de nouvelle lecture
+    assert not any(query['sql'].startswith('SELECT') and 'app_bibliothecaire_loan' in query['sql']
+                   for query in context.captured_queries)
+    loan = Loan.objects.get(media=dvd)
+    loan.loan_date = loan.loan_date + timedelta(days=1)
+    loan.save()
+    assert sorted(StatsDirtyDay.objects.values_list('day', flat=True)) == [today - timedelta(days=5),
+                                                                            today - timedelta(days=2)]
+
+    refresh_circulation_stats()
+    assert not DailyCategoryStats.objects.filter(day=today - timedelta(days=2), category='book').exists()
+    returned = DailyCategoryStats.objects.get(day=today - timedelta(days=1), category='book')
+    assert (returned.returns, returned.loan_days) == (1, 4)
+    assert not DailyCategoryStats.objects.filter(day=today - timedelta(days=5), category='dvd').exists()
+    assert DailyCategoryStats.objects.get(day=today - timedelta(days=4), category='dvd').loans == 1
+    assert not StatsDirtyDay.objects.exists()
+
+
+# Vérifie que le tableau de bord ne lit que les agrégats, en un nombre constant de requêtes
+@pytest.mark.django_db
+def test_stats_dashboard_view(client, history):
+    refresh_circulation_stats()
+    client.force_login(User.objects.create_user('biblio', password='secret'))
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse('app_bibliothecaire:statistiques'), {'jours': 30})
+
+    assert response.status_code == 200
+    assert "Dune (2 emprunts)" in response.content.decode()
+    assert not any('app_bibliothecaire_loan' in query['sql'] for query in context.captured_queries)
@@ -140,3 +140,37 @@ def test_access_home_librarian_unauthenticated(client):
 
 
 
+
+
+# Vérifie que la liste des membres affiche les emprunts en cours de chaque membre,
+# en 3 requêtes (validateur ETag, membres, emprunts)
+@pytest.mark.django_db
+def test_listmembers_current_loans(client, django_assert_num_queries):
+    for i in range(5):
+        member = Member.objects.create(name=f"Membre {i}", first_name="Test")
+        media = Media.objects.create(name=f"Média {i}", author="Auteur")
+        Loan.objects.create(borrower=member, media=media, loan_date=now())
+
+    with django_assert_num_queries(3):
+        response = client.get(reverse('app_bibliothecaire:listmembres'))
+
+    assert response.status_code == 200
+    members = response.context['members']
+    assert len(members) == 5
+    assert all(len(member.current_loans) == 1 for member in members)
+    assert "Média 4" in response.content.decode()
+
+
+# Vérifie la recherche par nom et la pagination de la liste des membres
+@pytest.mark.django_db
+def test_listmembers_search_and_pagination(client):
+    for name in ("Martin", "Martinez", "Bernard"):
+        Member.objects.create(name=name, first_name="Test")
+    url = reverse('app_bibliothecaire:listmembres')
+
+    response = client.get(url, {'q': 'mart', 'page_size': 1})
+    assert [member.name for member in response.context['members']] == ["Martin"]
+
+    response = client.get(url, {'q': 'mart', 'page_size': 1, 'cursor': response.context['page'].next_cursor})
+    assert [member.name for member in response.context['members']] == ["Martinez"]
+    assert not response.context['page'].has_next